@@ -0,0 +1,164 @@
+"""
+빠른 이미지 모드 벤치마크
+prompt_regression.py의 고정 코퍼스로 image_mode(full / thumbnail / none)별
+입력 토큰 / 로컬 처리 시간 / 응답 지연 시간을 비교
+
+- --backend fake: 네트워크 없이 실행 (이미지 토큰은 Gemini 타일 규칙 추정값,
+  응답 지연은 토큰 수로 계산한 모의값, 로컬 처리 시간은 실측)
+- --backend gemini: 실제 API 호출 (GEMINI_API_KEY 필요, 쿼터 사용 - 토큰/지연 모두 실측)
+
+full 모드도 prepared_images 없이 파일에서 바로 변환하므로 로컬 처리 시간에 이미지 인코딩이 포함됨
+
+사용 예:
+    python scripts/bench_fast_mode.py
+    python scripts/bench_fast_mode.py --backend gemini --profile compact --json fast_mode.json
+"""
+
+import sys
+import json
+import time
+import argparse
+import statistics
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+sys.path.insert(0, str(ROOT_DIR / 'scripts'))
+
+from bench_image_backends import build_corpus  # noqa: E402
+from image_descriptors import DEFAULT_IMAGE_MODE, IMAGE_MODES  # noqa: E402
+from prompt_regression import CASES, FakeProvider, percentile  # noqa: E402
+
+
+def run_mode(
+    generator,
+    paths: Dict[str, str],
+    image_mode: str,
+    profile_name: str,
+    repeat: int,
+    simulated: bool
+) -> List[Dict[str, Any]]:
+    """이미지 모드 1개로 코퍼스 전체 실행"""
+    records = []
+    for _ in range(repeat):
+        for case_id, image_names, user_text in CASES:
+            record: Dict[str, Any] = {'case': case_id}
+            started = time.perf_counter()
+            try:
+                result = generator.generate_prompt(
+                    [paths[name] for name in image_names], user_text,
+                    output_profile=profile_name, followup=False, image_mode=image_mode
+                )
+                wall_ms = (time.perf_counter() - started) * 1000
+                usage = result['meta']['usage']
+                if simulated:
+                    # 가짜 제공자는 바로 응답하므로 걸린 시간 전부가 로컬 처리
+                    local_ms = wall_ms
+                    api_ms = usage['simulated_latency_ms']
+                else:
+                    api_ms = usage['latency_ms']
+                    local_ms = max(wall_ms - api_ms, 0.0)
+                record.update(
+                    prompt_tokens=usage['prompt_tokens'],
+                    output_tokens=usage['output_tokens'],
+                    local_ms=round(local_ms, 1),
+                    api_ms=round(api_ms, 1),
+                    total_ms=round(local_ms + api_ms, 1),
+                    missing_fields=result['meta']['missing_fields'],
+                )
+            except Exception as e:
+                record['error'] = str(e)
+            records.append(record)
+    return records
+
+
+def summarize(image_mode: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [r for r in records if 'error' not in r]
+    complete = [r for r in ok if not r['missing_fields']]
+
+    def mean(key: str) -> Optional[float]:
+        return round(statistics.mean(r[key] for r in ok), 1) if ok else None
+
+    return {
+        'image_mode': image_mode,
+        'runs': len(records),
+        'errors': len(records) - len(ok),
+        'prompt_tokens_mean': mean('prompt_tokens'),
+        'output_tokens_mean': mean('output_tokens'),
+        'local_ms_mean': mean('local_ms'),
+        'api_ms_mean': mean('api_ms'),
+        'total_ms_p50': percentile([r['total_ms'] for r in ok], 0.5),
+        'total_ms_p95': percentile([r['total_ms'] for r in ok], 0.95),
+        'completeness': round(len(complete) / len(ok), 3) if ok else 0.0,
+    }
+
+
+def _change(value: Optional[float], base: Optional[float]) -> str:
+    if value is None or not base:
+        return '-'
+    return f"{(value - base) / base * 100:+.1f}%"
+
+
+def print_report(summaries: List[Dict[str, Any]]):
+    base = next((s for s in summaries if s['image_mode'] == DEFAULT_IMAGE_MODE), summaries[0])
+    print(f"\n{'모드':<11} {'입력 토큰':>9} {'변화':>8} {'로컬 ms':>8} {'응답 ms':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'변화':>8} {'완성도':>6} {'오류':>4}")
+    for s in summaries:
+        is_base = s is base
+        print(
+            f"{s['image_mode']:<11} {s['prompt_tokens_mean'] or 0:>9.1f} "
+            f"{'기준' if is_base else _change(s['prompt_tokens_mean'], base['prompt_tokens_mean']):>8} "
+            f"{s['local_ms_mean'] or 0:>8.1f} {s['api_ms_mean'] or 0:>8.1f} "
+            f"{s['total_ms_p50'] or 0:>8.0f} {s['total_ms_p95'] or 0:>8.0f} "
+            f"{'기준' if is_base else _change(s['total_ms_p50'], base['total_ms_p50']):>8} "
+            f"{s['completeness'] * 100:>5.0f}% {s['errors']:>4}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="빠른 이미지 모드 벤치마크")
+    parser.add_argument('--backend', choices=['fake', 'gemini'], default='fake', help="모델 제공자")
+    parser.add_argument('--modes', nargs='+', choices=list(IMAGE_MODES), default=list(IMAGE_MODES), help="비교할 모드")
+    parser.add_argument('--profile', default='compact', help="출력 프로필")
+    parser.add_argument('--template', default=None, help="프롬프트 템플릿 (기본: 생성기 기본값)")
+    parser.add_argument('--repeat', type=int, default=1, help="코퍼스 반복 횟수")
+    parser.add_argument('--corpus-dir', default=None, help="코퍼스 폴더 (기본: 임시 폴더)")
+    parser.add_argument('--json', default=None, help="요약/사례별 결과를 JSON으로 저장")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from gemini_api import GeminiPromptGenerator
+
+    simulated = args.backend == 'fake'
+    generator = GeminiPromptGenerator(
+        provider=FakeProvider() if simulated else None, prompt_template=args.template
+    )
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print("코퍼스 준비 중...")
+        paths = {path.name: str(path) for path in build_corpus(Path(args.corpus_dir or tmp_dir))}
+
+        summaries = []
+        details = {}
+        for image_mode in args.modes:
+            print(f"▶ {image_mode} - {IMAGE_MODES[image_mode]} ({len(CASES) * args.repeat}건)")
+            records = run_mode(generator, paths, image_mode, args.profile, args.repeat, simulated)
+            summaries.append(summarize(image_mode, records))
+            details[image_mode] = records
+
+    print_report(summaries)
+    if simulated:
+        print("\n* 입력 토큰은 추정값, 응답 ms는 모의값 (로컬 ms만 실측)")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'backend': args.backend, 'summaries': summaries, 'cases': details}, f, indent=2, ensure_ascii=False)
+        print(f"💾 {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""
+이미지 백엔드 벤치마크
+고정 시드로 만든 합성 이미지 코퍼스에서 백엔드별 probe/미리보기 생성 시간을 비교하고
+미리보기 크기가 Pillow와 같은지, 픽셀 차이가 얼마나 되는지 확인
+
+사용 예:
+    python scripts/bench_image_backends.py --runs 5
+    PROMPTMAKER_IMAGE_BACKEND=vips python src/promptmaker_gui.py
+"""
+
+import sys
+import json
+import random
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from PIL import Image, ImageChops, ImageDraw, ImageStat
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+
+from image_backends import BACKENDS, available_backends  # noqa: E402
+
+
+# (파일 이름, 크기, 형식) - 스마트폰/카메라 사진 크기 위주
+CORPUS = [
+    ('camera_24mp.jpg', (6000, 4000), 'JPEG'),
+    ('phone_12mp.jpg', (4032, 3024), 'JPEG'),
+    ('portrait_12mp.jpg', (3024, 4032), 'JPEG'),
+    ('fullhd.jpg', (1920, 1080), 'JPEG'),
+    ('screenshot.png', (2560, 1440), 'PNG'),
+    ('web.webp', (1600, 1200), 'WEBP'),
+]
+
+PREVIEW_SIZE = (150, 150)
+
+
+def build_corpus(corpus_dir: Path, seed: int = 42) -> List[Path]:
+    """
+    합성 이미지 코퍼스 생성 (같은 시드면 항상 같은 이미지)
+
+    Args:
+        corpus_dir: 저장 폴더
+        seed: 난수 시드
+
+    Returns:
+        이미지 경로 리스트
+    """
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, size, image_format in CORPUS:
+        path = corpus_dir / name
+        paths.append(path)
+        if path.exists():
+            continue
+
+        rng = random.Random(f"{seed}:{name}")
+        gradient = Image.linear_gradient('L').resize(size)
+        radial = Image.radial_gradient('L').resize(size)
+        img = Image.merge('RGB', (gradient, radial, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+
+        # 디테일이 있어야 JPEG 디코드 비용이 실제 사진에 가까워짐
+        draw = ImageDraw.Draw(img)
+        width, height = size
+        for _ in range(400):
+            x0, y0 = rng.randrange(width), rng.randrange(height)
+            x1, y1 = x0 + rng.randrange(20, width // 4), y0 + rng.randrange(20, height // 4)
+            color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+            shape = draw.ellipse if rng.random() < 0.5 else draw.rectangle
+            shape((x0, y0, x1, y1), fill=color, outline=(0, 0, 0))
+
+        img.save(path, format=image_format, quality=90)
+    return paths
+
+
+def time_call(func, runs: int) -> float:
+    """중앙값 실행 시간 (ms)"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def mean_pixel_diff(a: Image.Image, b: Image.Image) -> float:
+    """평균 픽셀 차이 (0~255)"""
+    mode = 'RGBA' if 'A' in a.mode + b.mode else 'RGB'
+    diff = ImageChops.difference(a.convert(mode), b.convert(mode))
+    return statistics.mean(ImageStat.Stat(diff).mean)
+
+
+def run_benchmark(paths: List[Path], backends: List[str], runs: int) -> List[Dict[str, Any]]:
+    """
+    백엔드별 측정
+
+    Returns:
+        [{'backend', 'image', 'probe_ms', 'thumbnail_ms', 'size', 'size_match', 'mean_diff'}, ...]
+    """
+    reference = BACKENDS['pillow']()
+    instances = {name: BACKENDS[name]() for name in backends}
+    rows = []
+
+    for path in paths:
+        expected = reference.thumbnail(str(path), PREVIEW_SIZE)
+        for name, backend in instances.items():
+            thumb = backend.thumbnail(str(path), PREVIEW_SIZE)
+            rows.append({
+                'backend': name,
+                'image': path.name,
+                'probe_ms': round(time_call(lambda: backend.probe(str(path)), runs), 2),
+                'thumbnail_ms': round(time_call(lambda: backend.thumbnail(str(path), PREVIEW_SIZE), runs), 2),
+                'size': list(thumb.size),
+                'size_match': thumb.size == expected.size,
+                'mean_diff': round(mean_pixel_diff(thumb, expected), 2),
+            })
+    return rows
+
+
+def print_report(rows: List[Dict[str, Any]]):
+    print(f"{'image':<20} {'backend':<10} {'probe ms':>9} {'thumb ms':>9} {'size':>10} {'diff':>6}")
+    for row in rows:
+        size = 'x'.join(map(str, row['size']))
+        flag = '' if row['size_match'] else '  ❌ 크기 불일치'
+        print(f"{row['image']:<20} {row['backend']:<10} {row['probe_ms']:>9.2f} "
+              f"{row['thumbnail_ms']:>9.2f} {size:>10} {row['mean_diff']:>6.2f}{flag}")
+
+    print("\n백엔드별 미리보기 합계:")
+    totals: Dict[str, Tuple[float, float]] = {}
+    for row in rows:
+        probe, thumb = totals.get(row['backend'], (0.0, 0.0))
+        totals[row['backend']] = (probe + row['probe_ms'], thumb + row['thumbnail_ms'])
+    base = totals['pillow'][1]
+    for name, (probe, thumb) in totals.items():
+        print(f"  {name:<10} probe {probe:8.2f} ms, thumbnail {thumb:8.2f} ms (Pillow 대비 x{base / thumb:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="이미지 백엔드 벤치마크")
+    parser.add_argument('--runs', type=int, default=5, help="측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--corpus-dir', default=None, help="코퍼스 폴더 (기본: 임시 폴더)")
+    parser.add_argument('--backends', default=None, help="측정할 백엔드 (쉼표 구분, 기본: 설치된 전체)")
+    parser.add_argument('--json', dest='json_path', default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    backends = args.backends.split(',') if args.backends else available_backends()
+    missing = [name for name in backends if name not in BACKENDS or not BACKENDS[name].available()]
+    if missing:
+        print(f"❌ 사용할 수 없는 백엔드: {', '.join(missing)}")
+        sys.exit(2)
+    if 'pillow' not in backends:
+        backends.append('pillow')
+
+    with tempfile.TemporaryDirectory(prefix='image_corpus_') as tmp_dir:
+        corpus_dir = Path(args.corpus_dir) if args.corpus_dir else Path(tmp_dir)
+        print(f"코퍼스 준비 중... ({corpus_dir})")
+        paths = build_corpus(corpus_dir)
+        print(f"백엔드: {', '.join(backends)} / 반복 {args.runs}회\n")
+        rows = run_benchmark(paths, backends, args.runs)
+
+    print_report(rows)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"\n결과 저장: {args.json_path}")
+
+    if not all(row['size_match'] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,207 @@
+"""
+프롬프트 생성기 - 시작 시간 벤치마크
+GUI를 측정 모드로 실행하여 첫 창이 뜨기까지의 시간(time-to-first-window)을 기록하고
+기준값 대비 느려졌는지 검사
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+GUI_SCRIPT = ROOT_DIR / 'src' / 'promptmaker_gui.py'
+DEFAULT_BASELINE = ROOT_DIR / 'scripts' / 'startup_baseline.json'
+
+
+def run_probe(cmd: List[str], importtime: bool = False) -> Dict[str, Any]:
+    """
+    앱을 측정 모드로 1회 실행
+
+    Args:
+        cmd: 실행할 명령어 (python 스크립트 또는 빌드된 exe)
+        importtime: -X importtime 출력 수집 여부 (python 실행 시에만)
+
+    Returns:
+        측정 결과 (wall_ms, first_window_ms, deferred_modules_loaded, importtime)
+    """
+    # 결과는 파일로 받음 (--windowed 빌드는 stdout이 없음)
+    fd, probe_path = tempfile.mkstemp(suffix='.json', prefix='startup_probe_')
+    os.close(fd)
+
+    env = dict(os.environ)
+    env['PROMPTMAKER_STARTUP_PROBE'] = probe_path
+    # 측정 중 API 예열이 네트워크를 타지 않도록 Key 제거
+    env.pop('GEMINI_API_KEY', None)
+
+    if importtime:
+        cmd = [cmd[0], '-X', 'importtime'] + cmd[1:]
+
+    try:
+        start = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=True, text=True, env=env, timeout=120)
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        if result.returncode != 0:
+            raise RuntimeError(f"측정 실행 실패 (exit {result.returncode}):\n{result.stderr[-2000:]}")
+
+        content = Path(probe_path).read_text(encoding='utf-8').strip()
+        if not content:
+            raise RuntimeError("측정 결과를 찾을 수 없습니다. (PROMPTMAKER_STARTUP_PROBE 미지원 빌드?)")
+        report = json.loads(content)
+    finally:
+        os.unlink(probe_path)
+
+    report['wall_ms'] = round(wall_ms, 1)
+    if importtime:
+        report['importtime'] = parse_importtime(result.stderr)
+    return report
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """
+    -X importtime 출력에서 모듈별 누적 import 시간(us) 추출
+
+    Args:
+        stderr: python -X importtime의 stderr 출력
+
+    Returns:
+        {모듈명: 누적 시간(us)}
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative = int(parts[1].strip())
+        except ValueError:
+            continue  # 헤더 줄
+        times[parts[2].strip()] = cumulative
+    return times
+
+
+def measure_startup(cmd: List[str], runs: int = 5) -> Dict[str, Any]:
+    """
+    여러 번 실행하여 시작 시간 통계 계산 (첫 실행은 cold start로 따로 기록)
+
+    Args:
+        cmd: 실행할 명령어
+        runs: 반복 횟수
+
+    Returns:
+        cold_ms, median_ms, runs, deferred_modules_loaded
+    """
+    reports = [run_probe(cmd) for _ in range(max(1, runs))]
+    window_times = [r['first_window_ms'] for r in reports]
+
+    loaded = sorted({name for r in reports for name in r['deferred_modules_loaded']})
+
+    return {
+        'cold_ms': reports[0]['wall_ms'],
+        'median_ms': round(statistics.median(window_times), 1),
+        'median_wall_ms': round(statistics.median(r['wall_ms'] for r in reports), 1),
+        'runs': window_times,
+        'deferred_modules_loaded': loaded,
+    }
+
+
+def print_import_report(importtime: Dict[str, int], top: int = 15):
+    """누적 import 시간 상위 모듈 출력 (최상위 패키지 기준)"""
+    top_level = {name: us for name, us in importtime.items() if '.' not in name}
+    ranked = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    print("   📦 import 시간 상위 모듈 (첫 창 이전):")
+    for name, us in ranked:
+        print(f"      {us / 1000:8.1f} ms  {name}")
+
+
+def check_regression(stats: Dict[str, Any], baseline: Optional[Dict[str, Any]],
+                     max_ms: Optional[float], tolerance: float) -> List[str]:
+    """
+    회귀 검사
+
+    Returns:
+        실패 사유 목록 (비어 있으면 통과)
+    """
+    failures = []
+
+    if stats['deferred_modules_loaded']:
+        failures.append(f"첫 창 이전에 지연 로드 대상 모듈이 import됨: {', '.join(stats['deferred_modules_loaded'])}")
+
+    if max_ms is not None and stats['median_ms'] > max_ms:
+        failures.append(f"첫 창 표시 시간 {stats['median_ms']}ms > 허용치 {max_ms}ms")
+
+    if baseline and 'median_ms' in baseline:
+        limit = baseline['median_ms'] * (1 + tolerance)
+        if stats['median_ms'] > limit:
+            failures.append(
+                f"첫 창 표시 시간 {stats['median_ms']}ms > 기준 {baseline['median_ms']}ms (+{tolerance:.0%})"
+            )
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 생성기 시작 시간 벤치마크")
+    parser.add_argument('--exe', help="빌드된 실행 파일 경로 (없으면 src/promptmaker_gui.py를 python으로 실행)")
+    parser.add_argument('--runs', type=int, default=5, help="반복 횟수 (기본 5)")
+    parser.add_argument('--max-ms', type=float, help="첫 창 표시 시간 허용치 (ms)")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help="기준값 JSON 파일")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="기준 대비 허용 증가율 (기본 0.2 = 20%%)")
+    parser.add_argument('--update-baseline', action='store_true', help="측정값을 기준값으로 저장")
+    args = parser.parse_args()
+
+    cmd = [args.exe] if args.exe else [sys.executable, str(GUI_SCRIPT)]
+
+    print("=" * 60)
+    print("⏱️  시작 시간 벤치마크")
+    print("=" * 60)
+    print(f"   명령어: {' '.join(cmd)}")
+    print()
+
+    if not args.exe:
+        report = run_probe(cmd, importtime=True)
+        print_import_report(report['importtime'])
+        print()
+
+    stats = measure_startup(cmd, args.runs)
+    print(f"   cold start (첫 실행, 프로세스 종료까지): {stats['cold_ms']} ms")
+    print(f"   첫 창 표시 (중앙값): {stats['median_ms']} ms  {stats['runs']}")
+    print()
+
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps({
+            'median_ms': stats['median_ms'],
+            'cold_ms': stats['cold_ms'],
+            'python': sys.version.split()[0],
+        }, indent=2), encoding='utf-8')
+        print(f"✅ 기준값 저장: {baseline_path}")
+        return
+
+    failures = check_regression(stats, baseline, args.max_ms, args.tolerance)
+    if failures:
+        print("❌ 시작 시간 회귀 감지:")
+        for failure in failures:
+            print(f"   - {failure}")
+        sys.exit(1)
+
+    print("✅ 시작 시간 정상")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,17 +4,69 @@ PyInstaller를 사용하여 exe 파일 생성 및 배포 폴더 구성
 """
 
 import os
+import sys
+import json
+import argparse
 import subprocess
 import shutil
 from pathlib import Path
 from datetime import datetime
+from typing import List, Set
+
+
+APP_NAME = '프롬프트생성기'
+
+# 빌드 프로필
+#   default: 기존 방식 (google.genai / google.ai 전체 포함)
+#   lean:    실제 import 추적 결과만 포함, 나머지 제외 (시작 속도·용량 최적화)
+BUILD_PROFILES = ('default', 'lean')
+
+# import 추적용 시나리오: GUI 로드 → API 모듈 로드 → 요청 구성까지 (네트워크 호출 없음)
+TRACE_SCRIPT = """
+import io, sys
+sys.path.insert(0, 'src')
+import promptmaker_gui
+from PIL import Image, ImageTk
+import pyperclip, webbrowser
+import gemini_api
+generator = gemini_api.GeminiPromptGenerator(api_key='trace-only')
+buf = io.BytesIO()
+Image.new('RGB', (8, 8)).save(buf, format='PNG')
+gemini_api.Part.from_bytes(data=buf.getvalue(), mime_type='image/png')
+gemini_api.GenerateContentConfig(temperature=0.7, max_output_tokens=16)
+"""
+
+# 추적 결과와 무관하게 항상 포함할 모듈 (동적 로드 / PyInstaller 훅 의존)
+ALWAYS_KEEP = {
+    'encodings', 'PIL', 'tkinter', '_tkinter', 'dotenv', 'certifi', 'ssl',
+}
+
+# 추적에 나타나지 않으면 제외할 표준 라이브러리 대형 모듈
+STDLIB_EXCLUDE_CANDIDATES = {
+    'unittest', 'pydoc', 'pydoc_data', 'doctest', 'lib2to3', 'idlelib', 'test',
+    'distutils', 'setuptools', 'pip', 'sqlite3', 'xmlrpc', 'ftplib', 'turtle',
+    'turtledemo', 'curses', 'multiprocessing', 'asyncio', 'tkinter.test',
+}
 
 
 def main():
     """메인 빌드 프로세스"""
 
+    parser = argparse.ArgumentParser(description="프롬프트 생성기 EXE 빌드")
+    parser.add_argument('--profile', choices=BUILD_PROFILES, default='default',
+                        help="빌드 프로필 (lean: import 추적 기반 최소 번들)")
+    parser.add_argument('--optimize', type=int, choices=(0, 1, 2), default=None,
+                        help="바이트코드 최적화 레벨 (lean 기본값 1)")
+    parser.add_argument('--strip', action='store_true', help="바이너리 심볼 제거 (Windows 외)")
+    parser.add_argument('--skip-startup-check', action='store_true', help="빌드 후 cold start 측정 생략")
+    args = parser.parse_args()
+
+    optimize = args.optimize
+    if optimize is None and args.profile == 'lean':
+        optimize = 1
+
     print("=" * 60)
-    print("🚀 프롬프트 생성기 - 자동 빌드 시작")
+    print(f"🚀 프롬프트 생성기 - 자동 빌드 시작 (프로필: {args.profile})")
     print("=" * 60)
     print()
 
@@ -29,10 +81,21 @@ def main():
     print("✅ PyInstaller 준비됨\n")
 
     # 3. 빌드 실행
+    traced = None
+    if args.profile == 'lean':
+        print("🔎 실제 사용 모듈 추적 중...")
+        traced = trace_imported_modules()
+        print(f"✅ 추적 완료 ({len(traced)}개 모듈)\n")
+
     print("🔨 EXE 파일 빌드 시작...")
-    build_exe()
+    build_exe(traced_modules=traced, optimize=optimize, strip=args.strip)
     print("✅ 빌드 완료\n")
 
+    # 빌드 결과 측정 (용량 / cold start)
+    print("📏 빌드 결과 측정 중...")
+    report_build(args.profile, measure_startup=not args.skip_startup_check)
+    print()
+
     # 4. 배포 폴더 구성
     print("📦 배포 폴더 구성 중...")
     prepare_release()
@@ -81,13 +144,80 @@ def check_pyinstaller():
         print("   ✅ PyInstaller 설치 완료")
 
 
-def build_exe():
-    """PyInstaller로 EXE 파일 빌드"""
+def trace_imported_modules() -> Set[str]:
+    """
+    시나리오 실행 중 실제로 import되는 모듈 목록 수집 (-X importtime)
+
+    Returns:
+        import된 모듈 이름 집합
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', TRACE_SCRIPT],
+        capture_output=True, text=True, env={**os.environ, 'GEMINI_API_KEY': ''}
+    )
+
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        print("\n❌ import 추적 실패!")
+        exit(1)
+
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            if name and name != 'imported package':
+                modules.add(name)
+
+    # 추적 결과 저장 (빌드 재현 / 디버깅용)
+    Path('build').mkdir(exist_ok=True)
+    Path('build/import_trace.txt').write_text('\n'.join(sorted(modules)), encoding='utf-8')
+    print("   저장: build/import_trace.txt")
+
+    return modules
+
+
+def compute_excludes(traced_modules: Set[str]) -> List[str]:
+    """
+    번들에서 제외할 최상위 모듈 계산
+
+    설치된 패키지 + 대형 표준 라이브러리 중 추적 결과에 없는 것을 제외
+
+    Args:
+        traced_modules: 추적된 모듈 이름 집합
+
+    Returns:
+        --exclude-module로 넘길 모듈 이름 목록
+    """
+    from importlib.metadata import packages_distributions
+
+    traced_top = {name.split('.')[0] for name in traced_modules}
+    candidates = set(packages_distributions()) | STDLIB_EXCLUDE_CANDIDATES
+
+    excludes = []
+    for name in sorted(candidates):
+        top = name.split('.')[0]
+        if name in traced_modules or (top in traced_top and '.' not in name):
+            continue
+        if top in ALWAYS_KEEP or name.startswith('_'):
+            continue
+        excludes.append(name)
+    return excludes
+
+
+def build_exe(traced_modules: Set[str] = None, optimize: int = None, strip: bool = False):
+    """
+    PyInstaller로 EXE 파일 빌드
+
+    Args:
+        traced_modules: import 추적 결과 (있으면 lean 빌드 - 추적된 모듈만 포함)
+        optimize: 바이트코드 최적화 레벨 (None이면 PyInstaller 기본값)
+        strip: 바이너리 심볼 제거 여부
+    """
 
     # PyInstaller 명령어 구성
     cmd = [
         'pyinstaller',
-        '--name', '프롬프트생성기',
+        '--name', APP_NAME,
         '--windowed',  # 콘솔 창 숨김
         '--onedir',    # 폴더 형태 (빠른 실행)
         '--clean',     # 깨끗한 빌드
@@ -97,14 +227,39 @@ def build_exe():
 
         # 숨겨진 import (자동 감지 안 되는 모듈)
         '--hidden-import', 'PIL._tkinter_finder',
-        '--hidden-import', 'google.genai',
-        '--hidden-import', 'google.ai',
-        '--hidden-import', 'google.ai.generativelanguage',
+    ]
+
+    if traced_modules is None:
+        cmd += [
+            '--hidden-import', 'google.genai',
+            '--hidden-import', 'google.ai',
+            '--hidden-import', 'google.ai.generativelanguage',
+
+            # Google AI 패키지 전체 포함
+            '--collect-all', 'google.genai',
+            '--collect-all', 'google.ai',
+        ]
+    else:
+        # 추적된 google.* 모듈만 명시적으로 포함 (함수 내부 지연 import 대비)
+        for name in sorted(traced_modules):
+            if name.startswith('google.'):
+                cmd += ['--hidden-import', name]
+
+        # 인증서 등 데이터 파일만 수집 (코드 전체 수집 대신)
+        cmd += ['--collect-data', 'certifi']
+
+        excludes = compute_excludes(traced_modules)
+        for name in excludes:
+            cmd += ['--exclude-module', name]
+        print(f"   제외 모듈: {len(excludes)}개")
 
-        # Google AI 패키지 전체 포함
-        '--collect-all', 'google.genai',
-        '--collect-all', 'google.ai',
+    if optimize is not None:
+        cmd += ['--optimize', str(optimize)]
 
+    if strip:
+        cmd.append('--strip')
+
+    cmd += [
         # src 폴더를 경로에 추가
         '--paths', 'src',
 
@@ -113,7 +268,7 @@ def build_exe():
     ]
 
     print("   명령어:")
-    print(f"   {' '.join(cmd)}")
+    print(f"   {' '.join(cmd) if len(cmd) < 60 else ' '.join(cmd[:40]) + ' ...'}")
     print()
     print("   빌드 진행 중... (5-10분 소요)")
     print()
@@ -128,6 +283,49 @@ def build_exe():
     print("\n   ✅ EXE 파일 생성 완료")
 
 
+def report_build(profile: str, measure_startup: bool = True):
+    """
+    빌드 결과 용량 및 cold start 시간 측정, build/build_report.json에 기록
+
+    Args:
+        profile: 빌드 프로필 이름
+        measure_startup: cold start 측정 여부 (GUI 실행 가능한 환경 필요)
+    """
+    dist_dir = Path('dist') / APP_NAME
+    if not dist_dir.exists():
+        print(f"   ⚠️  경고: {dist_dir} 폴더를 찾을 수 없습니다")
+        return
+
+    files = [f for f in dist_dir.rglob('*') if f.is_file()]
+    total_bytes = sum(f.stat().st_size for f in files)
+
+    report = {
+        'profile': profile,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'file_count': len(files),
+        'bundle_mb': round(total_bytes / 1024 / 1024, 1),
+    }
+    print(f"   번들 용량: {report['bundle_mb']} MB ({report['file_count']}개 파일)")
+
+    if measure_startup:
+        exe_path = dist_dir / (APP_NAME + ('.exe' if os.name == 'nt' else ''))
+        try:
+            sys.path.insert(0, str(Path(__file__).resolve().parent))
+            from bench_startup import measure_startup as measure
+
+            stats = measure([str(exe_path)], runs=3)
+            report['cold_start_ms'] = stats['cold_ms']
+            report['first_window_ms'] = stats['median_ms']
+            print(f"   cold start: {stats['cold_ms']} ms / 첫 창 표시 (중앙값): {stats['median_ms']} ms")
+        except Exception as e:
+            print(f"   ⚠️  cold start 측정 실패: {e}")
+
+    report_path = Path('build') / 'build_report.json'
+    report_path.parent.mkdir(exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding='utf-8')
+    print(f"   저장: {report_path}")
+
+
 def prepare_release():
     """배포용 폴더 구성"""
 
@@ -0,0 +1,218 @@
+"""
+OpenAI 호환 스텁 서버 + 라우팅 종단 간 점검
+실제 로컬 모델 없이 providers.OpenAICompatibleProvider / ProviderRouter를 확인하기 위한 서버
+
+- POST /v1/chat/completions: 요청의 응답 스키마 필드를 채운 고정 JSON 반환
+- GET  /v1/models: 상태 확인용
+
+사용 예:
+    # 스텁 서버 실행 후 GUI/CLI에서 사용
+    python scripts/openai_stub_server.py --port 8001 --latency 0.2
+    OPENAI_COMPAT_BASE_URL=http://127.0.0.1:8001/v1 python src/promptmaker_gui.py
+
+    # 빠른/느린/고장 난 스텁 3개를 띄워 라우팅 정책 점검
+    python scripts/openai_stub_server.py --check
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+
+
+def _fill_schema(schema: Dict[str, Any], label: str) -> Any:
+    """JSON Schema에 맞는 더미 값 생성"""
+    schema_type = schema.get('type')
+    if isinstance(schema_type, list):
+        schema_type = schema_type[0]
+    if schema_type == 'object':
+        return {name: _fill_schema(prop, f"{label} {name}") for name, prop in schema.get('properties', {}).items()}
+    if schema_type == 'array':
+        return [_fill_schema(schema.get('items', {}), label)]
+    if schema_type in ('integer', 'number'):
+        return 1
+    if schema_type == 'boolean':
+        return True
+    return label.strip()
+
+
+def make_handler(name: str, latency: float, fail_rate: float, seed: int = 0):
+    """
+    스텁 요청 핸들러 클래스 생성
+
+    Args:
+        name: 응답에 표시할 서버 이름
+        latency: 응답 지연 (초)
+        fail_rate: 500 오류 비율 (0~1, 1이면 항상 실패)
+        seed: 실패 난수 시드
+    """
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        calls = 0
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: Dict[str, Any]):
+            data = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip('/') == '/v1/models':
+                status = 503 if fail_rate >= 1 else 200
+                self._send(status, {'object': 'list', 'data': [{'id': name, 'object': 'model'}]})
+            else:
+                self._send(404, {'error': {'message': 'not found'}})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/v1/chat/completions':
+                self._send(404, {'error': {'message': 'not found'}})
+                return
+
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length) or b'{}')
+            with lock:
+                StubHandler.calls += 1
+                failed = rng.random() < fail_rate
+
+            time.sleep(latency)
+            if failed:
+                self._send(500, {'error': {'message': f"{name}: injected failure"}})
+                return
+
+            response_format = request.get('response_format') or {}
+            schema = response_format.get('json_schema', {}).get('schema') or {
+                'type': 'object',
+                'properties': {'prompts': {'type': 'object', 'properties': {'final_prompt': {'type': 'string'}}}},
+            }
+            content = json.dumps(_fill_schema(schema, f"{name}:"))
+            images = sum(
+                1 for message in request.get('messages', []) if isinstance(message.get('content'), list)
+                for part in message['content'] if part.get('type') == 'image_url'
+            )
+            self._send(200, {
+                'id': f"stub-{StubHandler.calls}",
+                'object': 'chat.completion',
+                'model': request.get('model', name),
+                'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+                'usage': {'prompt_tokens': 100 + images * 258, 'completion_tokens': 50, 'total_tokens': 150 + images * 258},
+            })
+
+    return StubHandler
+
+
+def start_stub_server(
+    name: str = 'stub',
+    latency: float = 0.0,
+    fail_rate: float = 0.0,
+    port: int = 0
+) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    스텁 서버를 백그라운드 스레드로 시작
+
+    Returns:
+        (서버, base_url) - 종료는 server.shutdown()
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(name, latency, fail_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+def run_check(image_path: str = None) -> bool:
+    """
+    빠른/느린/고장 난 스텁으로 라우팅 정책 종단 간 점검
+
+    Returns:
+        모든 점검 통과 여부
+    """
+    from providers import OpenAICompatibleProvider, ProviderRouter
+    from gemini_api import GeminiPromptGenerator
+
+    servers = {}
+    providers = {}
+    for name, latency, fail_rate, cost in [('fast', 0.05, 0.0, 0.5), ('slow', 0.4, 0.0, 0.0), ('broken', 0.0, 1.0, 0.0)]:
+        server, url = start_stub_server(name, latency, fail_rate)
+        servers[name] = server
+        providers[name] = OpenAICompatibleProvider(url, f"{name}-model", name=name, cost_per_1k_tokens=cost)
+
+    if image_path is None:
+        from PIL import Image
+        import tempfile
+        image_path = str(Path(tempfile.mkdtemp(prefix='stub_check_')) / 'ref.png')
+        Image.new('RGB', (64, 48), (200, 120, 40)).save(image_path)
+
+    results = []
+
+    def check(label: str, ok: bool, detail: str = ''):
+        results.append(ok)
+        print(f"{'✅' if ok else '❌'} {label}{f' - {detail}' if detail else ''}")
+
+    try:
+        # latency: 처음엔 각 제공자를 한 번씩 측정한 뒤 빠른 쪽으로 수렴 (고장 난 제공자는 제외)
+        router = ProviderRouter([providers['slow'], providers['broken'], providers['fast']], policy='latency')
+        generator = GeminiPromptGenerator(provider=router)
+        used = []
+        for _ in range(6):
+            result = generator.generate_prompt([image_path], "stub check", output_profile='compact')
+            used.append(result['meta']['usage']['provider'])
+        check("latency 정책이 빠른 제공자로 수렴", used[-3:] == ['fast'] * 3, ' → '.join(used))
+        check("고장 난 제공자 제외", router.stats()['broken']['excluded'], json.dumps(router.stats()['broken']))
+        check("결과 파싱/정규화", bool(result['prompts']['final_prompt']), result['prompts']['final_prompt'])
+
+        # cost: 비용이 0인 제공자 중 실패하지 않는 쪽
+        router = ProviderRouter([providers['fast'], providers['broken'], providers['slow']], policy='cost')
+        result = GeminiPromptGenerator(provider=router).generate_prompt([image_path], "stub check", output_profile='compact')
+        usage = result['meta']['usage']
+        check("cost 정책 + 실패 시 다음 제공자로 전환", usage['provider'] == 'slow' and 'fallback_errors' in usage,
+              f"{usage['provider']}, fallback={usage.get('fallback_errors')}")
+
+        # priority + 상태 확인
+        router = ProviderRouter([providers['broken'], providers['fast']], policy='priority')
+        check("상태 확인", router.health_check() and router.stats()['broken']['excluded'])
+        result = GeminiPromptGenerator(provider=router).generate_prompt([image_path], "stub check", output_profile='standard')
+        check("priority 정책이 제외된 제공자를 건너뜀", result['meta']['usage']['provider'] == 'fast'
+              and 'fallback_errors' not in result['meta']['usage'])
+    finally:
+        for server in servers.values():
+            server.shutdown()
+
+    return all(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 스텁 서버")
+    parser.add_argument('--port', type=int, default=8001, help="포트")
+    parser.add_argument('--name', default='stub', help="서버/모델 이름")
+    parser.add_argument('--latency', type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="500 오류 비율 (0~1)")
+    parser.add_argument('--check', action='store_true', help="스텁 3개로 라우팅 종단 간 점검 후 종료")
+    parser.add_argument('--image', default=None, help="점검에 사용할 참고 이미지 (기본: 임시 이미지)")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if run_check(args.image) else 1)
+
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), make_handler(args.name, args.latency, args.fail_rate))
+    print(f"스텁 서버 실행 중: http://127.0.0.1:{args.port}/v1 (Ctrl+C로 종료)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
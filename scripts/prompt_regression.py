@@ -0,0 +1,307 @@
+"""
+프롬프트 템플릿 회귀 테스트
+고정 코퍼스(합성 이미지 + 고정 요청문)를 템플릿별로 돌려 입력 토큰 / 지연 시간 / 필드 완성도를 비교
+
+- --backend fake: 네트워크 없이 결정적인 가짜 제공자 사용 (토큰은 추정값, 지연 시간은 토큰 수로 계산한 모의값)
+  템플릿 변경으로 입력 토큰이 얼마나 줄었는지, 파이프라인이 깨지지 않았는지 확인용
+  (가짜 제공자는 항상 스키마대로 응답하므로 완성도는 실제 모델로만 의미가 있음)
+- --backend gemini: 실제 API 호출 (GEMINI_API_KEY 필요, 쿼터 사용)
+- --measure: models.count_tokens로 템플릿별 텍스트 입력 토큰을 실측하여 출력 (쿼터 미사용, API Key 필요)
+  (보고서의 템플릿 토큰은 항상 estimate_tokens 추정값)
+
+기준 템플릿보다 완성도가 떨어진 템플릿이 있으면 종료 코드 1
+
+사용 예:
+    python scripts/prompt_regression.py
+    python scripts/prompt_regression.py --backend gemini --profiles compact --repeat 2 --json report.json
+    python scripts/prompt_regression.py --measure
+"""
+
+import io
+import os
+import sys
+import json
+import hashlib
+import argparse
+import statistics
+import tempfile
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / 'src'))
+
+from bench_image_backends import build_corpus  # noqa: E402
+from image_io import estimate_image_tokens, prepare_image_bytes  # noqa: E402
+from output_profiles import OUTPUT_PROFILES, get_output_profile  # noqa: E402
+from prompt_templates import (  # noqa: E402
+    DEFAULT_PROMPT_TEMPLATE,
+    PROMPT_TEMPLATES,
+    build_system_prompt,
+    build_user_message,
+    estimate_tokens,
+    get_prompt_template,
+    template_tokens,
+)
+from providers import Provider  # noqa: E402
+
+
+# (사례 ID, 코퍼스 이미지 이름, 요청문) - 한국어/영어, 짧은/긴 요청 섞어서
+CASES = [
+    ('ko-short', ['fullhd.jpg'], "비 오는 밤의 네온 거리"),
+    ('ko-long', ['phone_12mp.jpg'],
+     "이 사진의 색감과 조명을 유지하면서, 안개 낀 새벽의 항구 도시를 지브리 스타일로 그려줘. 배가 몇 척 떠 있고 갈매기가 날아다니는 장면"),
+    ('ko-multi', ['fullhd.jpg', 'web.webp'], "두 이미지의 스타일을 섞어서 미래 도시의 시장 풍경"),
+    ('ko-portrait', ['portrait_12mp.jpg'], "인물 사진처럼 부드러운 역광, 봄 벚꽃 배경"),
+    ('en-short', ['web.webp'], "cozy cabin interior in winter"),
+    ('en-long', ['camera_24mp.jpg'],
+     "Keep the palette but turn it into a cinematic sci-fi landscape at golden hour, with a lone explorer and ruined megastructures"),
+    ('en-multi', ['screenshot.png', 'fullhd.jpg', 'web.webp'], "isometric game level inspired by these references"),
+    ('mixed', ['phone_12mp.jpg'], "product shot, 미니멀한 흰 배경, soft studio lighting"),
+]
+
+def fake_image_tokens(data: bytes) -> int:
+    """전송할 이미지 바이트의 입력 토큰 추정 (헤더의 크기만 읽어 Gemini 타일 규칙 적용)"""
+    with Image.open(io.BytesIO(data)) as img:
+        return estimate_image_tokens(*img.size)
+
+
+class FakeProvider(Provider):
+    """결정적인 가짜 제공자 (같은 입력이면 항상 같은 응답)"""
+
+    name = 'fake'
+    model = 'fake-deterministic'
+
+    def generate(self, contents, max_output_tokens, response_schema, thinking_budget=None):
+        texts = [part.text for part in contents if getattr(part, 'text', None)]
+        image_tokens = sum(
+            fake_image_tokens(part.inline_data.data) for part in contents if getattr(part, 'inline_data', None)
+        )
+        prompt_tokens = sum(estimate_tokens(text) for text in texts) + image_tokens
+
+        seed = hashlib.sha256(''.join(texts).encode('utf-8')).hexdigest()
+        fields = response_schema['properties']['prompts']['property_ordering'] if response_schema else []
+        prompts = {}
+        for field in fields:
+            words = 220 if field == 'style_prompt' else 60
+            prompts[field] = ' '.join(f"w{seed[(i * 2) % 64:(i * 2) % 64 + 2]}" for i in range(words))
+        text = json.dumps({'prompts': prompts})
+
+        output_tokens = estimate_tokens(text)
+        usage = {
+            'prompt_tokens': prompt_tokens,
+            'output_tokens': output_tokens,
+            'thinking_tokens': 0,
+            'total_tokens': prompt_tokens + output_tokens,
+            'provider': self.name,
+            'model': self.model,
+            # 입력/출력 토큰 수로 계산한 모의 지연 시간 (실제로 대기하지 않음)
+            'simulated_latency_ms': round(300 + prompt_tokens * 0.05 + output_tokens * 4),
+        }
+        return text, usage
+
+    def health_check(self):
+        return True
+
+
+def prepare_corpus(corpus_dir: Path) -> Dict[str, Tuple[str, Tuple[bytes, str]]]:
+    """코퍼스 이미지 생성 후 전송용 바이트로 한 번만 변환 (템플릿 간 이미지 입력을 동일하게)"""
+    prepared = {}
+    for path in build_corpus(corpus_dir):
+        prepared[path.name] = (str(path), prepare_image_bytes(str(path)))
+    return prepared
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(round(q * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def run_variant(
+    generator,
+    prepared: Dict[str, Tuple[str, Tuple[bytes, str]]],
+    profile_name: str,
+    repeat: int,
+    thinking: Optional[str]
+) -> List[Dict[str, Any]]:
+    """템플릿 1개 × 프로필 1개로 코퍼스 전체 실행"""
+    records = []
+    for _ in range(repeat):
+        for case_id, image_names, user_text in CASES:
+            record: Dict[str, Any] = {'case': case_id}
+            try:
+                result = generator.generate_prompt(
+                    [prepared[name][0] for name in image_names], user_text,
+                    output_profile=profile_name, thinking=thinking,
+                    # 후속 호출로 보충하면 템플릿 자체의 완성도를 알 수 없으므로 끔
+                    followup=False,
+                    prepared_images=[prepared[name][1] for name in image_names]
+                )
+                usage = result['meta']['usage']
+                record.update(
+                    prompt_tokens=usage['prompt_tokens'],
+                    output_tokens=usage['output_tokens'],
+                    latency_ms=usage.get('simulated_latency_ms', usage['latency_ms']),
+                    missing_fields=result['meta']['missing_fields'],
+                    parse_path=result['meta']['parse_path'],
+                )
+            except Exception as e:
+                record['error'] = str(e)
+            records.append(record)
+    return records
+
+
+def summarize(template: str, profile_name: str, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ok = [record for record in records if 'error' not in record]
+    requested = len(get_output_profile(profile_name)['fields'])
+    filled = sum(requested - len(record['missing_fields']) for record in ok)
+    latencies = [record['latency_ms'] for record in ok]
+
+    return {
+        'template': template,
+        'profile': profile_name,
+        'runs': len(records),
+        'errors': len(records) - len(ok),
+        'template_tokens_estimate': template_tokens(template, profile_name),
+        'prompt_tokens': round(statistics.mean(r['prompt_tokens'] for r in ok), 1) if ok else None,
+        'output_tokens': round(statistics.mean(r['output_tokens'] for r in ok), 1) if ok else None,
+        'latency_p50_ms': percentile(latencies, 0.5),
+        'latency_p95_ms': percentile(latencies, 0.95),
+        # 요청한 필드가 모두 채워진 응답 비율 (오류는 미완성으로 계산)
+        'completeness': round(sum(1 for r in ok if not r['missing_fields']) / len(records), 3) if records else 0.0,
+        'field_fill_rate': round(filled / (requested * len(records)), 3) if records else 0.0,
+        'parse_paths': dict(Counter(record['parse_path'] for record in ok)),
+    }
+
+
+def compare(summaries: List[Dict[str, Any]], baseline: str, tolerance: float) -> List[str]:
+    """기준 템플릿 대비 변화 계산 (summary에 기록) → 회귀 목록"""
+    base = {s['profile']: s for s in summaries if s['template'] == baseline}
+    regressions = []
+    for summary in summaries:
+        ref = base.get(summary['profile'])
+        if ref is None or summary['template'] == baseline:
+            continue
+        if ref['prompt_tokens'] and summary['prompt_tokens'] is not None:
+            summary['prompt_tokens_delta_pct'] = round(
+                (summary['prompt_tokens'] - ref['prompt_tokens']) / ref['prompt_tokens'] * 100, 1
+            )
+        summary['completeness_delta'] = round(summary['completeness'] - ref['completeness'], 3)
+        if summary['completeness_delta'] < -tolerance:
+            regressions.append(
+                f"{summary['template']} / {summary['profile']}: 완성도 {summary['completeness']:.0%} "
+                f"(기준 {ref['completeness']:.0%})"
+            )
+    return regressions
+
+
+def print_report(summaries: List[Dict[str, Any]], baseline: str):
+    print(f"\n{'템플릿':<16} {'프로필':<9} {'템플릿 토큰':>11} {'입력 토큰':>9} {'변화':>7} {'출력 토큰':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'완성도':>7} {'오류':>4}  파싱 경로")
+    for s in summaries:
+        delta = '기준' if s['template'] == baseline else (
+            f"{s['prompt_tokens_delta_pct']:+.1f}%" if 'prompt_tokens_delta_pct' in s else '-'
+        )
+        tokens = f"{s['template_tokens_estimate']}*"
+        paths = ', '.join(f"{path} {count}" for path, count in sorted(s['parse_paths'].items()))
+        print(
+            f"{s['template']:<16} {s['profile']:<9} {tokens:>11} {s['prompt_tokens'] or '-':>9} {delta:>7} "
+            f"{s['output_tokens'] or '-':>9} {s['latency_p50_ms'] or '-':>8} {s['latency_p95_ms'] or '-':>8} "
+            f"{s['completeness']:>7.0%} {s['errors']:>4}  {paths}"
+        )
+    print("\n* 추정값 (실측은 --measure)")
+
+
+def measure_tokens(templates: List[str], profiles: List[str]) -> Dict[str, Any]:
+    """models.count_tokens로 템플릿별 텍스트 입력 토큰 실측 (빈 요청문 기준)"""
+    import google.genai as genai
+    from providers import DEFAULT_GEMINI_MODEL
+
+    client = genai.Client(api_key=os.environ['GEMINI_API_KEY'])
+    counts: Dict[str, Dict[str, int]] = {}
+    for name in templates:
+        template = get_prompt_template(name)
+        for profile_name in profiles:
+            profile = get_output_profile(profile_name)
+            response = client.models.count_tokens(
+                model=DEFAULT_GEMINI_MODEL,
+                contents=[build_system_prompt(template, profile), build_user_message(template, '')]
+            )
+            counts.setdefault(name, {})[profile_name] = response.total_tokens
+
+    return {
+        'model': DEFAULT_GEMINI_MODEL,
+        'measured_at': datetime.now().isoformat(timespec='seconds'),
+        'counts': counts,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프롬프트 템플릿 회귀 테스트")
+    parser.add_argument('--backend', choices=['fake', 'gemini'], default='fake', help="모델 제공자")
+    parser.add_argument('--templates', nargs='+', default=list(PROMPT_TEMPLATES), help="비교할 템플릿")
+    parser.add_argument('--profiles', nargs='+', default=list(OUTPUT_PROFILES), help="출력 프로필")
+    parser.add_argument('--baseline', default=DEFAULT_PROMPT_TEMPLATE, help="기준 템플릿")
+    parser.add_argument('--repeat', type=int, default=1, help="코퍼스 반복 횟수")
+    parser.add_argument('--thinking', default=None, help="thinking 설정 (기본: 생성기 기본값)")
+    parser.add_argument('--tolerance', type=float, default=0.0, help="허용할 완성도 하락 (0~1)")
+    parser.add_argument('--corpus-dir', default=None, help="코퍼스 폴더 (기본: 임시 폴더)")
+    parser.add_argument('--json', default=None, help="요약/사례별 결과를 JSON으로 저장")
+    parser.add_argument('--measure', action='store_true', help="count_tokens로 템플릿 토큰 실측 후 출력")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    for name in args.templates:
+        get_prompt_template(name)
+    if args.baseline not in args.templates:
+        args.templates.insert(0, args.baseline)
+
+    if args.measure:
+        if not os.getenv('GEMINI_API_KEY'):
+            print("❌ --measure에는 GEMINI_API_KEY가 필요합니다.")
+            sys.exit(2)
+        print(json.dumps(measure_tokens(args.templates, args.profiles), indent=2, ensure_ascii=False))
+        return
+
+    from gemini_api import GeminiPromptGenerator
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        prepared = prepare_corpus(Path(args.corpus_dir or tmp_dir))
+
+        summaries = []
+        details = {}
+        for name in args.templates:
+            provider = FakeProvider() if args.backend == 'fake' else None
+            generator = GeminiPromptGenerator(provider=provider, prompt_template=name)
+            for profile_name in args.profiles:
+                print(f"▶ {name} / {profile_name} ({len(CASES) * args.repeat}건)")
+                records = run_variant(generator, prepared, profile_name, args.repeat, args.thinking)
+                summaries.append(summarize(name, profile_name, records))
+                details[f"{name}/{profile_name}"] = records
+
+    regressions = compare(summaries, args.baseline, args.tolerance)
+    print_report(summaries, args.baseline)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'backend': args.backend, 'summaries': summaries, 'cases': details}, f, indent=2, ensure_ascii=False)
+        print(f"💾 {args.json}")
+
+    if regressions:
+        print("\n❌ 완성도 회귀:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print("\n✅ 기준 대비 완성도 회귀 없음")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+"""
+2단계 프롬프트 생성 파이프라인
+1단계: 이미지별 시각 분석(색감, 조명, 구도, 스타일, 주요 객체, 분위기)을 한 번만 추출하여
+       내용 해시 기준으로 캐시
+2단계: 캐시된 분석 결과 + 사용자 텍스트로 텍스트 전용 호출을 하여 프롬프트 작성
+
+같은 참고 이미지로 문구만 바꿔 가며 반복할 때 이미지 업로드와 이미지 토큰이 생략됨
+"""
+
+import os
+import re
+import json
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.genai.types import Part
+
+from gemini_api import GeminiPromptGenerator, compute_file_hash, parse_json_response
+from health import CircuitBreaker, CircuitOpenError
+from response_parser import parse_prompt_response
+from output_profiles import (
+    DEFAULT_OUTPUT_PROFILE,
+    get_output_profile,
+    build_response_schema,
+    normalize_result,
+)
+from prompt_templates import build_compose_message, build_compose_prompt, get_prompt_template
+
+
+# 분석 지시문/스키마가 바뀌면 올려서 이전 캐시를 무효화
+ANALYSIS_VERSION = '1'
+
+ANALYSIS_FIELDS = ['color_palette', 'lighting', 'composition', 'art_style', 'main_subjects', 'mood']
+
+ANALYSIS_MAX_OUTPUT_TOKENS = 1024
+
+DEFAULT_CACHE_DIR = 'cache/analysis'
+
+ANALYSIS_SCHEMA = {
+    'type': 'OBJECT',
+    'properties': {field: {'type': 'STRING'} for field in ANALYSIS_FIELDS},
+    'required': list(ANALYSIS_FIELDS),
+    'property_ordering': list(ANALYSIS_FIELDS),
+}
+
+
+def create_analysis_prompt() -> str:
+    """1단계 (이미지 분석) 시스템 프롬프트"""
+    return """당신은 전문적인 AI 이미지 생성 프롬프트 엔지니어입니다.
+
+제공된 참고 이미지 1장을 분석하여, 나중에 이미지 생성 프롬프트를 작성할 때
+그대로 사용할 수 있도록 시각적 특징을 정리하세요.
+
+# 분석 항목 (모두 영어로, 전문 사진/렌더링 용어 사용):
+- color_palette: 색감 (주요 색상, 채도, 색온도)
+- lighting: 조명 (광원 방향, 강도, 그림자, 시간대)
+- composition: 구도 (시점, 프레이밍, 피사체 배치)
+- art_style: 스타일 (매체, 렌더링 방식, 참고할 만한 작가/스튜디오)
+- main_subjects: 주요 객체 (인물/사물의 외형, 의상, 자세)
+- mood: 분위기 (감정, 분위기를 만드는 요소)
+
+# 출력 형식:
+반드시 아래 JSON 구조로 출력하세요 (JSON만 출력하고 다른 텍스트는 포함하지 마세요):
+{
+  "color_palette": "...",
+  "lighting": "...",
+  "composition": "...",
+  "art_style": "...",
+  "main_subjects": "...",
+  "mood": "..."
+}
+"""
+
+
+def create_compose_prompt(profile: Dict[str, Any], template: Optional[Dict[str, Any]] = None) -> str:
+    """
+    2단계 (텍스트 전용 프롬프트 작성) 시스템 프롬프트
+
+    Args:
+        profile: 출력 프로필
+        template: 프롬프트 템플릿 (없으면 기본 템플릿)
+    """
+    return build_compose_prompt(template or get_prompt_template(), profile)
+
+
+class AnalysisCache:
+    """이미지 분석 결과 캐시 (메모리 + 디스크, 내용 해시 + 분석한 모델 기준)"""
+
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR):
+        """
+        Args:
+            cache_dir: 디스크 캐시 폴더 (None이면 메모리 캐시만 사용)
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._memory: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, content_hash: str, model: str) -> Path:
+        # 모델 이름에 '/' 등이 들어갈 수 있으므로 파일 이름에 쓸 수 있는 문자만 남김
+        safe_model = re.sub(r'[^A-Za-z0-9._-]', '_', model)
+        return self.cache_dir / f"{content_hash}.{safe_model}.v{ANALYSIS_VERSION}.json"
+
+    def get(self, content_hash: str, model: str) -> Optional[Dict[str, Any]]:
+        key = (content_hash, model)
+        with self._lock:
+            if key in self._memory:
+                return self._memory[key]
+
+        if self.cache_dir:
+            path = self._path(content_hash, model)
+            if path.exists():
+                try:
+                    analysis = json.loads(path.read_text(encoding='utf-8'))
+                except (OSError, json.JSONDecodeError):
+                    return None
+                with self._lock:
+                    self._memory[key] = analysis
+                return analysis
+        return None
+
+    def put(self, content_hash: str, model: str, analysis: Dict[str, Any]):
+        with self._lock:
+            self._memory[(content_hash, model)] = analysis
+
+        if self.cache_dir:
+            path = self._path(content_hash, model)
+            # 여러 스레드/프로세스가 같은 이미지를 동시에 저장해도 겹치지 않도록 임시 파일 이름을 매번 새로 만듦
+            with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=self.cache_dir, prefix=path.name + '.', suffix='.tmp', delete=False
+            ) as f:
+                tmp_path = f.name
+                try:
+                    json.dump(analysis, f, indent=2, ensure_ascii=False)
+                except BaseException:
+                    f.close()
+                    os.unlink(tmp_path)
+                    raise
+            os.replace(tmp_path, path)
+
+
+class StagedPromptGenerator:
+    """분석 캐시를 사용하는 2단계 프롬프트 생성기"""
+
+    def __init__(
+        self,
+        generator: Optional[GeminiPromptGenerator] = None,
+        cache: Optional[AnalysisCache] = None,
+        analysis_thinking: str = 'off'
+    ):
+        """
+        초기화
+
+        Args:
+            generator: GeminiPromptGenerator (클라이언트/설정 공유, 없으면 새로 생성)
+            cache: 분석 캐시 (없으면 기본 폴더 사용)
+            analysis_thinking: 1단계 분석 호출의 thinking 설정 (묘사 위주라 기본 off)
+        """
+        self.generator = generator or GeminiPromptGenerator()
+        self.cache = cache or AnalysisCache()
+        self.analysis_thinking = analysis_thinking
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        """내부 generator의 서킷 브레이커 (watch_folder 등 worker에서 대기용)"""
+        return self.generator.breaker
+
+    def analyze_image(self, image_path: str) -> Dict[str, Any]:
+        """
+        1단계: 이미지 분석 (캐시에 있으면 API 호출 없음)
+
+        Args:
+            image_path: 이미지 파일 경로
+
+        Returns:
+            분석 결과 딕셔너리 (ANALYSIS_FIELDS + usage + cached 여부, 캐시 적중이면 usage는 None)
+        """
+        # 모델마다 분석 결과가 다르므로 요청할 모델 기준으로 조회
+        # (라우터가 다른 제공자로 넘어가 답한 결과는 그 모델 이름으로 저장되어 여기서 섞이지 않음)
+        model = self.generator.provider.model
+        content_hash = compute_file_hash(image_path)
+        cached = self.cache.get(content_hash, model)
+        if cached is not None:
+            return dict(cached, usage=None, cached=True)
+
+        image_parts = self.generator._create_image_parts([image_path])
+        contents = [Part.from_text(text=create_analysis_prompt())] + image_parts
+
+        response_text, usage = self.generator._call_model(
+            contents, ANALYSIS_MAX_OUTPUT_TOKENS, ANALYSIS_SCHEMA, self.analysis_thinking
+        )
+        parsed = parse_json_response(response_text)
+
+        analysis = {field: str(parsed.get(field) or '') for field in ANALYSIS_FIELDS}
+        # 잘리거나 일부 필드가 빠진 분석은 캐시하지 않음 (다음 호출에서 다시 분석)
+        # usage는 이번 호출의 비용이므로 캐시에 넣지 않음 (적중 시 비용이 다시 집계되지 않도록)
+        if all(analysis[field] for field in ANALYSIS_FIELDS):
+            self.cache.put(content_hash, usage.get('model') or model, analysis)
+        return dict(analysis, usage=usage, cached=False)
+
+    def compose(
+        self,
+        analyses: List[Dict[str, Any]],
+        user_text: str,
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        max_words: Optional[int] = None,
+        thinking: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        2단계: 분석 결과 + 사용자 텍스트로 프롬프트 작성 (텍스트 전용 호출)
+
+        Args:
+            analyses: analyze_image() 결과 리스트
+            user_text: 사용자 텍스트
+            output_profile: 출력 프로필 이름
+            max_words: 프롬프트 최대 단어 수
+            thinking: thinking 설정
+
+        Returns:
+            generate_prompt()와 같은 구조의 결과
+        """
+        profile = get_output_profile(output_profile, max_words)
+
+        references = [
+            {'image': index + 1, **{field: analysis.get(field, '') for field in ANALYSIS_FIELDS}}
+            for index, analysis in enumerate(analyses)
+        ]
+        template = self.generator.prompt_template
+        user_message = build_compose_message(
+            template, json.dumps(references, indent=2, ensure_ascii=False), user_text
+        )
+
+        contents = [
+            Part.from_text(text=create_compose_prompt(profile, template)),
+            Part.from_text(text=user_message),
+        ]
+        response_text, usage = self.generator._call_model(
+            contents, profile['max_output_tokens'], build_response_schema(profile), thinking
+        )
+
+        result, parse_path = parse_prompt_response(response_text)
+        result = normalize_result(result, profile, len(analyses), user_text)
+        result['meta']['engine'] = usage['model']
+        result['meta']['prompt_template'] = template['name']
+        result['meta']['usage'] = usage
+        result['meta']['parse_path'] = parse_path
+
+        if result['meta']['missing_fields']:
+            result = self.generator._complete_missing_fields(result, profile, user_text, thinking)
+        return result
+
+    def generate_prompt(
+        self,
+        image_paths: List[str],
+        user_text: str,
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        max_words: Optional[int] = None,
+        thinking: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        프롬프트 생성 (GeminiPromptGenerator.generate_prompt와 같은 인터페이스)
+
+        Returns:
+            생성된 프롬프트 JSON 딕셔너리
+            (meta.pipeline = 'two_stage', meta.analysis_cache_hits = 캐시 적중 이미지 수)
+        """
+        # 입력 검증
+        if not image_paths:
+            raise ValueError("최소 1개의 이미지가 필요합니다.")
+
+        if len(image_paths) > 3:
+            raise ValueError("최대 3개의 이미지만 지원합니다.")
+
+        if not user_text or not user_text.strip():
+            raise ValueError("텍스트 명령어를 입력하세요.")
+
+        self.breaker.reject_if_open()
+
+        try:
+            analyses = [self.analyze_image(path) for path in image_paths]
+            result = self.compose(analyses, user_text, output_profile, max_words, thinking)
+
+            result['meta']['pipeline'] = 'two_stage'
+            result['meta']['analysis_cache_hits'] = sum(1 for a in analyses if a['cached'])
+            return result
+
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"프롬프트 생성 실패: {str(e)}")
@@ -0,0 +1,623 @@
+"""
+대량 작업용 Batch 모드
+수만 장 단위의 오프라인 작업을 Gemini batch prediction으로 제출하고,
+작업 ID를 저장해 두었다가 결과를 받아 입력 행과 매칭
+
+사용 예:
+    python batch_jobs.py submit rows.csv --profile compact
+    python batch_jobs.py status
+    python batch_jobs.py wait
+    python batch_jobs.py collect results.jsonl
+
+rows.csv 형식 (헤더 필수): id,images,user_text  (images는 ';'로 구분)
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import uuid
+import base64
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from health import CircuitBreaker, CircuitOpenError
+from output_profiles import DEFAULT_OUTPUT_PROFILE, get_output_profile, normalize_result
+
+
+# 배치 1개당 최대 요청 수 / 입력 파일 크기 (Gemini batch 입력 파일 제한 2GB보다 여유 있게)
+MAX_REQUESTS_PER_BATCH = 5000
+MAX_BATCH_BYTES = 1500 * 1024 * 1024
+
+DEFAULT_STATE_DIR = 'batch_jobs'
+
+# 작업 상태 (provider 상태를 이 값으로 정규화)
+STATE_PENDING = 'pending'
+STATE_RUNNING = 'running'
+STATE_SUCCEEDED = 'succeeded'
+STATE_FAILED = 'failed'
+STATE_COLLECTED = 'collected'
+
+_FINISHED_STATES = {STATE_SUCCEEDED, STATE_FAILED, STATE_COLLECTED}
+
+_GEMINI_STATES = {
+    'JOB_STATE_QUEUED': STATE_PENDING,
+    'JOB_STATE_PENDING': STATE_PENDING,
+    'JOB_STATE_RUNNING': STATE_RUNNING,
+    'JOB_STATE_UPDATING': STATE_RUNNING,
+    'JOB_STATE_PAUSED': STATE_RUNNING,
+    'JOB_STATE_CANCELLING': STATE_RUNNING,
+    'JOB_STATE_SUCCEEDED': STATE_SUCCEEDED,
+    'JOB_STATE_PARTIALLY_SUCCEEDED': STATE_SUCCEEDED,
+    'JOB_STATE_FAILED': STATE_FAILED,
+    'JOB_STATE_CANCELLED': STATE_FAILED,
+    'JOB_STATE_EXPIRED': STATE_FAILED,
+}
+
+
+class BatchBackend:
+    """batch 제출/조회/결과 다운로드 인터페이스"""
+
+    def submit(self, requests_path: Path, display_name: str) -> str:
+        """요청 JSONL 파일을 제출하고 작업 이름(ID) 반환"""
+        raise NotImplementedError
+
+    def status(self, job_name: str) -> Tuple[str, Optional[str]]:
+        """작업 상태 조회 → (정규화된 상태, 오류 메시지)"""
+        raise NotImplementedError
+
+    def download(self, job_name: str) -> str:
+        """완료된 작업의 결과 JSONL 내용 반환"""
+        raise NotImplementedError
+
+
+class GeminiBatchBackend(BatchBackend):
+    """Gemini batch prediction (파일 업로드 → batches.create)"""
+
+    def __init__(self, client, model: str = 'gemini-2.5-flash'):
+        """
+        Args:
+            client: google.genai.Client
+            model: 모델 이름
+        """
+        if client is None:
+            raise ValueError("Batch 예측은 Gemini API에서만 지원됩니다. (GEMINI_API_KEY 필요)")
+        self.client = client
+        self.model = model
+
+    def submit(self, requests_path: Path, display_name: str) -> str:
+        uploaded = self.client.files.upload(
+            file=str(requests_path),
+            config={'display_name': display_name, 'mime_type': 'jsonl'}
+        )
+        job = self.client.batches.create(
+            model=self.model,
+            src=uploaded.name,
+            config={'display_name': display_name}
+        )
+        return job.name
+
+    def status(self, job_name: str) -> Tuple[str, Optional[str]]:
+        job = self.client.batches.get(name=job_name)
+        state_name = getattr(job.state, 'name', str(job.state))
+        error = str(job.error) if job.error else None
+        return _GEMINI_STATES.get(state_name, STATE_PENDING), error
+
+    def download(self, job_name: str) -> str:
+        job = self.client.batches.get(name=job_name)
+        if not job.dest or not job.dest.file_name:
+            raise ValueError(f"결과 파일이 없습니다: {job_name}")
+        data = self.client.files.download(file=job.dest.file_name)
+        return data.decode('utf-8')
+
+
+class LocalBatchBackend(BatchBackend):
+    """
+    로컬 대체 backend (테스트용)
+
+    제출된 요청을 responder로 처리하여 Gemini batch와 같은 형식의 결과 JSONL을 만듦.
+    polls_until_done 횟수만큼 status를 조회해야 완료되어 polling 흐름도 재현됨.
+    """
+
+    def __init__(
+        self,
+        work_dir: str,
+        responder: Optional[Callable[[Dict[str, Any]], str]] = None,
+        polls_until_done: int = 1
+    ):
+        """
+        Args:
+            work_dir: 작업 파일을 저장할 폴더
+            responder: 요청(dict) → 응답 텍스트 함수 (없으면 고정 응답)
+            polls_until_done: 완료까지 필요한 status 조회 횟수
+        """
+        self.work_dir = Path(work_dir)
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.responder = responder or _echo_responder
+        self.polls_until_done = polls_until_done
+
+    def _job_dir(self, job_name: str) -> Path:
+        return self.work_dir / job_name.replace('/', '_')
+
+    def submit(self, requests_path: Path, display_name: str) -> str:
+        job_name = f"batches/local-{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+        job_dir = self._job_dir(job_name)
+        job_dir.mkdir(parents=True)
+
+        # 요청 파일이 클 수 있으므로 한 줄씩 읽어 바로 결과 파일에 씀
+        with open(requests_path, encoding='utf-8') as f, \
+                open(job_dir / 'results.jsonl', 'w', encoding='utf-8') as out:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                try:
+                    text = self.responder(entry['request'])
+                    record = {'key': entry['key'], 'response': {
+                        'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'}}],
+                        'usageMetadata': {'promptTokenCount': 0, 'candidatesTokenCount': len(text) // 4},
+                    }}
+                except Exception as e:
+                    record = {'key': entry['key'], 'error': {'message': str(e)}}
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+        (job_dir / 'polls').write_text('0', encoding='utf-8')
+        return job_name
+
+    def status(self, job_name: str) -> Tuple[str, Optional[str]]:
+        polls_file = self._job_dir(job_name) / 'polls'
+        if not polls_file.exists():
+            return STATE_FAILED, f"알 수 없는 작업: {job_name}"
+
+        polls = int(polls_file.read_text()) + 1
+        polls_file.write_text(str(polls))
+        return (STATE_SUCCEEDED if polls >= self.polls_until_done else STATE_RUNNING), None
+
+    def download(self, job_name: str) -> str:
+        return (self._job_dir(job_name) / 'results.jsonl').read_text(encoding='utf-8')
+
+
+def _echo_responder(request: Dict[str, Any]) -> str:
+    """LocalBatchBackend 기본 응답 (요청 텍스트 일부를 final_prompt로 반환)"""
+    texts = [p['text'] for c in request.get('contents', []) for p in c.get('parts', []) if 'text' in p]
+    return json.dumps({'prompts': {'final_prompt': f"local stand-in: {texts[-1].strip()[:60]}"}})
+
+
+def config_to_rest(config) -> Dict[str, Any]:
+    """
+    GenerateContentConfig → batch 요청 파일용 REST generationConfig
+
+    Args:
+        config: GenerateContentConfig
+
+    Returns:
+        REST 형식 딕셔너리 (camelCase)
+    """
+    def camel(name: str) -> str:
+        head, *rest = name.split('_')
+        return head + ''.join(word.capitalize() for word in rest)
+
+    def convert(value, keep_keys: bool = False):
+        # properties 아래의 키는 필드 이름이므로 그대로 유지
+        if isinstance(value, dict):
+            return {
+                (k if keep_keys else camel(k)): convert(v, keep_keys=(k == 'properties' and not keep_keys))
+                for k, v in value.items()
+            }
+        if isinstance(value, list):
+            return [convert(v) for v in value]
+        return value
+
+    rest = {}
+    for field in ('temperature', 'top_p', 'top_k', 'max_output_tokens', 'response_mime_type', 'response_schema'):
+        value = getattr(config, field, None)
+        if value is not None:
+            rest[camel(field)] = convert(value)
+
+    if config.thinking_config is not None and config.thinking_config.thinking_budget is not None:
+        rest['thinkingConfig'] = {'thinkingBudget': config.thinking_config.thinking_budget}
+
+    return rest
+
+
+def build_batch_request(
+    generator,
+    key: str,
+    image_paths: List[str],
+    user_text: str,
+    profile: Dict[str, Any],
+    thinking_budget: Optional[int]
+) -> Dict[str, Any]:
+    """
+    입력 1행을 batch 요청 파일 1줄로 변환 (generate_prompt와 같은 프롬프트/설정 사용)
+
+    Args:
+        generator: GeminiPromptGenerator
+        key: 결과 매칭용 키 (입력 행 ID)
+        image_paths: 이미지 경로 리스트
+        user_text: 사용자 텍스트
+        profile: 출력 프로필
+        thinking_budget: thinking 예산
+
+    Returns:
+        {"key": ..., "request": {...}}
+    """
+    parts = [
+        {'text': generator._create_system_prompt(profile)},
+        {'text': generator._create_user_message(user_text)},
+    ]
+    for path in image_paths:
+        data, mime_type = generator._prepare_image(path)
+        parts.append({'inlineData': {'mimeType': mime_type, 'data': base64.b64encode(data).decode('ascii')}})
+
+    return {
+        'key': key,
+        'request': {
+            'contents': [{'role': 'user', 'parts': parts}],
+            'generationConfig': config_to_rest(generator._create_config(profile, thinking_budget)),
+        },
+    }
+
+
+def response_text(response: Dict[str, Any]) -> str:
+    """REST 형식 응답에서 텍스트 추출 (thought 파트 제외)"""
+    candidates = response.get('candidates') or []
+    if not candidates:
+        raise ValueError("응답 후보가 없습니다.")
+    parts = (candidates[0].get('content') or {}).get('parts') or []
+    return ''.join(p.get('text', '') for p in parts if not p.get('thought'))
+
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    """
+    입력 행 읽기 (CSV: id,images,user_text / JSONL: {"id", "images", "user_text"})
+
+    Returns:
+        [{'id', 'image_paths', 'user_text'}, ...]
+    """
+    rows = []
+    if path.endswith('.jsonl'):
+        with open(path, encoding='utf-8') as f:
+            records = [json.loads(line) for line in f if line.strip()]
+    else:
+        with open(path, encoding='utf-8-sig', newline='') as f:
+            records = list(csv.DictReader(f))
+
+    for record in records:
+        images = record['images']
+        if isinstance(images, str):
+            images = [p.strip() for p in images.split(';') if p.strip()]
+        rows.append({'id': str(record['id']), 'image_paths': images, 'user_text': record['user_text']})
+    return rows
+
+
+class BatchRunner:
+    """batch 제출 → 상태 저장 → 조회 → 결과 수집"""
+
+    def __init__(self, generator, backend: Optional[BatchBackend] = None, state_dir: str = DEFAULT_STATE_DIR):
+        """
+        Args:
+            generator: GeminiPromptGenerator (프롬프트/설정/이미지 변환에 사용)
+            backend: batch backend (없으면 generator.client로 Gemini backend 생성)
+            state_dir: 요청 파일 및 작업 상태(state.json) 저장 폴더
+        """
+        self.generator = generator
+        self.backend = backend or GeminiBatchBackend(generator.client)
+        # 상태 조회가 연속 실패하면 조회를 잠시 멈춤
+        self.breaker = CircuitBreaker()
+        self.state_dir = Path(state_dir)
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.state_path = self.state_dir / 'state.json'
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, Any]:
+        if self.state_path.exists():
+            return json.loads(self.state_path.read_text(encoding='utf-8'))
+        return {'jobs': [], 'rejected': []}
+
+    def _save_state(self):
+        # 중간에 종료되어도 state 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = self.state_path.with_suffix('.tmp')
+        tmp_path.write_text(json.dumps(self.state, indent=2, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_path, self.state_path)
+
+    def submit(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        thinking: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        입력 행을 batch 요청 파일로 묶어 제출
+
+        Args:
+            rows: [{'id', 'image_paths', 'user_text'}, ...]
+            output_profile: 출력 프로필 이름
+            thinking: thinking 설정
+
+        Returns:
+            제출된 작업 정보 리스트 (이미지 오류 행은 state의 'rejected'에 기록, collect()에서 오류로 출력)
+        """
+        profile = get_output_profile(output_profile)
+        thinking_budget = self.generator.thinking.budget_for(thinking)
+        # 같은 초에 여러 번 제출해도 state 파일 이름이 겹치지 않도록 임의 접미사 추가
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+        submitted = []
+        rejected = []
+        seen_ids = set()
+        # 요청 줄은 base64 이미지를 포함하므로 메모리에 모으지 않고 바로 파일에 씀 (묶음당 최대 수 GB)
+        chunk_file = None
+        chunk_path: Optional[Path] = None
+        chunk_rows: Dict[str, Dict[str, Any]] = {}
+        chunk_bytes = 0
+
+        def flush():
+            nonlocal chunk_file, chunk_path, chunk_rows, chunk_bytes
+            if chunk_file is not None:
+                chunk_file.close()
+                submitted.append(self._submit_chunk(run_id, len(submitted), chunk_path, chunk_rows, profile['name']))
+            chunk_file, chunk_path, chunk_rows, chunk_bytes = None, None, {}, 0
+
+        try:
+            for row in rows:
+                if row['id'] in seen_ids:
+                    raise ValueError(f"중복된 행 ID입니다: {row['id']}")
+                seen_ids.add(row['id'])
+                try:
+                    line = json.dumps(build_batch_request(
+                        self.generator, row['id'], row['image_paths'], row['user_text'], profile, thinking_budget
+                    ), ensure_ascii=False).encode('utf-8') + b'\n'
+                except Exception as e:
+                    rejected.append({'id': row['id'], 'error': str(e)})
+                    continue
+
+                if chunk_file is not None and (
+                    len(chunk_rows) >= MAX_REQUESTS_PER_BATCH or chunk_bytes + len(line) > MAX_BATCH_BYTES
+                ):
+                    flush()
+
+                if chunk_file is None:
+                    chunk_path = self.state_dir / f'{run_id}_{len(submitted):03d}_requests.jsonl'
+                    chunk_file = open(chunk_path, 'wb')
+                chunk_file.write(line)
+                chunk_bytes += len(line)
+                chunk_rows[row['id']] = {'image_count': len(row['image_paths']), 'user_text': row['user_text']}
+
+            flush()
+        finally:
+            if chunk_file is not None:
+                chunk_file.close()
+
+        if rejected:
+            (self.state_dir / f'{run_id}_rejected.json').write_text(
+                json.dumps(rejected, indent=2, ensure_ascii=False), encoding='utf-8'
+            )
+            self.state.setdefault('rejected', []).append({
+                'run_id': run_id, 'rows_file': f'{run_id}_rejected.json', 'collected': False,
+            })
+            self._save_state()
+        return submitted
+
+    def _submit_chunk(
+        self,
+        run_id: str,
+        index: int,
+        requests_path: Path,
+        rows: Dict[str, Dict[str, Any]],
+        profile_name: str
+    ) -> Dict[str, Any]:
+        """다 쓴 요청 묶음 파일 1개를 제출한 뒤 state에 기록"""
+        rows_path = self.state_dir / f'{run_id}_{index:03d}_rows.json'
+        rows_path.write_text(json.dumps(rows, ensure_ascii=False), encoding='utf-8')
+
+        job_name = self.backend.submit(requests_path, f'promptmaker-{run_id}-{index:03d}')
+
+        job = {
+            'name': job_name,
+            'run_id': run_id,
+            'requests_file': requests_path.name,
+            'rows_file': rows_path.name,
+            'output_profile': profile_name,
+            'row_count': len(rows),
+            'state': STATE_PENDING,
+            'error': None,
+            'submitted_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.state['jobs'].append(job)
+        self._save_state()
+        return job
+
+    def poll(self) -> List[Dict[str, Any]]:
+        """
+        진행 중인 작업 상태 갱신
+
+        작업 하나의 조회가 실패해도 나머지는 계속 조회하고 (오류는 job['error']에 기록)
+        그때까지 갱신된 상태는 항상 저장함. 회로가 열려 있었다면 저장 후 CircuitOpenError를 다시 던짐
+        """
+        circuit_open: Optional[CircuitOpenError] = None
+        try:
+            for job in self.state['jobs']:
+                if job['state'] in _FINISHED_STATES:
+                    continue
+                try:
+                    job['state'], job['error'] = self.breaker.call(
+                        lambda name=job['name']: self.backend.status(name)
+                    )
+                except CircuitOpenError as e:
+                    circuit_open = e
+                    job['error'] = str(e)
+                except Exception as e:
+                    job['error'] = f"상태 조회 실패: {e}"
+                job['checked_at'] = datetime.now().isoformat(timespec='seconds')
+        finally:
+            self._save_state()
+        if circuit_open is not None:
+            raise circuit_open
+        return self.state['jobs']
+
+    def wait(self, interval: float = 60, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        모든 작업이 끝날 때까지 주기적으로 조회
+
+        Args:
+            interval: 조회 간격 (초)
+            timeout: 최대 대기 시간 (초, 없으면 무제한)
+        """
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            delay = interval
+            try:
+                jobs = self.poll()
+                if all(job['state'] in _FINISHED_STATES for job in jobs):
+                    return jobs
+            except CircuitOpenError as e:
+                # 연속 실패: 시험 조회가 가능해질 때까지 조회하지 않음
+                print(f"⚠️ {e}")
+                delay = max(interval, e.retry_after)
+            except Exception as e:
+                print(f"⚠️ 상태 조회 실패: {e}")
+            if deadline and time.time() >= deadline:
+                raise TimeoutError("batch 작업 대기 시간이 초과되었습니다.")
+            time.sleep(delay)
+
+    def collect(self, output_path: str) -> Dict[str, int]:
+        """
+        완료된 작업 결과를 받아 입력 행 ID와 매칭하여 JSONL로 추가 기록
+
+        각 줄: {"id": 행 ID, "result": 결과 JSON} 또는 {"id": 행 ID, "error": 오류 메시지}
+
+        Args:
+            output_path: 결과 JSONL 경로
+
+        Returns:
+            {'ok': 성공 수, 'error': 실패 수}
+        """
+        counts = {'ok': 0, 'error': 0}
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+
+        with open(output_path, 'a', encoding='utf-8') as out:
+            # 제출 전에 거부된 행 (이미지 오류 등) - 출력 행 수가 입력과 같도록 오류로 기록
+            for entry in self.state.get('rejected', []):
+                if entry['collected']:
+                    continue
+                rejected = json.loads((self.state_dir / entry['rows_file']).read_text(encoding='utf-8'))
+                for row in rejected:
+                    counts['error'] += 1
+                    out.write(json.dumps({'id': row['id'], 'error': row['error']}, ensure_ascii=False) + '\n')
+                entry['collected'] = True
+                self._save_state()
+
+            for job in self.state['jobs']:
+                if job['state'] != STATE_SUCCEEDED:
+                    continue
+
+                # 다운로드 전체를 먼저 파싱한 뒤 한 번에 기록
+                # (중간에 실패하면 아무것도 쓰지 않으므로 다시 collect해도 행이 중복되지 않음)
+                profile = get_output_profile(job['output_profile'])
+                rows = json.loads((self.state_dir / job['rows_file']).read_text(encoding='utf-8'))
+                records = []
+                seen = set()
+
+                for line in self.backend.download(job['name']).splitlines():
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    key = entry.get('key')
+                    row = rows.get(key)
+                    if row is None or key in seen:
+                        continue
+                    seen.add(key)
+                    records.append({'id': key, **self._parse_entry(entry, profile, row)})
+
+                # 결과가 없는 행도 오류로 기록
+                records.extend({'id': key, 'error': '결과 없음'} for key in rows if key not in seen)
+
+                for record in records:
+                    counts['ok' if 'result' in record else 'error'] += 1
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                out.flush()
+
+                job['state'] = STATE_COLLECTED
+                job['collected_at'] = datetime.now().isoformat(timespec='seconds')
+                self._save_state()
+
+        return counts
+
+    def _parse_entry(self, entry: Dict[str, Any], profile: Dict[str, Any], row: Dict[str, Any]) -> Dict[str, Any]:
+        """결과 1줄 → {'result': ...} 또는 {'error': ...}"""
+        from gemini_api import parse_json_response
+
+        if entry.get('error'):
+            return {'error': str(entry['error'])}
+        try:
+            response = entry['response']
+            result = parse_json_response(response_text(response))
+            result = normalize_result(result, profile, row['image_count'], row['user_text'])
+
+            usage = response.get('usageMetadata') or {}
+            result['meta']['usage'] = {
+                'prompt_tokens': usage.get('promptTokenCount', 0),
+                'output_tokens': usage.get('candidatesTokenCount', 0),
+                'thinking_tokens': usage.get('thoughtsTokenCount', 0),
+                'total_tokens': usage.get('totalTokenCount', 0),
+            }
+            return {'result': result}
+        except Exception as e:
+            return {'error': f"응답 파싱 실패: {e}"}
+
+
+def main():
+    from dotenv import load_dotenv
+    from gemini_api import GeminiPromptGenerator
+
+    parser = argparse.ArgumentParser(description="프롬프트 생성 batch 작업")
+    parser.add_argument('--state-dir', default=DEFAULT_STATE_DIR, help="작업 상태 저장 폴더")
+    parser.add_argument('--local', action='store_true', help="로컬 대체 backend 사용 (API 호출 없음)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    submit_cmd = sub.add_parser('submit', help="입력 행 제출")
+    submit_cmd.add_argument('rows', help="입력 파일 (CSV 또는 JSONL)")
+    submit_cmd.add_argument('--profile', default=DEFAULT_OUTPUT_PROFILE, help="출력 프로필")
+    submit_cmd.add_argument('--thinking', default=None, help="thinking 설정")
+
+    sub.add_parser('status', help="작업 상태 조회")
+
+    wait_cmd = sub.add_parser('wait', help="모든 작업 완료까지 대기")
+    wait_cmd.add_argument('--interval', type=float, default=60, help="조회 간격 (초)")
+
+    collect_cmd = sub.add_parser('collect', help="완료된 작업 결과 수집")
+    collect_cmd.add_argument('output', help="결과 JSONL 경로")
+
+    args = parser.parse_args()
+    load_dotenv()
+
+    api_key = 'local' if args.local else None
+    generator = GeminiPromptGenerator(api_key)
+    backend = LocalBatchBackend(Path(args.state_dir) / 'local') if args.local else None
+    runner = BatchRunner(generator, backend, args.state_dir)
+
+    if args.command == 'submit':
+        jobs = runner.submit(read_rows(args.rows), args.profile, args.thinking)
+        for job in jobs:
+            print(f"✅ 제출: {job['name']} ({job['row_count']}행)")
+    elif args.command == 'wait':
+        runner.wait(args.interval)
+        print("✅ 모든 작업 완료")
+    elif args.command == 'collect':
+        counts = runner.collect(args.output)
+        print(f"✅ 수집 완료: 성공 {counts['ok']}건, 실패 {counts['error']}건 → {args.output}")
+
+    if args.command in ('status', 'wait'):
+        for job in runner.poll():
+            error = f" - {job['error']}" if job.get('error') else ''
+            print(f"   {job['name']}: {job['state']} ({job['row_count']}행){error}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
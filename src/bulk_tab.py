@@ -0,0 +1,470 @@
+"""
+대량 생성 탭
+이미지 여러 장(파일/폴더/드래그 앤 드롭)을 목록에 넣고, 공통 텍스트(또는 항목별 텍스트)로
+동시 실행 수를 제한하여 한꺼번에 프롬프트를 생성
+
+- 작업 스레드는 Tk 위젯을 직접 건드리지 않고 이벤트 큐에 상태만 넣음
+- UI는 100ms마다 큐를 비우며 바뀐 행만 갱신 (수백 개여도 이벤트 루프가 밀리지 않음)
+- 드래그 앤 드롭은 tkinterdnd2가 설치되어 있을 때만 사용
+- '자동 조절'을 켜면 동시 실행 수를 상한으로 두고 응답 상태에 따라 한도를 조절 (concurrency.py)
+(GUI 시작 시 import되므로 무거운 모듈을 import하지 말 것)
+"""
+
+import json
+import queue
+import threading
+import time
+import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from tkinter import ttk, filedialog, messagebox, simpledialog
+from typing import Any, Dict, List, Optional
+
+from output_profiles import OUTPUT_PROFILES
+from thinking import THINKING_LABELS
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+
+DEFAULT_CONCURRENCY = 4
+MAX_CONCURRENCY = 16
+
+# 상태 표시
+STATUS_LABELS = {
+    'pending': '대기',
+    'running': '생성 중',
+    'done': '완료',
+    'error': '실패',
+    'cancelled': '취소',
+}
+
+# UI 갱신 주기 (ms)
+POLL_INTERVAL_MS = 100
+
+
+class BulkTab:
+    """대량 생성 탭 (PromptMakerApp의 API Key / 출력 형식 / thinking 설정 공유)"""
+
+    def __init__(self, parent, app):
+        """
+        Args:
+            parent: 탭을 넣을 ttk.Notebook
+            app: PromptMakerApp (Generator, 설정 변수, 출력 폴더 사용)
+        """
+        self.app = app
+        self.frame = ttk.Frame(parent, padding="10")
+
+        # iid → {'path', 'override', 'user_text'(실행 시 사용한 텍스트), 'status', 'elapsed', 'result', 'error'}
+        self.items: Dict[str, Dict[str, Any]] = {}
+        self._events: "queue.Queue[tuple]" = queue.Queue()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._cancel = threading.Event()
+        self._running = 0
+        self._run_started = 0.0
+        self._parse_stats_before: Dict[str, int] = {}
+
+        self.user_text_var = tk.StringVar()
+        self.concurrency_var = tk.IntVar(value=DEFAULT_CONCURRENCY)
+        self.adaptive_var = tk.BooleanVar(value=False)
+        self._limiter = None
+        self.summary_var = tk.StringVar(value="이미지를 추가하세요.")
+
+        self._create_widgets()
+        self._dnd_enabled = self._enable_drop()
+        if self._dnd_enabled:
+            self.summary_var.set("이미지 파일이나 폴더를 목록으로 끌어다 놓거나 추가 버튼을 사용하세요.")
+
+    def _create_widgets(self):
+        frame = self.frame
+        frame.columnconfigure(0, weight=1)
+        frame.rowconfigure(1, weight=1)
+
+        # === 목록 편집 버튼 ===
+        toolbar = ttk.Frame(frame)
+        toolbar.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        self.add_files_btn = ttk.Button(toolbar, text="파일 추가...", command=self._add_files)
+        self.add_files_btn.pack(side=tk.LEFT)
+        self.add_folder_btn = ttk.Button(toolbar, text="폴더 추가...", command=self._add_folder)
+        self.add_folder_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(toolbar, text="선택 삭제", command=self._remove_selected).pack(side=tk.LEFT)
+        ttk.Button(toolbar, text="모두 비우기", command=self._clear).pack(side=tk.LEFT, padx=5)
+        ttk.Label(
+            toolbar, text="더블클릭: 항목별 텍스트 지정", font=("맑은 고딕", 8), foreground="gray"
+        ).pack(side=tk.RIGHT)
+
+        # === 항목 목록 (Treeview는 보이는 행만 그림) ===
+        list_frame = ttk.Frame(frame)
+        list_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        list_frame.columnconfigure(0, weight=1)
+        list_frame.rowconfigure(0, weight=1)
+
+        columns = ('file', 'status', 'elapsed', 'text', 'prompt')
+        self.tree = ttk.Treeview(list_frame, columns=columns, show='headings', selectmode='extended')
+        for column, heading, width, stretch in [
+            ('file', '파일', 180, False),
+            ('status', '상태', 70, False),
+            ('elapsed', '소요 시간', 70, False),
+            ('text', '텍스트', 180, False),
+            ('prompt', 'final_prompt', 300, True),
+        ]:
+            self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width, stretch=stretch, anchor=tk.W)
+        self.tree.tag_configure('error', foreground='#c0392b')
+        self.tree.tag_configure('done', foreground='#1e7e34')
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.tree.bind('<Double-1>', self._edit_override)
+
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        # === 공통 텍스트 / 옵션 ===
+        options = ttk.LabelFrame(frame, text="✍️ 공통 스타일/장면 (항목별 텍스트가 없으면 사용)", padding="10")
+        options.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(10, 0))
+        options.columnconfigure(1, weight=1)
+
+        ttk.Entry(options, textvariable=self.user_text_var, font=("맑은 고딕", 10)).grid(
+            row=0, column=0, columnspan=7, sticky=(tk.W, tk.E), pady=(0, 5)
+        )
+
+        ttk.Label(options, text="출력 형식:").grid(row=1, column=0, sticky=tk.W, padx=(0, 5))
+        ttk.Combobox(
+            options,
+            textvariable=self.app.output_profile_var,
+            values=[profile['label'] for profile in OUTPUT_PROFILES.values()],
+            state="readonly",
+            width=22
+        ).grid(row=1, column=1, sticky=tk.W)
+
+        ttk.Label(options, text="추론(thinking):").grid(row=1, column=2, sticky=tk.W, padx=(20, 5))
+        ttk.Combobox(
+            options,
+            textvariable=self.app.thinking_var,
+            values=list(THINKING_LABELS.values()),
+            state="readonly",
+            width=22
+        ).grid(row=1, column=3, sticky=tk.W)
+
+        ttk.Label(options, text="동시 실행:").grid(row=1, column=4, sticky=tk.W, padx=(20, 5))
+        ttk.Spinbox(
+            options, from_=1, to=MAX_CONCURRENCY, textvariable=self.concurrency_var, width=4, state="readonly"
+        ).grid(row=1, column=5, sticky=tk.W)
+        ttk.Checkbutton(options, text="자동 조절", variable=self.adaptive_var).grid(
+            row=1, column=6, sticky=tk.W, padx=(10, 0)
+        )
+
+        # === 실행 버튼 ===
+        buttons = ttk.Frame(frame)
+        buttons.grid(row=3, column=0, pady=10)
+        self.run_btn = ttk.Button(buttons, text="🚀 전체 생성", command=self._run_all)
+        self.run_btn.pack(side=tk.LEFT, padx=5)
+        self.cancel_btn = ttk.Button(buttons, text="⏹ 중지", command=self._cancel_run, state=tk.DISABLED)
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="🔁 실패 항목 다시", command=lambda: self._run_all(retry_failed=True)).pack(
+            side=tk.LEFT, padx=5
+        )
+        ttk.Button(buttons, text="💾 모두 내보내기", command=self._export_all).pack(side=tk.LEFT, padx=5)
+
+        self.progress_bar = ttk.Progressbar(frame, mode='determinate')
+        self.progress_bar.grid(row=4, column=0, sticky=(tk.W, tk.E))
+        ttk.Label(frame, textvariable=self.summary_var, anchor=tk.W).grid(
+            row=5, column=0, sticky=(tk.W, tk.E), pady=(5, 0)
+        )
+
+    def _enable_drop(self) -> bool:
+        """tkinterdnd2가 있으면 목록에 파일/폴더 드롭 허용"""
+        try:
+            from tkinterdnd2 import DND_FILES, TkinterDnD
+
+            TkinterDnD._require(self.frame.winfo_toplevel())
+            self.tree.drop_target_register(DND_FILES)
+            self.tree.dnd_bind('<<Drop>>', self._on_drop)
+            return True
+        except Exception:
+            return False
+
+    # === 목록 편집 ===
+
+    def _on_drop(self, event):
+        self.add_paths(self.frame.tk.splitlist(event.data))
+        return event.action
+
+    def _add_files(self):
+        paths = filedialog.askopenfilenames(
+            title="이미지 추가",
+            filetypes=[("이미지 파일", "*.jpg *.jpeg *.png *.webp"), ("모든 파일", "*.*")]
+        )
+        self.add_paths(paths)
+
+    def _add_folder(self):
+        folder = filedialog.askdirectory(title="이미지 폴더 추가")
+        if folder:
+            self.add_paths([folder])
+
+    def add_paths(self, paths: List[str]):
+        """
+        파일/폴더 경로를 목록에 추가 (폴더는 하위 이미지까지, 이미 있는 파일은 건너뜀)
+
+        Args:
+            paths: 파일 또는 폴더 경로 리스트
+        """
+        # 실행 중에는 목록을 바꾸지 않음 (진행률/완료 집계가 실행 시작 시점의 목록 기준)
+        if self._running:
+            return
+        existing = {item['path'] for item in self.items.values()}
+        added = 0
+        for raw in paths:
+            path = Path(raw)
+            candidates = sorted(p for p in path.rglob('*') if p.is_file()) if path.is_dir() else [path]
+            for candidate in candidates:
+                if candidate.suffix.lower() not in IMAGE_EXTENSIONS or str(candidate) in existing:
+                    continue
+                existing.add(str(candidate))
+                iid = self.tree.insert('', tk.END, values=(candidate.name, STATUS_LABELS['pending'], '', '', ''))
+                self.items[iid] = {
+                    'path': str(candidate), 'override': None, 'user_text': None, 'status': 'pending',
+                    'elapsed': None, 'result': None, 'error': None,
+                }
+                added += 1
+
+        self._update_summary(f"{added}개 추가됨")
+
+    def _remove_selected(self):
+        if self._running:
+            return
+        for iid in self.tree.selection():
+            self.tree.delete(iid)
+            self.items.pop(iid, None)
+        self._update_summary()
+
+    def _clear(self):
+        if self._running:
+            return
+        self.tree.delete(*self.tree.get_children())
+        self.items.clear()
+        self._update_summary()
+
+    def _edit_override(self, event):
+        iid = self.tree.identify_row(event.y)
+        if not iid or self._running:
+            return
+        item = self.items[iid]
+        text = simpledialog.askstring(
+            "항목별 텍스트",
+            f"{Path(item['path']).name}에만 사용할 스타일/장면 (비우면 공통 텍스트 사용):",
+            initialvalue=item['override'] or '',
+            parent=self.frame
+        )
+        if text is None:
+            return
+        item['override'] = text.strip() or None
+        self.tree.set(iid, 'text', item['override'] or '')
+
+    # === 실행 ===
+
+    def _run_all(self, retry_failed: bool = False):
+        if self._running:
+            return
+
+        api_key = self.app.api_key_var.get().strip()
+        if not api_key:
+            messagebox.showwarning("경고", "API Key를 입력하세요.")
+            return
+
+        targets = ('error', 'cancelled') if retry_failed else ('pending', 'error', 'cancelled')
+        iids = [iid for iid, item in self.items.items() if item['status'] in targets]
+        if not iids:
+            messagebox.showinfo("알림", "생성할 항목이 없습니다.")
+            return
+
+        user_text = self.user_text_var.get().strip()
+        if not user_text and any(not self.items[iid]['override'] for iid in iids):
+            messagebox.showwarning("경고", "공통 텍스트를 입력하거나 모든 항목에 텍스트를 지정하세요.")
+            return
+
+        output_profile = self.app._selected_output_profile()
+        thinking = self.app._selected_thinking()
+        reuse_analysis = self.app.reuse_analysis_var.get()
+        concurrency = max(1, min(MAX_CONCURRENCY, int(self.concurrency_var.get())))
+        adaptive = self.adaptive_var.get()
+
+        for iid in iids:
+            # 실제로 사용한 텍스트를 남겨 둠 (내보내기 시점에 공통 텍스트가 바뀌어도 결과와 맞도록)
+            self.items[iid]['user_text'] = self.items[iid]['override'] or user_text
+            self._set_status(iid, 'pending', elapsed=None, result=None, error=None)
+
+        self._cancel.clear()
+        self._running = len(iids)
+        self._run_started = time.time()
+        # 이번 실행의 파싱 경로 집계 기준점 (응답 복구/후속 호출이 얼마나 있었는지 완료 시 표시)
+        from response_parser import get_parse_stats
+        self._parse_stats_before = get_parse_stats()
+        self.run_btn.config(state=tk.DISABLED)
+        self.add_files_btn.config(state=tk.DISABLED)
+        self.add_folder_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.progress_bar.config(maximum=len(self.items), value=self._count('done', 'error'))
+
+        def run():
+            try:
+                if reuse_analysis:
+                    generator = self.app._get_staged_generator(api_key)
+                else:
+                    generator = self.app._get_generator(api_key)
+            except Exception as e:
+                for iid in iids:
+                    self._events.put((iid, 'error', None, None, str(e)))
+                return
+
+            if adaptive:
+                from concurrency import AdaptiveLimiter
+
+                # 스레드는 상한만큼 두고 실제 동시 호출 수는 limiter가 결정
+                self._limiter = AdaptiveLimiter(max_limit=concurrency)
+            else:
+                self._limiter = None
+
+            self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='bulk')
+            for iid in iids:
+                item = self.items[iid]
+                self._executor.submit(
+                    self._generate_one, generator, iid, item['path'],
+                    item['user_text'], output_profile, thinking, self._limiter
+                )
+            self._executor.shutdown(wait=False)
+
+        threading.Thread(target=run, daemon=True).start()
+        self.frame.after(POLL_INTERVAL_MS, self._poll_events)
+
+    def _generate_one(
+        self, generator, iid: str, path: str, user_text: str, output_profile: str, thinking: str, limiter=None
+    ):
+        """작업 스레드: 항목 1개 생성 (UI는 이벤트 큐로만 갱신)"""
+        permit = limiter.acquire() if limiter else None
+        if self._cancel.is_set():
+            if permit:
+                limiter.release(permit, record=False)
+            self._events.put((iid, 'cancelled', None, None, None))
+            return
+
+        self._events.put((iid, 'running', None, None, None))
+        started = time.perf_counter()
+        error = None
+        try:
+            result = generator.generate_prompt([path], user_text, output_profile=output_profile, thinking=thinking)
+            self._events.put((iid, 'done', time.perf_counter() - started, result, None))
+        except Exception as e:
+            error = e
+            self._events.put((iid, 'error', time.perf_counter() - started, None, str(e)))
+        finally:
+            if permit:
+                limiter.release(permit, error)
+
+    def _cancel_run(self):
+        """대기 중인 항목 취소 (진행 중인 호출은 끝까지 기다림)"""
+        self._cancel.set()
+        self.cancel_btn.config(state=tk.DISABLED)
+        self._update_summary("중지 중... (진행 중인 항목이 끝나면 멈춥니다)")
+
+    def _poll_events(self):
+        """이벤트 큐를 비우며 바뀐 행만 갱신"""
+        finished = 0
+        try:
+            while True:
+                iid, status, elapsed, result, error = self._events.get_nowait()
+                if iid not in self.items:
+                    continue
+                self._set_status(iid, status, elapsed=elapsed, result=result, error=error)
+                if status in ('done', 'error', 'cancelled'):
+                    finished += 1
+        except queue.Empty:
+            pass
+
+        self._running = max(0, self._running - finished)
+        self.progress_bar.config(value=self._count('done', 'error'))
+
+        if self._running:
+            elapsed = int(time.time() - self._run_started)
+            limit = f" (자동 한도 {self._limiter.limit}개)" if self._limiter else ''
+            self._update_summary(
+                f"진행 중 {self._count('running')}개{limit}, 남은 항목 {self._running}개, 경과 {elapsed}초"
+            )
+            self.frame.after(POLL_INTERVAL_MS, self._poll_events)
+        else:
+            self._executor = None
+            self.run_btn.config(state=tk.NORMAL)
+            self.add_files_btn.config(state=tk.NORMAL)
+            self.add_folder_btn.config(state=tk.NORMAL)
+            self.cancel_btn.config(state=tk.DISABLED)
+            from response_parser import format_parse_stats, parse_stats_since
+
+            parse_paths = format_parse_stats(parse_stats_since(self._parse_stats_before))
+            self._update_summary(
+                f"완료 (총 {int(time.time() - self._run_started)}초"
+                + (f", 파싱 경로: {parse_paths}" if parse_paths else '') + ")"
+            )
+
+    def _set_status(self, iid: str, status: str, elapsed=None, result=None, error=None):
+        item = self.items[iid]
+        item.update(status=status, elapsed=elapsed, result=result, error=error)
+
+        if status == 'done':
+            prompt = (result.get('prompts') or {}).get('final_prompt') or ''
+        elif status == 'error':
+            prompt = error or ''
+        else:
+            prompt = ''
+        self.tree.item(iid, tags=(status,), values=(
+            Path(item['path']).name,
+            STATUS_LABELS[status],
+            f"{elapsed:.1f}초" if elapsed is not None else '',
+            item['override'] or '',
+            prompt.replace('\n', ' ')[:200],
+        ))
+
+    def _count(self, *statuses: str) -> int:
+        return sum(1 for item in self.items.values() if item['status'] in statuses)
+
+    def _update_summary(self, message: str = ''):
+        counts = f"전체 {len(self.items)}개 / 완료 {self._count('done')}개 / 실패 {self._count('error')}개"
+        self.summary_var.set(f"{counts}" + (f" - {message}" if message else ''))
+
+    # === 내보내기 ===
+
+    def _export_all(self):
+        """완료/실패 항목을 JSONL 1개로 저장 (1줄 = 1항목)"""
+        finished = [item for item in self.items.values() if item['status'] in ('done', 'error')]
+        if not finished:
+            messagebox.showwarning("경고", "내보낼 결과가 없습니다.")
+            return
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        file_path = filedialog.asksaveasfilename(
+            title="전체 결과 저장",
+            initialdir=self.app.output_dir,
+            initialfile=f"bulk_{timestamp}.jsonl",
+            defaultextension=".jsonl",
+            filetypes=[("JSON Lines", "*.jsonl"), ("모든 파일", "*.*")]
+        )
+        if not file_path:
+            return
+
+        try:
+            with open(file_path, 'w', encoding='utf-8') as f:
+                for item in finished:
+                    record = {
+                        'image': item['path'],
+                        'user_text': item['user_text'],
+                        'elapsed_seconds': round(item['elapsed'], 2) if item['elapsed'] is not None else None,
+                    }
+                    if item['status'] == 'done':
+                        record['result'] = item['result']
+                    else:
+                        record['error'] = item['error']
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+            messagebox.showinfo("성공", f"💾 {len(finished)}개 결과가 저장되었습니다:\n{file_path}")
+            self._update_summary(f"내보냄: {Path(file_path).name}")
+        except Exception as e:
+            messagebox.showerror("오류", f"저장 실패:\n{str(e)}")
@@ -0,0 +1,329 @@
+"""
+적응형 동시 실행 제한 (AIMD)
+generate_prompt를 병렬로 호출할 때 worker 수를 직접 고르지 않도록,
+응답 상태에 따라 허용 동시 호출 수를 자동으로 조절
+
+- 지연 시간과 오류율이 정상이고 한도까지 사용 중이면 한도를 조금씩 올림 (additive increase)
+- 쿼터 초과(429)/서킷 open이나 지연 시간 급증이 보이면 한도를 비율로 낮춤 (multiplicative decrease)
+- 스레드(acquire/call)와 asyncio(acquire_async/acall) 호출자가 같은 한도를 공유
+- 현재 한도와 변경 이력은 snapshot() / history로 조회
+
+사용 예:
+    limiter = AdaptiveLimiter(max_limit=16)
+    result = limiter.call(lambda: generator.generate_prompt(paths, text))
+    result = await limiter.acall(generator.generate_prompt, paths, text)
+"""
+
+import time
+import asyncio
+import functools
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from health import CircuitOpenError
+
+
+# 오류 메시지로 쿼터 초과를 판단할 때 사용하는 표식
+# (generate_prompt는 원래 예외를 "프롬프트 생성 실패: ..." 메시지로 감싸므로 code 속성이 없을 수 있음)
+_THROTTLE_MARKERS = ('429', 'RESOURCE_EXHAUSTED', 'rate limit', 'Too Many Requests')
+
+REASON_INCREASE = 'increase'
+REASON_THROTTLE = 'throttle'
+REASON_LATENCY = 'latency'
+
+
+def is_throttle_error(error: Exception) -> bool:
+    """쿼터 초과 / 과부하로 한도를 낮춰야 하는 오류인지 판단"""
+    if isinstance(error, CircuitOpenError):
+        return True
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code in (429, 503)
+    message = str(error)
+    return any(marker in message for marker in _THROTTLE_MARKERS)
+
+
+class Permit:
+    """acquire()로 받은 실행 권한 (release()에 그대로 전달)"""
+
+    __slots__ = ('started', 'epoch', 'saturated')
+
+    def __init__(self, started: float, epoch: int, saturated: bool):
+        self.started = started
+        # 한도를 낮춘 횟수 - 낮추기 전에 시작한 호출의 결과로 또 낮추지 않도록
+        self.epoch = epoch
+        # 시작 시 한도까지 사용 중이었는지 (한도에 여유가 있었으면 올릴 근거가 없음)
+        self.saturated = saturated
+
+
+class AdaptiveLimiter:
+    """AIMD 동시 실행 제한기"""
+
+    def __init__(
+        self,
+        initial: int = 2,
+        min_limit: int = 1,
+        max_limit: int = 16,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_target: Optional[float] = None,
+        max_error_rate: float = 0.1,
+        smoothing: float = 0.1,
+        history_size: int = 500,
+        on_change: Optional[Callable[[int, int, str], None]] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            initial: 시작 한도
+            min_limit: 최소 한도
+            max_limit: 최대 한도 (쿼터/메모리 상한)
+            backoff: 한도를 낮출 때 곱할 비율
+            latency_tolerance: 기준 지연 시간의 몇 배를 넘으면 급증으로 볼지
+            latency_target: 지연 시간 상한 (초, 지정하면 기준 지연 시간 대신 사용)
+            max_error_rate: 한도를 올릴 수 있는 최대 오류율 (최근 호출 지수 평균)
+            smoothing: 기준 지연 시간 / 오류율 지수 평균 계수
+            history_size: 보관할 한도 변경 이력 수
+            on_change: 한도가 바뀔 때 호출 (이전 한도, 새 한도, 이유 - lock 안에서 호출되므로 limiter 메서드 호출 금지)
+            clock: 시간 함수 (테스트용)
+        """
+        if not 1 <= min_limit <= max_limit:
+            raise ValueError("1 <= min_limit <= max_limit 이어야 합니다.")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.latency_target = latency_target
+        self.max_error_rate = max_error_rate
+        self.smoothing = smoothing
+        self.on_change = on_change
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+        self._limit = float(min(max(initial, min_limit), max_limit))
+        self._inflight = 0
+        self._epoch = 0
+        self._baseline: Optional[float] = None
+        self._error_rate = 0.0
+        self.counts: Dict[str, int] = {
+            'success': 0, 'error': 0, REASON_THROTTLE: 0, REASON_LATENCY: 0, REASON_INCREASE: 0,
+        }
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+        self._record(int(self._limit), 'start')
+
+    @property
+    def limit(self) -> int:
+        """현재 허용 동시 호출 수"""
+        with self._lock:
+            return int(self._limit)
+
+    @property
+    def inflight(self) -> int:
+        with self._lock:
+            return self._inflight
+
+    # === 권한 획득 / 반환 ===
+
+    def _try_acquire(self) -> Optional[Permit]:
+        """lock 안에서 호출"""
+        if self._inflight >= int(self._limit):
+            return None
+        self._inflight += 1
+        return Permit(self.clock(), self._epoch, self._inflight >= int(self._limit))
+
+    def acquire(self, timeout: Optional[float] = None) -> Permit:
+        """
+        실행 권한 획득 (한도가 찼으면 대기)
+
+        Args:
+            timeout: 최대 대기 시간 (초, 초과 시 TimeoutError)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                permit = self._try_acquire()
+                if permit is not None:
+                    return permit
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError("동시 실행 한도 대기 시간을 초과했습니다.")
+                self._cond.wait(remaining)
+
+    async def acquire_async(self) -> Permit:
+        """실행 권한 획득 (asyncio, 이벤트 루프를 막지 않고 대기)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                permit = self._try_acquire()
+                if permit is not None:
+                    return permit
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def release(self, permit: Permit, error: Optional[Exception] = None, record: bool = True):
+        """
+        실행 권한 반환 및 결과 반영
+
+        Args:
+            permit: acquire() 결과
+            error: 호출이 실패했으면 그 예외
+            record: False면 결과를 반영하지 않음 (취소 등으로 호출하지 않은 경우)
+        """
+        latency = self.clock() - permit.started
+        with self._lock:
+            self._inflight -= 1
+            if record:
+                self._update(permit, latency, error)
+            self._wake()
+
+    def _wake(self):
+        """대기 중인 호출자 깨우기 (lock 안에서 호출)"""
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    # === AIMD ===
+
+    def _update(self, permit: Permit, latency: float, error: Optional[Exception]):
+        """lock 안에서 호출"""
+        failed = error is not None
+        self._error_rate += self.smoothing * ((1.0 if failed else 0.0) - self._error_rate)
+
+        if failed:
+            self.counts['error'] += 1
+            if is_throttle_error(error):
+                self.counts[REASON_THROTTLE] += 1
+                self._decrease(permit, REASON_THROTTLE)
+            # 요청 내용 오류 등은 용량과 무관하므로 한도를 바꾸지 않음 (오류율로 증가만 막음)
+            return
+
+        self.counts['success'] += 1
+        if self._is_latency_spike(latency):
+            self.counts[REASON_LATENCY] += 1
+            self._decrease(permit, REASON_LATENCY)
+            return
+
+        # 기준 지연 시간은 정상 응답으로만 갱신 (급증한 값이 기준을 끌어올리지 않도록)
+        if self._baseline is None:
+            self._baseline = latency
+        else:
+            self._baseline += self.smoothing * (latency - self._baseline)
+
+        if permit.saturated and self._error_rate <= self.max_error_rate and self._limit < self.max_limit:
+            before = int(self._limit)
+            # 한도만큼 성공하면 1 증가 (TCP 혼잡 제어와 같은 방식)
+            self._limit = min(self._limit + 1.0 / self._limit, float(self.max_limit))
+            if int(self._limit) != before:
+                self.counts[REASON_INCREASE] += 1
+                self._changed(before, REASON_INCREASE)
+
+    def _is_latency_spike(self, latency: float) -> bool:
+        if self.latency_target is not None:
+            return latency > self.latency_target
+        return self._baseline is not None and latency > self._baseline * self.latency_tolerance
+
+    def _decrease(self, permit: Permit, reason: str):
+        if permit.epoch != self._epoch:
+            # 이미 낮춘 뒤이므로 같은 혼잡으로 또 낮추지 않음
+            return
+        before = int(self._limit)
+        self._limit = max(float(self.min_limit), float(int(self._limit * self.backoff)))
+        self._epoch += 1
+        self._changed(before, reason)
+
+    def _changed(self, before: int, reason: str):
+        after = int(self._limit)
+        self._record(after, reason)
+        if self.on_change and after != before:
+            self.on_change(before, after, reason)
+
+    def _record(self, limit: int, reason: str):
+        self.history.append({
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'limit': limit,
+            'reason': reason,
+        })
+
+    # === 호출 래퍼 ===
+
+    def call(self, func: Callable[[], Any], timeout: Optional[float] = None) -> Any:
+        """권한 획득 → 호출 → 결과 반영 (스레드용)"""
+        permit = self.acquire(timeout)
+        try:
+            result = func()
+        except Exception as e:
+            self.release(permit, e)
+            raise
+        except BaseException:
+            # KeyboardInterrupt 등 - 용량과 무관하므로 결과는 반영하지 않고 권한만 반환
+            self.release(permit, record=False)
+            raise
+        self.release(permit)
+        return result
+
+    async def acall(self, func: Callable[..., Any], *args: Any, executor=None, **kwargs: Any) -> Any:
+        """
+        권한 획득 → 호출 → 결과 반영 (asyncio용)
+
+        func가 코루틴 함수면 그대로 await, 아니면 executor 스레드에서 실행
+        (기본 executor는 스레드 수가 적으므로 max_limit 이상의 ThreadPoolExecutor를 넘기는 것을 권장)
+        """
+        permit = await self.acquire_async()
+        try:
+            if asyncio.iscoroutinefunction(func):
+                result = await func(*args, **kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        except Exception as e:
+            self.release(permit, e)
+            raise
+        except BaseException:
+            # 작업 취소(CancelledError) - 결과는 반영하지 않고 권한만 반환
+            self.release(permit, record=False)
+            raise
+        self.release(permit)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 상태 (표시/로그용)"""
+        with self._lock:
+            return {
+                'limit': int(self._limit),
+                'inflight': self._inflight,
+                'min_limit': self.min_limit,
+                'max_limit': self.max_limit,
+                'baseline_latency_ms': round(self._baseline * 1000) if self._baseline is not None else None,
+                'error_rate': round(self._error_rate, 3),
+                'counts': dict(self.counts),
+            }
+
+
+def _resolve(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class LimitedGenerator:
+    """generate_prompt 호출을 AdaptiveLimiter로 감싼 생성기 (나머지 속성은 원래 생성기 그대로)"""
+
+    def __init__(self, generator, limiter: AdaptiveLimiter):
+        self.generator = generator
+        self.limiter = limiter
+
+    def generate_prompt(self, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return self.limiter.call(lambda: self.generator.generate_prompt(*args, **kwargs))
+
+    async def generate_prompt_async(self, *args: Any, executor=None, **kwargs: Any) -> Dict[str, Any]:
+        return await self.limiter.acall(self.generator.generate_prompt, *args, executor=executor, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.generator, name)
@@ -5,35 +5,90 @@ Gemini API 연동 모듈
 
 import os
 import json
-from datetime import datetime
-from typing import List, Optional, Dict, Any
+import time
+import hashlib
+from typing import List, Optional, Dict, Any, Tuple
 import google.genai as genai
 from google.genai.types import GenerateContentConfig, Part
 from PIL import Image
-import io
+
+from health import CircuitBreaker, CircuitOpenError, probe_api
+from image_io import load_image, prepare_image_bytes
+from prompt_templates import (
+    build_described_user_message,
+    build_system_prompt,
+    build_user_message,
+    get_prompt_template,
+)
+from providers import GeminiProvider, Provider, ProviderRouter, build_generation_config, create_provider
+
+from output_profiles import (
+    DEFAULT_OUTPUT_PROFILE,
+    get_output_profile,
+    build_output_format,
+    build_extra_rules,
+    build_response_schema,
+    normalize_result,
+)
+from response_parser import PATH_FOLLOWUP, parse_prompt_response, record_parse_path
+from thinking import DEFAULT_THINKING, THINKING_PRESETS, ThinkingController
 
 
 class GeminiPromptGenerator:
     """Gemini API를 사용한 프롬프트 생성기"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        thinking: str = DEFAULT_THINKING,
+        latency_sla: Optional[float] = None,
+        provider: Optional[Provider] = None,
+        prompt_template: Optional[str] = None
+    ):
         """
         초기화
 
         Args:
             api_key: Gemini API Key (없으면 환경변수에서 로드)
+            thinking: thinking 예산 설정 ('default', 'low', 'off', 'adaptive')
+            latency_sla: adaptive 모드 목표 지연 시간 (초)
+            provider: 모델 제공자 (없으면 환경 변수 설정에 따라 Gemini 또는 라우터, providers.py 참고)
+            prompt_template: 프롬프트 템플릿 이름 (없으면 환경변수 PROMPTMAKER_PROMPT_TEMPLATE 또는 기본 템플릿,
+                prompt_templates.py 참고)
         """
         self.api_key = api_key or os.getenv('GEMINI_API_KEY')
 
-        if not self.api_key:
+        if not self.api_key and provider is None and not os.getenv('OPENAI_COMPAT_BASE_URL'):
             raise ValueError(
                 "API Key가 설정되지 않았습니다. "
                 ".env 파일에 GEMINI_API_KEY를 추가하거나 "
                 "api_key 파라미터로 전달하세요."
             )
 
-        # Gemini 클라이언트 초기화
-        self.client = genai.Client(api_key=self.api_key)
+        # Gemini 클라이언트 초기화 (로컬 제공자만 쓰는 경우 없음)
+        self.client = genai.Client(api_key=self.api_key) if self.api_key else None
+
+        # 실제 모델 호출 담당 (프롬프트/검증/파싱은 이 클래스에서 공유)
+        self.provider = provider or create_provider(self.client)
+
+        # 시스템 프롬프트 / 사용자 메시지 템플릿
+        self.prompt_template = get_prompt_template(
+            prompt_template or os.getenv('PROMPTMAKER_PROMPT_TEMPLATE')
+        )
+        if self.prompt_template['requires_schema'] and not self.provider.supports_schema:
+            raise ValueError(
+                f"프롬프트 템플릿 {self.prompt_template['name']}은(는) response_schema를 강제하는 제공자가 필요합니다. "
+                f"(현재 제공자: {self.provider.name})"
+            )
+
+        # thinking 예산 제어 (호출별 지연 시간으로 adaptive 조절)
+        self.thinking = ThinkingController(thinking, latency_sla)
+
+        # 연속 실패 시 호출을 바로 거절 (죽은 엔드포인트에 계속 요청하지 않도록)
+        self.breaker = CircuitBreaker()
+
+        # 마지막 호출의 토큰 사용량 / 지연 시간
+        self.last_usage: Optional[Dict[str, Any]] = None
 
     def _load_image(self, image_path: str) -> Image.Image:
         """
@@ -45,89 +100,193 @@ class GeminiPromptGenerator:
         Returns:
             PIL Image 객체
         """
-        try:
-            img = Image.open(image_path)
+        return load_image(image_path)
 
-            # 파일 크기 체크 (10MB 제한)
-            file_size = os.path.getsize(image_path)
-            max_size = 10 * 1024 * 1024  # 10MB
+    def _create_system_prompt(self, profile: Optional[Dict[str, Any]] = None) -> str:
+        """
+        시스템 프롬프트 생성
 
-            if file_size > max_size:
-                raise ValueError(f"이미지 파일이 너무 큽니다. (최대 10MB, 현재: {file_size / 1024 / 1024:.2f}MB)")
+        Args:
+            profile: 출력 프로필 (없으면 기본 프로필)
+        """
+        profile = profile or get_output_profile()
+        return build_system_prompt(self.prompt_template, profile)
 
-            # 지원 형식 체크
-            if img.format not in ['JPEG', 'PNG', 'WEBP']:
-                raise ValueError(f"지원하지 않는 이미지 형식입니다: {img.format}")
+    def _create_image_parts(self, image_paths: List[str]) -> List[Part]:
+        """
+        이미지 파일을 API 전송용 Part 객체로 변환
 
-            return img
+        Args:
+            image_paths: 이미지 파일 경로 리스트
 
-        except Exception as e:
-            raise Exception(f"이미지 로드 실패: {str(e)}")
+        Returns:
+            Part 객체 리스트
+        """
+        image_parts = []
+        for img_path in image_paths:
+            data, mime_type = self._prepare_image(img_path)
 
-    def _create_system_prompt(self) -> str:
-        """시스템 프롬프트 생성"""
-        return """당신은 전문적인 AI 이미지 생성 프롬프트 엔지니어입니다.
+            # Part 객체 생성
+            image_parts.append(Part.from_bytes(data=data, mime_type=mime_type))
+        return image_parts
 
-사용자가 제공한 참고 이미지와 텍스트 명령어를 분석하여,
-Midjourney, DALL-E, Stable Diffusion 등의 AI 이미지 생성 도구에서
-최고 품질의 결과를 얻을 수 있는 전문적인 프롬프트를 생성하세요.
+    def _prepare_image(self, image_path: str) -> Tuple[bytes, str]:
+        """
+        이미지 로드 후 전송용 바이트로 변환
 
-# 분석 항목:
-1. 이미지 분석:
-   - 색감 (color palette)
-   - 조명 (lighting)
-   - 구도 (composition)
-   - 스타일 (art style)
-   - 주요 객체 (main subjects)
-   - 분위기 (mood/atmosphere)
+        Args:
+            image_path: 이미지 파일 경로
 
-2. 텍스트 명령어 파싱:
-   - 원하는 장면/상황
-   - 스타일 키워드
-   - 특정 요구사항
+        Returns:
+            (이미지 바이트, MIME 타입)
+        """
+        return prepare_image_bytes(image_path)
 
-# 출력 형식:
-반드시 아래 JSON 구조로 출력하세요 (JSON만 출력하고 다른 텍스트는 포함하지 마세요):
-{
-  "meta": {
-    "version": "3.0",
-    "engine": "gemini-2.5-flash",
-    "generated_at": "[ISO 8601 timestamp]"
-  },
-  "inputs": {
-    "reference_images_count": [이미지 개수],
-    "user_scene_text": "[사용자가 입력한 텍스트]"
-  },
-  "prompts": {
-    "style_prompt": "[스타일 중심의 상세한 프롬프트 - 200단어 이상, 영어로 작성]",
-    "scene_prompt": "[장면 중심의 상세한 프롬프트 - 영어로 작성]",
-    "final_prompt": "[최종 통합 프롬프트 - 바로 사용 가능, 영어로 작성]"
-  }
-}
+    def _create_fast_parts(self, image_paths: List[str], image_mode: str) -> Tuple[str, List[Part]]:
+        """
+        빠른 모드용 로컬 특징 텍스트 / 썸네일 Part 생성
 
-# 프롬프트 작성 규칙:
-- 모든 프롬프트는 영어로 작성
-- 전문적인 사진/렌더링 용어 사용 (volumetric lighting, subsurface scattering 등)
-- 구체적이고 상세한 묘사
-- 예술 스타일 명확히 지정 (Studio Ghibli, Pixar, Unreal Engine 5 등)
-- 기술적 품질 키워드 포함 (8K, masterpiece, high-fidelity 등)
-- JSON 외에 다른 텍스트는 절대 출력하지 마세요
-"""
+        Args:
+            image_paths: 이미지 파일 경로 리스트
+            image_mode: 'thumbnail' 또는 'none' (image_descriptors.IMAGE_MODES)
+
+        Returns:
+            (특징 텍스트, 이미지 Part 리스트 - none이면 빈 리스트)
+        """
+        # NumPy는 빠른 모드에서만 필요하므로 여기서 import
+        try:
+            from image_descriptors import (
+                THUMBNAIL_SIZE,
+                build_descriptor_text,
+                compute_descriptors,
+                open_reduced,
+                thumbnail_bytes,
+            )
+        except ImportError:
+            raise RuntimeError("빠른 이미지 모드에는 numpy가 필요합니다. (pip install numpy)")
+
+        descriptors = []
+        image_parts = []
+        for img_path in image_paths:
+            img, original_size = open_reduced(self._load_image(img_path), THUMBNAIL_SIZE)
+            descriptors.append(compute_descriptors(img, original_size=original_size))
+            if image_mode == 'thumbnail':
+                data, mime_type = thumbnail_bytes(img, THUMBNAIL_SIZE)
+                image_parts.append(Part.from_bytes(data=data, mime_type=mime_type))
+        return build_descriptor_text(descriptors), image_parts
+
+    def _create_user_message(self, user_text: str) -> str:
+        """사용자 메시지 생성"""
+        return build_user_message(self.prompt_template, user_text)
+
+    def _create_config(
+        self,
+        profile: Dict[str, Any],
+        thinking_budget: Optional[int] = None
+    ) -> GenerateContentConfig:
+        """
+        프로필별 생성 설정 (출력 토큰 예산 + 응답 스키마 + thinking 예산)
+
+        Args:
+            profile: 출력 프로필
+            thinking_budget: thinking 토큰 예산 (None: 모델 기본 동적 예산)
+        """
+        return self._create_generation_config(
+            profile['max_output_tokens'], build_response_schema(profile), thinking_budget
+        )
+
+    def _create_generation_config(
+        self,
+        max_output_tokens: int,
+        response_schema: Optional[Dict[str, Any]],
+        thinking_budget: Optional[int] = None
+    ) -> GenerateContentConfig:
+        """
+        생성 설정
+
+        Args:
+            max_output_tokens: 응답(thinking 제외) 토큰 예산
+            response_schema: 응답 JSON 스키마
+            thinking_budget: thinking 토큰 예산 (None: 모델 기본 동적 예산)
+        """
+        return build_generation_config(max_output_tokens, response_schema, thinking_budget)
+
+    def _call_model(
+        self,
+        contents: List[Part],
+        max_output_tokens: int,
+        response_schema: Optional[Dict[str, Any]],
+        thinking: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        모델 호출 (thinking 예산 적용, 지연 시간 / 토큰 사용량 기록)
+
+        Args:
+            contents: 요청 콘텐츠
+            max_output_tokens: 응답 토큰 예산
+            response_schema: 응답 JSON 스키마
+            thinking: thinking 설정 (없으면 생성자 설정)
+
+        Returns:
+            (응답 텍스트, 사용량 딕셔너리)
+        """
+        thinking_preset = self.thinking.resolve(thinking)
+        thinking_budget = THINKING_PRESETS[thinking_preset]
+
+        # 제공자 호출 (라우터면 정책에 따라 선택, 실패 시 다음 제공자)
+        self.breaker.check()
+        started = time.perf_counter()
+        try:
+            response_text, usage = self.provider.generate(contents, max_output_tokens, response_schema, thinking_budget)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        except BaseException:
+            self.breaker.release_trial()
+            raise
+        self.breaker.record_success()
+        latency = time.perf_counter() - started
+        self.thinking.record(latency, thinking)
+
+        usage['latency_ms'] = round(latency * 1000)
+        usage['thinking'] = thinking_preset
+        usage['thinking_budget'] = thinking_budget
+        self.last_usage = usage
+
+        return response_text, usage
 
     def generate_prompt(
         self,
         image_paths: List[str],
-        user_text: str
+        user_text: str,
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        max_words: Optional[int] = None,
+        thinking: Optional[str] = None,
+        followup: bool = True,
+        prepared_images: Optional[List[Tuple[bytes, str]]] = None,
+        image_mode: str = 'full'
     ) -> Dict[str, Any]:
         """
         프롬프트 생성
 
         Args:
-            image_paths: 참고 이미지 파일 경로 리스트 (1~2개)
+            image_paths: 참고 이미지 파일 경로 리스트 (1~3개)
             user_text: 사용자가 입력한 스타일/장면 설명
+            output_profile: 출력 프로필 이름 ('full', 'standard', 'compact')
+            max_words: 프롬프트 최대 단어 수 (프로필 기본값 덮어쓰기)
+            thinking: 이번 호출의 thinking 설정 (없으면 생성자 설정 사용)
+            followup: 응답이 잘려 일부 필드가 빠졌을 때 텍스트 전용 후속 호출로 보충할지 여부
+            prepared_images: 미리 변환된 (이미지 바이트, MIME 타입) 리스트
+                (preprocess.ImagePreprocessor 결과, 있으면 image_paths를 다시 읽지 않음)
+            image_mode: 이미지 전송 방식 ('full', 'thumbnail', 'none' - image_descriptors.IMAGE_MODES)
+                thumbnail/none은 로컬에서 계산한 색/구도 특징을 텍스트로 보내 이미지 토큰을 줄임
+                (prepared_images는 full에서만 사용)
 
         Returns:
             생성된 프롬프트 JSON 딕셔너리
+            (prompts에는 항상 style_prompt / scene_prompt / final_prompt 키가 있고,
+             생성하지 않은 필드는 None이며 meta.omitted_fields / meta.missing_fields에 기록됨,
+             토큰 사용량과 지연 시간은 meta.usage, 파싱 경로는 meta.parse_path에 기록됨)
         """
         # 입력 검증
         if not image_paths:
@@ -139,82 +298,168 @@ Midjourney, DALL-E, Stable Diffusion 등의 AI 이미지 생성 도구에서
         if not user_text or not user_text.strip():
             raise ValueError("텍스트 명령어를 입력하세요.")
 
+        # image_descriptors.IMAGE_MODES와 같은 목록 (full에서 NumPy를 import하지 않도록 이름만 비교)
+        if image_mode not in ('full', 'thumbnail', 'none'):
+            raise ValueError(f"알 수 없는 이미지 모드입니다: {image_mode} (사용 가능: full, thumbnail, none)")
+
+        profile = get_output_profile(output_profile, max_words)
+
+        # 연속 실패로 서킷이 열려 있으면 이미지 변환 전에 바로 실패
+        self.breaker.reject_if_open()
+
         try:
             # 이미지 로드 및 파일 객체로 변환
-            image_parts = []
-            for img_path in image_paths:
-                img = self._load_image(img_path)
-                # 이미지를 바이트로 변환
-                img_byte_arr = io.BytesIO()
-                img.save(img_byte_arr, format=img.format or 'PNG')
-                img_byte_arr.seek(0)
-
-                # Part 객체 생성
-                image_parts.append(Part.from_bytes(
-                    data=img_byte_arr.read(),
-                    mime_type=f"image/{(img.format or 'PNG').lower()}"
-                ))
-
-            # 프롬프트 구성
-            system_prompt = self._create_system_prompt()
-
-            # 사용자 메시지
-            user_message = f"""
-참고 이미지를 분석하고, 다음 텍스트 명령어에 맞는 프롬프트를 생성하세요:
-
-사용자 요청: {user_text}
-
-위의 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요.
-"""
-
-            # 콘텐츠 구성
+            descriptor_parts = []
+            if image_mode != 'full':
+                descriptor_text, image_parts = self._create_fast_parts(image_paths, image_mode)
+                descriptor_parts = [Part.from_text(text=descriptor_text)]
+            elif prepared_images is not None:
+                image_parts = [Part.from_bytes(data=data, mime_type=mime) for data, mime in prepared_images]
+            else:
+                image_parts = self._create_image_parts(image_paths)
+
+            # 콘텐츠 구성 (이미지를 보내지 않으면 이미지 분석을 지시하지 않는 메시지 사용)
+            if image_mode == 'none':
+                user_message = build_described_user_message(self.prompt_template, user_text)
+            else:
+                user_message = self._create_user_message(user_text)
             contents = [
-                Part.from_text(text=system_prompt),
+                Part.from_text(text=self._create_system_prompt(profile)),
                 Part.from_text(text=user_message),
-            ] + image_parts
-
-            # Gemini API 호출
-            response = self.client.models.generate_content(
-                model='gemini-2.5-flash',
-                contents=contents,
-                config=GenerateContentConfig(
-                    temperature=0.7,
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=8192,
-                )
+            ] + descriptor_parts + image_parts
+
+            response_text, usage = self._call_model(
+                contents, profile['max_output_tokens'], build_response_schema(profile), thinking
             )
 
-            # 응답 파싱
-            response_text = response.text.strip()
-
-            # JSON 추출 (마크다운 코드 블록 제거)
-            if response_text.startswith('```'):
-                # ```json ... ``` 형태 처리
-                lines = response_text.split('\n')
-                response_text = '\n'.join(lines[1:-1])
-
-            # JSON 파싱
-            try:
-                result = json.loads(response_text)
-            except json.JSONDecodeError:
-                # JSON 파싱 실패 시, { } 사이의 내용만 추출 시도
-                start = response_text.find('{')
-                end = response_text.rfind('}') + 1
-                if start != -1 and end > start:
-                    result = json.loads(response_text[start:end])
-                else:
-                    raise
-
-            # 타임스탬프 추가 (없는 경우)
-            if 'meta' in result and 'generated_at' not in result['meta']:
-                result['meta']['generated_at'] = datetime.utcnow().isoformat() + 'Z'
+            result, parse_path = parse_prompt_response(response_text)
 
+            # 프로필과 무관한 고정 구조로 정리 (meta / inputs / 누락 필드 표시)
+            result = normalize_result(result, profile, len(image_paths), user_text)
+            result['meta']['engine'] = usage['model']
+            result['meta']['prompt_template'] = self.prompt_template['name']
+            result['meta']['image_mode'] = image_mode
+            result['meta']['usage'] = usage
+            result['meta']['parse_path'] = parse_path
+
+            if followup and result['meta']['missing_fields']:
+                result = self._complete_missing_fields(result, profile, user_text, thinking)
             return result
 
+        except CircuitOpenError:
+            raise
         except Exception as e:
             raise Exception(f"프롬프트 생성 실패: {str(e)}")
 
+    def check_health(self, force: bool = False) -> Dict[str, Any]:
+        """
+        쿼터를 쓰지 않는 상태 확인 (결과 캐시, health.probe_api 참고)
+
+        Args:
+            force: 캐시 무시
+
+        Returns:
+            {'ok', 'latency_ms', 'error', 'checked_at', 'cached', 'breaker'}
+            (라우터 사용 시 제공자별 상태 'providers' 추가)
+        """
+        if self.client is not None and isinstance(self.provider, GeminiProvider):
+            status = probe_api(self.api_key, client=self.client, force=force)
+        else:
+            started = time.perf_counter()
+            ok = self.provider.health_check()
+            status = {
+                'ok': ok, 'error': None if ok else f"{self.provider.name} 상태 확인 실패",
+                'latency_ms': round((time.perf_counter() - started) * 1000), 'cached': False,
+            }
+            if isinstance(self.provider, ProviderRouter):
+                # health_check()가 제공자별 결과를 excluded에 반영함
+                status['providers'] = self.provider.stats()
+        status['breaker'] = self.breaker.snapshot()
+        return status
+
+    def _complete_missing_fields(
+        self,
+        result: Dict[str, Any],
+        profile: Dict[str, Any],
+        user_text: str,
+        thinking: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        누락된 prompts 필드만 텍스트 전용 후속 호출로 보충 (이미지 재전송 없음)
+
+        이미 완성된 필드를 참고 자료로 넘기므로, 완성된 필드가 하나도 없으면 보충할 수 없음
+
+        Args:
+            result: normalize_result()를 거친 결과 (meta.missing_fields 포함)
+            profile: 출력 프로필
+            user_text: 사용자 텍스트
+            thinking: thinking 설정
+
+        Returns:
+            보충된 결과 (meta.followup_fields, meta.usage.followup 기록)
+        """
+        missing = list(result['meta']['missing_fields'])
+        present = {field: value for field, value in result['prompts'].items() if value}
+        if not present:
+            raise ValueError("응답이 잘려 완성된 프롬프트가 없습니다.")
+
+        followup_profile = dict(
+            profile,
+            fields=missing,
+            model_writes_meta=False,
+            max_output_tokens=profile['max_output_tokens'] * len(missing) // len(profile['fields']) + 128,
+        )
+
+        contents = [
+            Part.from_text(text=self._create_followup_prompt(followup_profile)),
+            Part.from_text(text=(
+                "이미 작성된 프롬프트:\n"
+                + json.dumps(present, indent=2, ensure_ascii=False)
+                + f"\n\n사용자 요청: {user_text}\n\n누락된 필드만 위의 JSON 형식으로 응답하세요."
+            )),
+        ]
+        response_text, usage = self._call_model(
+            contents, followup_profile['max_output_tokens'], build_response_schema(followup_profile), thinking
+        )
+        record_parse_path(PATH_FOLLOWUP)
+
+        completed = parse_json_response(response_text).get('prompts') or {}
+        for field in missing:
+            if completed.get(field):
+                result['prompts'][field] = completed[field]
+
+        result = normalize_result(
+            result, profile,
+            result['inputs']['reference_images_count'], result['inputs']['user_scene_text']
+        )
+        result['meta']['followup_fields'] = missing
+        result['meta']['usage']['followup'] = usage
+        return result
+
+    def _create_followup_prompt(self, profile: Dict[str, Any]) -> str:
+        """
+        누락 필드 보충용 시스템 프롬프트
+
+        Args:
+            profile: 누락 필드만 담은 출력 프로필
+        """
+        extra_rules = ''.join(f"- {rule}\n" for rule in build_extra_rules(profile))
+
+        return """당신은 전문적인 AI 이미지 생성 프롬프트 엔지니어입니다.
+
+이전 응답이 중간에 잘려 일부 프롬프트 필드가 누락되었습니다.
+이미 작성된 프롬프트와 사용자 요청을 바탕으로, 같은 스타일과 내용을 유지하여
+누락된 필드만 작성하세요.
+
+# 출력 형식:
+""" + build_output_format(profile) + """
+
+# 프롬프트 작성 규칙:
+- 모든 프롬프트는 영어로 작성
+- 이미 작성된 프롬프트와 모순되지 않게 작성
+""" + extra_rules + """- JSON 외에 다른 텍스트는 절대 출력하지 마세요
+"""
+
     def save_to_file(self, prompt_data: Dict[str, Any], output_path: str):
         """
         생성된 프롬프트를 JSON 파일로 저장
@@ -235,30 +480,53 @@ Midjourney, DALL-E, Stable Diffusion 등의 AI 이미지 생성 도구에서
             raise Exception(f"파일 저장 실패: {str(e)}")
 
 
+def compute_file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    파일 내용의 SHA-256 해시
+
+    Args:
+        path: 파일 경로
+        chunk_size: 읽기 단위 (바이트)
+
+    Returns:
+        16진수 해시 문자열
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_json_response(response_text: Optional[str]) -> Dict[str, Any]:
+    """
+    모델 응답 텍스트에서 JSON 객체 추출 (잘린 응답은 완성된 필드만 복구)
+
+    Args:
+        response_text: 모델 응답 텍스트
+
+    Returns:
+        파싱된 딕셔너리
+    """
+    return parse_prompt_response(response_text)[0]
+
+
 # 간단한 테스트 함수
-def test_api_connection(api_key: str) -> bool:
+def test_api_connection(api_key: str, force: bool = False) -> bool:
     """
-    API 연결 테스트
+    API 연결 테스트 (생성 요청 대신 모델 조회로 확인하여 쿼터를 쓰지 않음, 결과는 잠시 캐시)
 
     Args:
         api_key: Gemini API Key
+        force: 캐시된 결과 무시
 
     Returns:
         연결 성공 여부
     """
-    try:
-        client = genai.Client(api_key=api_key)
-
-        # 간단한 테스트 요청
-        response = client.models.generate_content(
-            model='gemini-2.5-flash',
-            contents=Part.from_text(text='Hello')
-        )
-
-        return bool(response.text)
-    except Exception as e:
-        print(f"API 연결 실패: {str(e)}")
-        return False
+    status = probe_api(api_key, force=force)
+    if not status['ok']:
+        print(f"API 연결 실패: {status['error']}")
+    return status['ok']
 
 
 if __name__ == "__main__":
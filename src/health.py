@@ -0,0 +1,299 @@
+"""
+API 상태 확인 및 서킷 브레이커
+- probe_api: 생성 요청 대신 모델 메타데이터 조회(models.get)로 연결/Key 확인 (쿼터 미사용), 결과는 TTL 동안 캐시
+- CircuitBreaker: 연속 실패가 쌓이면 일정 시간 호출을 바로 거절(open)하고,
+  시간이 지나면 1건만 시험 호출(half-open)하여 성공 시 복구(closed)
+"""
+
+import sys
+import time
+import hashlib
+import threading
+import urllib.error
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+DEFAULT_PROBE_MODEL = 'gemini-2.5-flash'
+
+# 상태 확인 결과 캐시 시간 (초) - 실패는 복구를 빨리 알 수 있도록 짧게
+DEFAULT_PROBE_TTL = 300.0
+FAILED_PROBE_TTL = 15.0
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+_probe_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+_probe_lock = threading.Lock()
+
+
+def probe_api(
+    api_key: str,
+    model: str = DEFAULT_PROBE_MODEL,
+    ttl: float = DEFAULT_PROBE_TTL,
+    force: bool = False,
+    client=None
+) -> Dict[str, Any]:
+    """
+    쿼터를 쓰지 않는 API 상태 확인 (models.get)
+
+    Args:
+        api_key: Gemini API Key
+        model: 조회할 모델 이름
+        ttl: 성공 결과 캐시 시간 (초)
+        force: 캐시 무시
+        client: 재사용할 genai.Client (없으면 새로 생성)
+
+    Returns:
+        {'ok', 'latency_ms', 'error', 'checked_at', 'cached'}
+    """
+    cache_key = hashlib.sha256(f"{api_key}:{model}".encode('utf-8')).hexdigest()
+    now = time.monotonic()
+
+    if not force:
+        with _probe_lock:
+            cached = _probe_cache.get(cache_key)
+        if cached and cached[0] > now:
+            return dict(cached[1], cached=True)
+
+    started = time.perf_counter()
+    try:
+        if client is None:
+            import google.genai as genai
+            client = genai.Client(api_key=api_key)
+        client.models.get(model=model)
+        status = {'ok': True, 'error': None}
+    except Exception as e:
+        status = {'ok': False, 'error': str(e)}
+
+    status['latency_ms'] = round((time.perf_counter() - started) * 1000)
+    status['checked_at'] = datetime.now().isoformat(timespec='seconds')
+
+    with _probe_lock:
+        _probe_cache[cache_key] = (now + (ttl if status['ok'] else FAILED_PROBE_TTL), status)
+    return dict(status, cached=False)
+
+
+def clear_probe_cache():
+    with _probe_lock:
+        _probe_cache.clear()
+
+
+class EndpointError(RuntimeError):
+    """
+    엔드포인트 호출 실패 (제공자가 전송/HTTP/API 오류를 알릴 때 사용)
+
+    Args:
+        message: 오류 메시지
+        code: HTTP 상태 코드 (연결 실패/응답 형식 오류면 None)
+    """
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
+def is_breaker_failure(error: BaseException) -> bool:
+    """
+    서킷 브레이커 실패로 셀 오류인지 판단
+
+    서버 오류(5xx), 인증 오류(401/403), 쿼터 초과(429), 연결/시간 초과 오류만 실패로 셈.
+    요청 내용 문제(400 등)나 코드 버그(TypeError 등)는 엔드포인트 상태와 무관하므로 세지 않음
+    """
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code >= 500 or code in (401, 403, 429)
+    if isinstance(error, (EndpointError, ConnectionError, TimeoutError, urllib.error.URLError)):
+        return True
+    # google-genai의 전송 오류 (httpx를 쓰는 중일 때만 확인, 여기서 import하지 않음)
+    httpx = sys.modules.get('httpx')
+    return httpx is not None and isinstance(error, httpx.TransportError)
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 호출을 바로 거절함"""
+
+    def __init__(self, retry_after: float, last_error: Optional[str] = None):
+        self.retry_after = retry_after
+        self.last_error = last_error
+        message = f"API 호출이 연속으로 실패하여 잠시 요청을 중단했습니다. ({retry_after:.0f}초 후 다시 시도)"
+        if last_error:
+            message += f"\n마지막 오류: {last_error}"
+        super().__init__(message)
+
+
+class CircuitBreaker:
+    """서킷 브레이커 (closed → open → half-open → closed)"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        max_reset_timeout: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Args:
+            failure_threshold: open으로 전환할 연속 실패 횟수
+            reset_timeout: open 유지 시간 (초)
+            max_reset_timeout: 시험 호출이 계속 실패할 때 open 유지 시간 상한 (실패마다 2배)
+            clock: 시간 함수 (테스트용)
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._open_duration = reset_timeout
+        self._trial_in_flight = False
+        self._last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        """open 유지 시간이 지났으면 half-open으로 보임 (lock 안에서 호출)"""
+        if self._state == STATE_OPEN and self.clock() - self._opened_at >= self._open_duration:
+            return STATE_HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """다음 시험 호출까지 남은 시간 (초)"""
+        with self._lock:
+            if self._state != STATE_OPEN:
+                return 0.0
+            return max(0.0, self._open_duration - (self.clock() - self._opened_at))
+
+    def check(self):
+        """
+        호출 전 확인 (거절 시 CircuitOpenError)
+
+        half-open에서는 시험 호출 1건만 통과시키고 결과가 나올 때까지 나머지는 거절
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == STATE_CLOSED:
+                return
+            if state == STATE_HALF_OPEN and not self._trial_in_flight:
+                self._state = STATE_HALF_OPEN
+                self._trial_in_flight = True
+                return
+            retry_after = max(0.0, self._open_duration - (self.clock() - self._opened_at))
+            raise CircuitOpenError(retry_after, self._last_error)
+
+    def reject_if_open(self):
+        """open 상태면 바로 거절 (시험 호출 기회는 소모하지 않음, 비싼 준비 작업 전에 사용)"""
+        with self._lock:
+            if self._current_state() == STATE_OPEN:
+                retry_after = max(0.0, self._open_duration - (self.clock() - self._opened_at))
+                raise CircuitOpenError(retry_after, self._last_error)
+
+    def record_success(self):
+        with self._lock:
+            self._state = STATE_CLOSED
+            self._failures = 0
+            self._open_duration = self.reset_timeout
+            self._trial_in_flight = False
+            self._last_error = None
+
+    def record_failure(self, error: Optional[Exception] = None):
+        """
+        호출 실패 기록 (엔드포인트와 무관한 오류는 무시)
+
+        Args:
+            error: 발생한 예외
+        """
+        if error is not None and not is_breaker_failure(error):
+            # 시험 호출이었다면 상태 판단 없이 다음 시험을 허용
+            self.release_trial()
+            return
+
+        with self._lock:
+            self._last_error = str(error)[:200] if error is not None else None
+            if self._state == STATE_HALF_OPEN:
+                # 시험 호출 실패: 더 길게 다시 open
+                self._open_duration = min(self._open_duration * 2, self.max_reset_timeout)
+                self._open()
+                return
+
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                self._open()
+
+    def release_trial(self):
+        """결과 없이 끝난 시험 호출(취소/중단 등)의 기회를 돌려줌 (half-open에 갇히지 않도록)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _open(self):
+        self._state = STATE_OPEN
+        self._opened_at = self.clock()
+        self._trial_in_flight = False
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """check → 호출 → 결과 기록"""
+        self.check()
+        try:
+            result = func()
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        except BaseException:
+            # KeyboardInterrupt/취소 등: 결과를 알 수 없으므로 시험 호출 기회만 돌려줌
+            self.release_trial()
+            raise
+        self.record_success()
+        return result
+
+    def wait(self, stop_event: Optional[threading.Event] = None, poll: float = 0.5):
+        """
+        호출할 수 있을 때까지 대기 (백그라운드 worker용)
+
+        closed이거나 시험 호출을 할 수 있는 상태가 되면 반환
+
+        Args:
+            stop_event: 설정되면 대기 중단
+            poll: half-open 시험 호출 결과를 기다릴 때 확인 간격 (초)
+        """
+        while not (stop_event and stop_event.is_set()):
+            with self._lock:
+                state = self._current_state()
+                if state == STATE_CLOSED or (state == STATE_HALF_OPEN and not self._trial_in_flight):
+                    return
+                delay = poll if self._trial_in_flight else self._open_duration - (self.clock() - self._opened_at)
+            if stop_event:
+                stop_event.wait(max(delay, 0.05))
+            else:
+                time.sleep(max(delay, 0.05))
+
+    def call_when_ready(self, func: Callable[[], Any], stop_event: Optional[threading.Event] = None) -> Any:
+        """
+        서킷이 열려 있으면 기다렸다가 호출 (거절되면 다시 대기)
+
+        func 안에서 check()가 이루어지는 경우(GeminiPromptGenerator.generate_prompt)에 사용
+        """
+        while True:
+            self.wait(stop_event)
+            try:
+                return func()
+            except CircuitOpenError:
+                if stop_event and stop_event.is_set():
+                    raise
+
+    def snapshot(self) -> Dict[str, Any]:
+        """현재 상태 (표시/로그용)"""
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'failures': self._failures,
+                'retry_after': round(max(0.0, self._open_duration - (self.clock() - self._opened_at)), 1)
+                if self._state == STATE_OPEN else 0.0,
+                'last_error': self._last_error,
+            }
@@ -0,0 +1,237 @@
+"""
+이미지 디코드/축소 백엔드
+기본은 Pillow, 설치되어 있으면 PyTurboJPEG(libjpeg-turbo) 또는 pyvips(libvips)를 사용
+
+- probe: 전체 디코드 없이 형식/크기만 읽기
+- thumbnail: 축소 디코드(shrink-on-load) 후 미리보기 크기로 축소
+
+모든 백엔드는 thumbnail_size()로 계산한 같은 크기를 돌려주므로 백엔드가 바뀌어도
+미리보기 크기는 동일함. API 전송용 재인코딩(image_io.prepare_image_bytes)은 바이트가
+달라지지 않도록 항상 Pillow를 사용.
+
+백엔드 선택: 환경 변수 PROMPTMAKER_IMAGE_BACKEND = auto(기본) | pillow | turbojpeg | vips
+"""
+
+import os
+import math
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from PIL import Image
+
+
+BACKEND_ENV = 'PROMPTMAKER_IMAGE_BACKEND'
+
+# auto 선택 시 우선순위
+AUTO_ORDER = ['turbojpeg', 'vips', 'pillow']
+
+
+class ImageInfo(NamedTuple):
+    """이미지 헤더 정보"""
+    format: str   # Pillow 형식 이름 (JPEG, PNG, WEBP 등)
+    width: int
+    height: int
+
+
+def thumbnail_size(width: int, height: int, max_size: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    비율을 유지한 축소 크기 (Pillow Image.thumbnail과 같은 반올림 규칙)
+
+    Args:
+        width, height: 원본 크기
+        max_size: (최대 너비, 최대 높이)
+
+    Returns:
+        축소 크기 (원본이 더 작으면 원본 크기)
+    """
+    x, y = max_size
+    if x >= width and y >= height:
+        return width, height
+
+    def round_aspect(number, key):
+        return max(min(math.floor(number), math.ceil(number), key=key), 1)
+
+    aspect = width / height
+    if x / y >= aspect:
+        x = round_aspect(y * aspect, key=lambda n: abs(aspect - n / y))
+    else:
+        y = round_aspect(x / aspect, key=lambda n: 0 if n == 0 else abs(aspect - x / n))
+    return x, y
+
+
+class PillowBackend:
+    """기본 백엔드 (Pillow)"""
+
+    name = 'pillow'
+
+    @staticmethod
+    def available() -> bool:
+        return True
+
+    def probe(self, image_path: str) -> ImageInfo:
+        # Image.open은 헤더만 읽음
+        with Image.open(image_path) as img:
+            return ImageInfo(img.format, img.width, img.height)
+
+    def thumbnail(self, image_path: str, max_size: Tuple[int, int]) -> Image.Image:
+        """
+        미리보기 이미지 생성
+
+        Args:
+            image_path: 이미지 경로
+            max_size: (최대 너비, 최대 높이)
+
+        Returns:
+            thumbnail_size() 크기의 PIL Image
+        """
+        with Image.open(image_path) as img:
+            size = thumbnail_size(img.width, img.height, max_size)
+            # JPEG는 draft()로 DCT 단계에서 1/2~1/8로 축소 디코드
+            img.draft('RGB', size)
+            img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            return self._fit(img, size)
+
+    @staticmethod
+    def _fit(img: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        """축소 디코드 결과를 정확한 목표 크기로 맞춤"""
+        if img.size != size:
+            img = img.resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+        return img
+
+
+class TurboJPEGBackend(PillowBackend):
+    """libjpeg-turbo 직접 호출 (JPEG만, 다른 형식은 Pillow)"""
+
+    name = 'turbojpeg'
+
+    def __init__(self):
+        from turbojpeg import TurboJPEG, TJPF_RGB
+        self._jpeg = TurboJPEG()
+        self._pixel_format = TJPF_RGB
+        # 지원하는 축소 비율 (분자, 분모) 중 축소 비율이 큰 순서
+        self._factors = sorted(self._jpeg.scaling_factors, key=lambda f: f[0] / f[1])
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            from turbojpeg import TurboJPEG
+            TurboJPEG()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _read_jpeg(image_path: str) -> Optional[bytes]:
+        with open(image_path, 'rb') as f:
+            data = f.read()
+        return data if data[:3] == b'\xff\xd8\xff' else None
+
+    def probe(self, image_path: str) -> ImageInfo:
+        data = self._read_jpeg(image_path)
+        if data is None:
+            return super().probe(image_path)
+        width, height, _, _ = self._jpeg.decode_header(data)
+        return ImageInfo('JPEG', width, height)
+
+    def thumbnail(self, image_path: str, max_size: Tuple[int, int]) -> Image.Image:
+        data = self._read_jpeg(image_path)
+        if data is None:
+            return super().thumbnail(image_path, max_size)
+
+        width, height, _, _ = self._jpeg.decode_header(data)
+        size = thumbnail_size(width, height, max_size)
+        # 목표 크기 이상을 유지하는 가장 작은 축소 비율로 디코드
+        factor = next(
+            (f for f in self._factors
+             if math.ceil(width * f[0] / f[1]) >= size[0] and math.ceil(height * f[0] / f[1]) >= size[1]),
+            (1, 1)
+        )
+        try:
+            pixels = self._jpeg.decode(data, pixel_format=self._pixel_format, scaling_factor=factor)
+        except OSError:
+            # CMYK 등 libjpeg-turbo가 RGB로 풀 수 없는 JPEG
+            return super().thumbnail(image_path, max_size)
+        return self._fit(Image.fromarray(pixels, 'RGB'), size)
+
+
+class VipsBackend(PillowBackend):
+    """libvips (shrink-on-load, 순차 접근으로 메모리 사용 최소화)"""
+
+    name = 'vips'
+
+    # libvips 로더 이름 → Pillow 형식 이름
+    LOADER_FORMATS = {'jpegload': 'JPEG', 'pngload': 'PNG', 'webpload': 'WEBP'}
+    BAND_MODES = {1: 'L', 2: 'LA', 3: 'RGB', 4: 'RGBA'}
+
+    def __init__(self):
+        import pyvips
+        self._vips = pyvips
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import pyvips  # noqa: F401
+            return True
+        except Exception:
+            return False
+
+    def probe(self, image_path: str) -> ImageInfo:
+        img = self._vips.Image.new_from_file(image_path, access='sequential')
+        loader = img.get('vips-loader') if img.get_typeof('vips-loader') else ''
+        image_format = self.LOADER_FORMATS.get(loader.replace('_source', '').replace('_file', ''))
+        if image_format is None:
+            return super().probe(image_path)
+        return ImageInfo(image_format, img.width, img.height)
+
+    def thumbnail(self, image_path: str, max_size: Tuple[int, int]) -> Image.Image:
+        info = self.probe(image_path)
+        size = thumbnail_size(info.width, info.height, max_size)
+        # EXIF 회전은 Pillow와 맞추기 위해 적용하지 않음
+        img = self._vips.Image.thumbnail(image_path, size[0], height=size[1], size='force', no_rotate=True)
+        if img.format != 'uchar':
+            img = img.cast('uchar')
+        mode = self.BAND_MODES.get(img.bands)
+        if mode is None:
+            return super().thumbnail(image_path, max_size)
+        pil_img = Image.frombytes(mode, (img.width, img.height), img.write_to_memory())
+        if mode in ('L', 'LA'):
+            pil_img = pil_img.convert('RGBA' if mode == 'LA' else 'RGB')
+        return self._fit(pil_img, size)
+
+
+BACKENDS = {
+    PillowBackend.name: PillowBackend,
+    TurboJPEGBackend.name: TurboJPEGBackend,
+    VipsBackend.name: VipsBackend,
+}
+
+_instances: Dict[str, PillowBackend] = {}
+_lock = threading.Lock()
+
+
+def available_backends() -> List[str]:
+    """현재 환경에서 사용 가능한 백엔드 이름 목록"""
+    return [name for name in AUTO_ORDER if BACKENDS[name].available()]
+
+
+def get_backend(name: Optional[str] = None) -> PillowBackend:
+    """
+    이미지 백엔드 반환 (프로세스당 1개씩 재사용)
+
+    Args:
+        name: 백엔드 이름 (없으면 환경 변수, 그것도 없으면 auto)
+
+    Returns:
+        백엔드 인스턴스 (요청한 백엔드가 설치되어 있지 않으면 Pillow)
+    """
+    name = (name or os.getenv(BACKEND_ENV) or 'auto').lower()
+    if name == 'auto':
+        name = available_backends()[0]
+    elif name not in BACKENDS:
+        raise ValueError(f"알 수 없는 이미지 백엔드: {name} (사용 가능: {', '.join(BACKENDS)})")
+
+    with _lock:
+        if name not in _instances:
+            backend_class = BACKENDS[name]
+            _instances[name] = backend_class() if backend_class.available() else PillowBackend()
+        return _instances[name]
@@ -0,0 +1,284 @@
+"""
+로컬 이미지 특징 추출 (NumPy)
+시스템 프롬프트가 모델에게 분석시키는 항목 중 로컬에서 싸게 계산할 수 있는 것
+(색 팔레트, 밝기/대비, 주요 색상, 종횡비, 현저성 기반 대략적인 구도)을
+축소 배열에서 벡터 연산으로 계산하고, 모델에 짧은 텍스트로 전달
+
+빠른 모드 (generate_prompt의 image_mode):
+- full: 원본 이미지 전송 (기존 동작)
+- thumbnail: 작은 썸네일 + 특징 텍스트 (이미지 토큰 최소 단위)
+- none: 특징 텍스트만 (이미지 미전송)
+"""
+
+import io
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+IMAGE_MODES = {
+    'full': '원본 이미지',
+    'thumbnail': '썸네일 + 로컬 분석',
+    'none': '로컬 분석만 (이미지 미전송)',
+}
+DEFAULT_IMAGE_MODE = 'full'
+
+# 분석용 축소 크기 (긴 변)
+ANALYSIS_SIZE = 128
+# 현저성 계산용 크기
+SALIENCY_SIZE = 64
+# 밝기 표준편차가 이보다 작으면 단색에 가까운 이미지로 보고 초점 없음으로 처리
+# (평탄한 스펙트럼의 잔차가 (0,0) 한 점에 몰려 '왼쪽 위 단일 피사체'로 잘못 나오는 것 방지)
+FLAT_IMAGE_STD = 0.02
+# 썸네일 크기 - 두 변 모두 384 이하면 이미지 토큰이 최소 단위로 계산됨 (image_io.estimate_image_tokens)
+THUMBNAIL_SIZE = 384
+
+# 색상 이름 (hue 30도 구간, 0도 = 빨강)
+_HUE_NAMES = [
+    'red', 'orange', 'yellow', 'yellow-green', 'green', 'teal',
+    'cyan', 'azure', 'blue', 'violet', 'magenta', 'pink',
+]
+
+_GRID_ROWS = ['upper', 'middle', 'lower']
+_GRID_COLS = ['left', 'center', 'right']
+
+
+def _downsample(img: Image.Image, size: int) -> np.ndarray:
+    """긴 변이 size 이하인 RGB float 배열 (0~1)"""
+    small = img.copy()
+    small.thumbnail((size, size), Image.Resampling.BILINEAR)
+    return np.asarray(small.convert('RGB'), dtype=np.float32) / 255.0
+
+
+def _rgb_to_hsv(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(N, 3) RGB → hue(0~360), saturation, value (벡터 연산)"""
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    value = rgb.max(axis=1)
+    delta = value - rgb.min(axis=1)
+    saturation = np.where(value > 0, delta / np.maximum(value, 1e-6), 0.0)
+
+    safe = np.maximum(delta, 1e-6)
+    hue = np.select(
+        [value == r, value == g],
+        [((g - b) / safe) % 6, (b - r) / safe + 2],
+        default=(r - g) / safe + 4
+    ) * 60.0
+    hue = np.where(delta > 0, hue, 0.0)
+    return hue, saturation, value
+
+
+def kmeans_palette(pixels: np.ndarray, k: int = 5, iterations: int = 12, seed: int = 0) -> List[Tuple[np.ndarray, float]]:
+    """
+    k-means 색 팔레트 (거리 계산/갱신 모두 벡터 연산)
+
+    Args:
+        pixels: (N, 3) RGB 배열 (0~1)
+        k: 색 개수
+        iterations: 최대 반복 횟수
+        seed: 초기 중심 선택 시드 (같은 이미지면 항상 같은 결과)
+
+    Returns:
+        [(RGB 중심, 비율), ...] 비율 내림차순
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(pixels))
+
+    # k-means++ 초기화
+    centers = [pixels[rng.integers(len(pixels))]]
+    for _ in range(1, k):
+        distances = ((pixels[:, None, :] - np.asarray(centers)[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+        total = distances.sum()
+        if total <= 0:
+            break
+        centers.append(pixels[rng.choice(len(pixels), p=distances / total)])
+    centers = np.asarray(centers)
+
+    for _ in range(iterations):
+        labels = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        counts = np.bincount(labels, minlength=len(centers)).astype(np.float32)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, pixels)
+        # 빈 군집은 이전 중심 유지
+        updated = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centers)
+        if np.allclose(updated, centers, atol=1e-4):
+            centers = updated
+            break
+        centers = updated
+
+    labels = ((pixels[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    shares = np.bincount(labels, minlength=len(centers)) / len(pixels)
+    order = np.argsort(-shares)
+    return [(centers[i], float(shares[i])) for i in order if shares[i] > 0]
+
+
+def _box_blur(values: np.ndarray, radius: int) -> np.ndarray:
+    """누적합으로 계산하는 2D 박스 블러 (가장자리는 반사)"""
+    padded = np.pad(values, radius, mode='reflect')
+    size = 2 * radius + 1
+    cumulative = padded.cumsum(axis=0).cumsum(axis=1)
+    cumulative = np.pad(cumulative, ((1, 0), (1, 0)))
+    total = (
+        cumulative[size:, size:] - cumulative[:-size, size:]
+        - cumulative[size:, :-size] + cumulative[:-size, :-size]
+    )
+    return total / (size * size)
+
+
+def spectral_saliency(gray: np.ndarray) -> np.ndarray:
+    """
+    스펙트럼 잔차(spectral residual) 현저성 맵 (0~1)
+
+    Args:
+        gray: (H, W) 밝기 배열
+    """
+    spectrum = np.fft.fft2(gray)
+    log_amplitude = np.log(np.abs(spectrum) + 1e-8)
+    residual = log_amplitude - _box_blur(log_amplitude, 1)
+    saliency = np.abs(np.fft.ifft2(np.exp(residual + 1j * np.angle(spectrum)))) ** 2
+    saliency = _box_blur(saliency, 2)
+    peak = saliency.max()
+    return saliency / peak if peak > 0 else saliency
+
+
+def _composition(img: Image.Image) -> Dict[str, Any]:
+    """현저성 맵의 무게 중심 / 집중도로 대략적인 구도"""
+    small = img.convert('L').resize((SALIENCY_SIZE, SALIENCY_SIZE), Image.Resampling.BILINEAR)
+    gray = np.asarray(small, dtype=np.float32) / 255.0
+    if gray.std() < FLAT_IMAGE_STD:
+        return {'focus': None, 'position': None, 'concentration': 0.0}
+    saliency = spectral_saliency(gray)
+
+    total = saliency.sum()
+    if total <= 0:
+        return {'focus': None, 'position': None, 'concentration': 0.0}
+
+    ys, xs = np.mgrid[0:SALIENCY_SIZE, 0:SALIENCY_SIZE]
+    cx = float((saliency * xs).sum() / total / (SALIENCY_SIZE - 1))
+    cy = float((saliency * ys).sum() / total / (SALIENCY_SIZE - 1))
+
+    # 상위 10% 픽셀이 차지하는 현저성 비율 (높을수록 한 피사체에 집중)
+    flat = np.sort(saliency.ravel())[::-1]
+    concentration = float(flat[:len(flat) // 10].sum() / total)
+
+    position = f"{_GRID_ROWS[min(int(cy * 3), 2)]} {_GRID_COLS[min(int(cx * 3), 2)]}"
+    return {'focus': (round(cx, 2), round(cy, 2)), 'position': position, 'concentration': round(concentration, 2)}
+
+
+def open_reduced(img: Image.Image, size: int = THUMBNAIL_SIZE) -> Tuple[Image.Image, Tuple[int, int]]:
+    """
+    빠른 모드용 축소 디코드 (JPEG는 draft로 1/2~1/8 크기로 바로 디코드)
+
+    Args:
+        img: 아직 로드하지 않은 PIL 이미지 (image_io.load_image 결과)
+        size: 필요한 최소 크기 (긴 변)
+
+    Returns:
+        (로드된 이미지, 원본 크기)
+    """
+    original_size = img.size
+    img.draft('RGB', (size, size))
+    img.load()
+    return img, original_size
+
+
+def compute_descriptors(
+    img: Image.Image,
+    palette_size: int = 5,
+    original_size: Optional[Tuple[int, int]] = None
+) -> Dict[str, Any]:
+    """
+    이미지 특징 계산
+
+    Args:
+        img: PIL 이미지 (image_io.load_image 또는 open_reduced 결과)
+        palette_size: 팔레트 색 개수
+        original_size: 축소 디코드한 경우 원본 크기
+
+    Returns:
+        {'size', 'aspect', 'orientation', 'brightness', 'contrast', 'saturation',
+         'temperature', 'palette', 'hues', 'composition'}
+    """
+    width, height = original_size or img.size
+    rgb = _downsample(img, ANALYSIS_SIZE)
+    pixels = rgb.reshape(-1, 3)
+
+    luminance = pixels @ np.array([0.2126, 0.7152, 0.0722], dtype=np.float32)
+    hue, saturation, value = _rgb_to_hsv(pixels)
+
+    # 무채색/너무 어두운 픽셀은 색상 분포에서 제외
+    chromatic = (saturation > 0.2) & (value > 0.15)
+    hue_bins = np.bincount(((hue[chromatic] + 15) % 360 // 30).astype(int), minlength=12)
+    hue_share = hue_bins / max(len(pixels), 1)
+    hues = [
+        {'name': _HUE_NAMES[i], 'share': round(float(hue_share[i]), 2)}
+        for i in np.argsort(-hue_share)[:3] if hue_share[i] >= 0.05
+    ]
+
+    palette = [
+        {'hex': '#{:02x}{:02x}{:02x}'.format(*(np.clip(center, 0, 1) * 255).round().astype(int)),
+         'share': round(share, 2)}
+        for center, share in kmeans_palette(pixels, palette_size)
+    ]
+
+    ratio = width / height
+    divisor = math.gcd(width, height)
+    return {
+        'size': (width, height),
+        'aspect': round(ratio, 2),
+        'aspect_label': f"{width // divisor}:{height // divisor}" if divisor > 1 and width // divisor <= 32 else f"{ratio:.2f}:1",
+        'orientation': 'square' if 0.95 <= ratio <= 1.05 else ('landscape' if ratio > 1 else 'portrait'),
+        'brightness': round(float(luminance.mean()), 2),
+        'contrast': round(float(luminance.std()), 2),
+        'saturation': round(float(saturation.mean()), 2),
+        'temperature': round(float((pixels[:, 0] - pixels[:, 2]).mean()), 2),
+        'palette': palette,
+        'hues': hues,
+        'composition': _composition(img),
+    }
+
+
+def _level(value: float, low: float, high: float, labels: Tuple[str, str, str]) -> str:
+    return labels[0] if value < low else (labels[2] if value > high else labels[1])
+
+
+def describe(descriptors: Dict[str, Any]) -> str:
+    """특징 → 모델에 보낼 짧은 영어 텍스트 (1줄)"""
+    d = descriptors
+    composition = d['composition']
+    parts = [
+        f"{d['aspect_label']} {d['orientation']}",
+        f"{_level(d['brightness'], 0.3, 0.65, ('dark', 'mid-key', 'bright'))} "
+        f"(luma {d['brightness']}), {_level(d['contrast'], 0.12, 0.25, ('low', 'medium', 'high'))} contrast",
+        f"{_level(d['saturation'], 0.2, 0.45, ('muted', 'moderate', 'vivid'))} colors, "
+        f"{_level(d['temperature'], -0.05, 0.05, ('cool', 'neutral', 'warm'))}",
+        "palette " + ' '.join(f"{c['hex']} {c['share']:.0%}" for c in d['palette']),
+    ]
+    if d['hues']:
+        parts.append("hues " + ', '.join(f"{h['name']} {h['share']:.0%}" for h in d['hues']))
+    if composition['position'] is None:
+        parts.append("no distinct focal point (nearly uniform image)")
+    else:
+        parts.append(
+            f"focal area {composition['position']}, "
+            f"{'single subject' if composition['concentration'] >= 0.35 else 'spread-out detail'}"
+        )
+    return '; '.join(parts)
+
+
+def thumbnail_bytes(img: Image.Image, max_size: int = THUMBNAIL_SIZE) -> Tuple[bytes, str]:
+    """빠른 모드용 JPEG 썸네일 → (바이트, MIME 타입)"""
+    thumb = img.copy()
+    thumb.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+    if thumb.mode != 'RGB':
+        thumb = thumb.convert('RGB')
+    buffer = io.BytesIO()
+    thumb.save(buffer, format='JPEG', quality=85)
+    return buffer.getvalue(), 'image/jpeg'
+
+
+def build_descriptor_text(descriptors: List[Dict[str, Any]]) -> str:
+    """이미지 여러 장의 특징 텍스트 (사용자 메시지 뒤에 붙임)"""
+    lines = [f"- image {index}: {describe(d)}" for index, d in enumerate(descriptors, 1)]
+    return "Locally measured reference image features:\n" + '\n'.join(lines) + '\n'
@@ -0,0 +1,107 @@
+"""
+이미지 로드/검증/전송용 변환
+API 모듈, 전처리 worker 프로세스, GUI가 함께 사용 (google.genai를 import하지 않음)
+"""
+
+import io
+import os
+import math
+from typing import Tuple
+
+from PIL import Image
+
+from image_backends import ImageInfo, get_backend
+
+
+MAX_IMAGE_BYTES = 10 * 1024 * 1024  # 10MB
+SUPPORTED_FORMATS = ['JPEG', 'PNG', 'WEBP']
+
+# Gemini 이미지 토큰: 두 변 모두 384 이하면 258, 아니면 768×768 타일마다 258 (추정용)
+IMAGE_TOKENS_PER_TILE = 258
+IMAGE_TILE_SIZE = 768
+
+
+def validate_image(image_path: str) -> ImageInfo:
+    """
+    이미지 파일 검증 (헤더만 읽음)
+
+    Args:
+        image_path: 이미지 파일 경로
+
+    Returns:
+        이미지 형식/크기
+    """
+    # 파일 크기 체크 (10MB 제한)
+    file_size = os.path.getsize(image_path)
+
+    if file_size > MAX_IMAGE_BYTES:
+        raise ValueError(f"이미지 파일이 너무 큽니다. (최대 10MB, 현재: {file_size / 1024 / 1024:.2f}MB)")
+
+    # 지원 형식 체크
+    info = get_backend().probe(image_path)
+    if info.format not in SUPPORTED_FORMATS:
+        raise ValueError(f"지원하지 않는 이미지 형식입니다: {info.format}")
+
+    return info
+
+
+def load_image(image_path: str) -> Image.Image:
+    """
+    이미지 파일 로드 및 검증
+
+    Args:
+        image_path: 이미지 파일 경로
+
+    Returns:
+        PIL Image 객체
+    """
+    try:
+        validate_image(image_path)
+        return Image.open(image_path)
+
+    except Exception as e:
+        raise Exception(f"이미지 로드 실패: {str(e)}")
+
+
+def load_preview(image_path: str, max_size: Tuple[int, int] = (150, 150)) -> Image.Image:
+    """
+    미리보기용 축소 이미지 (설치된 가장 빠른 백엔드로 축소 디코드)
+
+    Args:
+        image_path: 이미지 파일 경로
+        max_size: (최대 너비, 최대 높이)
+
+    Returns:
+        PIL Image 객체
+    """
+    try:
+        validate_image(image_path)
+        return get_backend().thumbnail(image_path, max_size)
+
+    except Exception as e:
+        raise Exception(f"이미지 로드 실패: {str(e)}")
+
+
+def prepare_image_bytes(image_path: str) -> Tuple[bytes, str]:
+    """
+    이미지 로드 후 전송용 바이트로 변환
+
+    Args:
+        image_path: 이미지 파일 경로
+
+    Returns:
+        (이미지 바이트, MIME 타입)
+    """
+    # 전송 바이트가 백엔드에 따라 달라지지 않도록 재인코딩은 항상 Pillow
+    img = load_image(image_path)
+    # 이미지를 바이트로 변환
+    img_byte_arr = io.BytesIO()
+    img.save(img_byte_arr, format=img.format or 'PNG')
+    return img_byte_arr.getvalue(), f"image/{(img.format or 'PNG').lower()}"
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """이미지 1장의 입력 토큰 추정 (Gemini 타일 규칙 기준)"""
+    if width <= 384 and height <= 384:
+        return IMAGE_TOKENS_PER_TILE
+    return math.ceil(width / IMAGE_TILE_SIZE) * math.ceil(height / IMAGE_TILE_SIZE) * IMAGE_TOKENS_PER_TILE
@@ -0,0 +1,792 @@
+"""
+분산 작업 큐
+카탈로그 규모(수십만 장)의 프롬프트 생성을 여러 머신의 worker가 나눠 처리하기 위한 영속 큐
+
+- 임대(lease): worker가 작업을 가져가면 visibility timeout 동안 다른 worker에게 보이지 않음
+  처리 중에는 heartbeat로 임대를 연장하고, worker가 죽어 연장이 끊기면 다른 worker가 다시 가져감
+- 재시도: 실패하면 지수 백오프 후 다시 대기열로, max_attempts를 넘기면 dead-letter
+- 결과 기록은 현재 임대를 가진 worker만 가능하고 작업 ID 기준 멱등 (임대를 잃은 worker의 늦은 결과는 버림)
+- 백엔드: SQLiteQueueBackend (로컬/단일 호스트), HTTPQueueBackend (다른 머신의 worker가
+  `serve`로 띄운 큐 서버에 접속, 외부에 열 때는 PROMPTMAKER_QUEUE_TOKEN 공유 토큰 필수)
+
+사용 예:
+    python job_queue.py --db catalog.db enqueue rows.csv
+    python job_queue.py --db catalog.db serve --host 0.0.0.0 --port 8765   (PROMPTMAKER_QUEUE_TOKEN 설정 필요)
+    python job_queue.py --queue http://queue-host:8765 work --concurrency 8
+    python job_queue.py --db catalog.db status
+    python job_queue.py --db catalog.db export results.jsonl
+
+rows.csv 형식은 batch_jobs.py와 같음 (id,images,user_text)
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import hmac
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from output_profiles import DEFAULT_OUTPUT_PROFILE
+
+
+STATE_QUEUED = 'queued'
+STATE_LEASED = 'leased'
+STATE_DONE = 'done'
+STATE_DEAD = 'dead'
+JOB_STATES = [STATE_QUEUED, STATE_LEASED, STATE_DONE, STATE_DEAD]
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_VISIBILITY_TIMEOUT = 120.0
+
+# 재시도 대기 시간: RETRY_BASE_DELAY × 2^(시도 횟수-1), 최대 RETRY_MAX_DELAY (초)
+RETRY_BASE_DELAY = 10.0
+RETRY_MAX_DELAY = 600.0
+
+DEFAULT_STATUS_WINDOW = 600.0
+
+# 큐 서버 공유 토큰 (serve / worker 양쪽에 같은 값, 설정되면 모든 요청에 헤더 필수)
+QUEUE_TOKEN_ENV = 'PROMPTMAKER_QUEUE_TOKEN'
+QUEUE_TOKEN_HEADER = 'X-Queue-Token'
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def retry_delay(attempts: int) -> float:
+    """재시도 전 대기 시간 (초)"""
+    return min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+
+
+class QueueBackend:
+    """
+    작업 큐 백엔드 인터페이스
+
+    lease()는 [{'job_id', 'token', 'payload', 'attempt'}, ...]를 반환하며,
+    heartbeat/complete/fail은 그 token으로 자신의 임대인지 확인
+    """
+
+    def enqueue(self, jobs: List[Dict[str, Any]], max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> int:
+        """작업 추가 (같은 ID는 무시) → 새로 추가된 수"""
+        raise NotImplementedError
+
+    def lease(self, worker: str, limit: int, visibility_timeout: float) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def heartbeat(self, job_id: str, token: str, visibility_timeout: float) -> bool:
+        """임대 연장 → 아직 내 임대인지 여부"""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, token: str, worker: str, result: Dict[str, Any], started_at: float) -> bool:
+        """결과 기록 → 이번 기록이 채택되었는지 여부 (임대를 잃었거나 이미 결과가 있으면 False)"""
+        raise NotImplementedError
+
+    def fail(self, job_id: str, token: str, worker: str, error: str, retry: bool = True) -> Optional[str]:
+        """실패 기록 → 바뀐 상태 (queued / dead, 임대를 잃었으면 None)"""
+        raise NotImplementedError
+
+    def requeue_dead(self, job_ids: Optional[List[str]] = None) -> int:
+        raise NotImplementedError
+
+    def stats(self, window: float = DEFAULT_STATUS_WINDOW) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def list_jobs(self, state: str, after: str = '', limit: int = 500) -> List[Dict[str, Any]]:
+        """상태별 작업 목록 (ID 순 페이지 단위, done이면 result 포함)"""
+        raise NotImplementedError
+
+
+class SQLiteQueueBackend(QueueBackend):
+    """SQLite 백엔드 (WAL 모드, 같은 호스트의 여러 프로세스가 공유 가능)"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            state TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_token TEXT,
+            lease_expires REAL,
+            last_error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, available_at);
+        CREATE TABLE IF NOT EXISTS results (
+            job_id TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            worker TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            completed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS results_worker ON results (worker, completed_at);
+        CREATE TABLE IF NOT EXISTS workers (
+            worker TEXT PRIMARY KEY,
+            first_seen REAL NOT NULL,
+            last_seen REAL NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0
+        );
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: DB 파일 경로 (네트워크 파일 시스템에 두지 말 것 - 다른 머신은 HTTP 백엔드 사용)
+        """
+        self.path = path
+        # 프로세스 안에서는 연결 1개를 lock으로 공유 (serve는 요청마다 스레드가 새로 생기므로)
+        # 다른 프로세스와의 경쟁은 SQLite 파일 잠금(BEGIN IMMEDIATE)이 처리
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            yield self._conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            # 쓰기 잠금을 먼저 잡아 임대 경쟁에서 같은 작업을 두 worker가 가져가지 않도록
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _touch_worker(db: sqlite3.Connection, worker: str, now: float, completed: int = 0, failed: int = 0):
+        db.execute(
+            """INSERT INTO workers (worker, first_seen, last_seen, completed, failed) VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(worker) DO UPDATE SET last_seen = excluded.last_seen,
+                   completed = completed + excluded.completed, failed = failed + excluded.failed""",
+            (worker, now, now, completed, failed)
+        )
+
+    def enqueue(self, jobs, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        now = time.time()
+        added = 0
+        with self._transaction() as db:
+            for job in jobs:
+                payload = {k: v for k, v in job.items() if k != 'id'}
+                cursor = db.execute(
+                    """INSERT OR IGNORE INTO jobs (id, payload, state, max_attempts, available_at, created_at, updated_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                    (str(job['id']), json.dumps(payload, ensure_ascii=False), STATE_QUEUED, max_attempts, now, now, now)
+                )
+                added += cursor.rowcount
+        return added
+
+    def lease(self, worker, limit, visibility_timeout):
+        now = time.time()
+        leases = []
+        with self._transaction() as db:
+            # 임대가 만료된 채 시도 횟수를 다 쓴 작업 (worker를 죽이는 작업일 수 있음) → dead-letter
+            db.execute(
+                """UPDATE jobs SET state = ?, lease_token = NULL, updated_at = ?,
+                       last_error = COALESCE(last_error, '임대 만료 (worker 응답 없음)')
+                   WHERE state = ? AND lease_expires <= ? AND attempts >= max_attempts""",
+                (STATE_DEAD, now, STATE_LEASED, now)
+            )
+            rows = db.execute(
+                """SELECT id, payload, attempts FROM jobs
+                   WHERE (state = ? AND available_at <= ?) OR (state = ? AND lease_expires <= ?)
+                   ORDER BY available_at LIMIT ?""",
+                (STATE_QUEUED, now, STATE_LEASED, now, limit)
+            ).fetchall()
+            for row in rows:
+                token = uuid.uuid4().hex
+                db.execute(
+                    """UPDATE jobs SET state = ?, lease_owner = ?, lease_token = ?, lease_expires = ?,
+                           attempts = attempts + 1, updated_at = ? WHERE id = ?""",
+                    (STATE_LEASED, worker, token, now + visibility_timeout, now, row['id'])
+                )
+                leases.append({
+                    'job_id': row['id'], 'token': token,
+                    'payload': json.loads(row['payload']), 'attempt': row['attempts'] + 1,
+                })
+            self._touch_worker(db, worker, now)
+        return leases
+
+    def heartbeat(self, job_id, token, visibility_timeout):
+        now = time.time()
+        with self._transaction() as db:
+            cursor = db.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? WHERE id = ? AND lease_token = ? AND state = ?",
+                (now + visibility_timeout, now, job_id, token, STATE_LEASED)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, token, worker, result, started_at):
+        now = time.time()
+        with self._transaction() as db:
+            # 현재 임대를 가진 worker만 완료 가능 (임대 만료 후 다른 worker가 다시 가져갔거나 dead가 된 작업 제외)
+            cursor = db.execute(
+                """UPDATE jobs SET state = ?, lease_token = NULL, lease_expires = NULL, last_error = NULL,
+                       updated_at = ? WHERE id = ? AND lease_token = ? AND state = ?""",
+                (STATE_DONE, now, job_id, token, STATE_LEASED)
+            )
+            accepted = cursor.rowcount == 1
+            if accepted:
+                # 결과는 먼저 기록된 1개만 유지
+                cursor = db.execute(
+                    "INSERT OR IGNORE INTO results (job_id, result, worker, started_at, completed_at) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, json.dumps(result, ensure_ascii=False), worker, started_at, now)
+                )
+                accepted = cursor.rowcount == 1
+            self._touch_worker(db, worker, now, completed=int(accepted))
+        return accepted
+
+    def fail(self, job_id, token, worker, error, retry=True):
+        now = time.time()
+        with self._transaction() as db:
+            row = db.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND lease_token = ? AND state = ?",
+                (job_id, token, STATE_LEASED)
+            ).fetchone()
+            self._touch_worker(db, worker, now, failed=1)
+            if row is None:
+                return None
+
+            if not retry or row['attempts'] >= row['max_attempts']:
+                state, available_at = STATE_DEAD, now
+            else:
+                state, available_at = STATE_QUEUED, now + retry_delay(row['attempts'])
+            db.execute(
+                """UPDATE jobs SET state = ?, available_at = ?, lease_token = NULL, lease_expires = NULL,
+                       last_error = ?, updated_at = ? WHERE id = ?""",
+                (state, available_at, error[:1000], now, job_id)
+            )
+        return state
+
+    def requeue_dead(self, job_ids=None):
+        now = time.time()
+        with self._transaction() as db:
+            if job_ids:
+                placeholders = ','.join('?' * len(job_ids))
+                cursor = db.execute(
+                    f"""UPDATE jobs SET state = ?, attempts = 0, available_at = ?, updated_at = ?
+                        WHERE state = ? AND id IN ({placeholders})""",
+                    (STATE_QUEUED, now, now, STATE_DEAD, *job_ids)
+                )
+            else:
+                cursor = db.execute(
+                    "UPDATE jobs SET state = ?, attempts = 0, available_at = ?, updated_at = ? WHERE state = ?",
+                    (STATE_QUEUED, now, now, STATE_DEAD)
+                )
+        return cursor.rowcount
+
+    def stats(self, window=DEFAULT_STATUS_WINDOW):
+        now = time.time()
+        counts = {state: 0 for state in JOB_STATES}
+        with self._read() as db:
+            for row in db.execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state"):
+                counts[row['state']] = row['n']
+            recent = {
+                row['worker']: row
+                for row in db.execute(
+                    """SELECT worker, COUNT(*) AS n, AVG(completed_at - started_at) AS avg_seconds
+                       FROM results WHERE completed_at >= ? GROUP BY worker""",
+                    (now - window,)
+                )
+            }
+            leased = {
+                row['lease_owner']: row['n']
+                for row in db.execute(
+                    "SELECT lease_owner, COUNT(*) AS n FROM jobs WHERE state = ? GROUP BY lease_owner", (STATE_LEASED,)
+                )
+            }
+            worker_rows = db.execute("SELECT * FROM workers ORDER BY worker").fetchall()
+
+        workers = []
+        for row in worker_rows:
+            recent_row = recent.get(row['worker'])
+            lifetime = max(row['last_seen'] - row['first_seen'], 1.0)
+            workers.append({
+                'worker': row['worker'],
+                'completed': row['completed'],
+                'failed': row['failed'],
+                'leased': leased.get(row['worker'], 0),
+                'recent_completed': recent_row['n'] if recent_row else 0,
+                'per_minute': round((recent_row['n'] if recent_row else 0) / (window / 60), 2),
+                'lifetime_per_minute': round(row['completed'] / (lifetime / 60), 2),
+                'avg_seconds': round(recent_row['avg_seconds'], 2) if recent_row else None,
+                'last_seen_seconds_ago': round(now - row['last_seen'], 1),
+            })
+
+        total_recent = sum(worker['recent_completed'] for worker in workers)
+        return {
+            'states': counts,
+            'total': sum(counts.values()),
+            'window_seconds': window,
+            'per_minute': round(total_recent / (window / 60), 2),
+            'workers': workers,
+        }
+
+    def list_jobs(self, state, after='', limit=500):
+        if state == STATE_DONE:
+            with self._read() as db:
+                rows = db.execute(
+                    """SELECT j.id, j.payload, j.attempts, r.result, r.worker FROM jobs j JOIN results r ON r.job_id = j.id
+                       WHERE j.state = ? AND j.id > ? ORDER BY j.id LIMIT ?""",
+                    (state, after, limit)
+                ).fetchall()
+            return [
+                {'id': row['id'], 'payload': json.loads(row['payload']), 'attempts': row['attempts'],
+                 'worker': row['worker'], 'result': json.loads(row['result'])}
+                for row in rows
+            ]
+
+        with self._read() as db:
+            rows = db.execute(
+                """SELECT id, payload, attempts, last_error, lease_owner FROM jobs
+                   WHERE state = ? AND id > ? ORDER BY id LIMIT ?""",
+                (state, after, limit)
+            ).fetchall()
+        return [
+            {'id': row['id'], 'payload': json.loads(row['payload']), 'attempts': row['attempts'],
+             'worker': row['lease_owner'], 'error': row['last_error']}
+            for row in rows
+        ]
+
+
+# === HTTP (다른 머신의 worker용) ===
+
+_REMOTE_METHODS = ['enqueue', 'lease', 'heartbeat', 'complete', 'fail', 'requeue_dead', 'stats', 'list_jobs']
+
+
+class HTTPQueueBackend(QueueBackend):
+    """serve 명령으로 띄운 큐 서버에 접속하는 백엔드"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0, token: Optional[str] = None):
+        """
+        Args:
+            base_url: 큐 서버 URL
+            timeout: 요청 타임아웃 (초)
+            token: 공유 토큰 (없으면 환경변수 PROMPTMAKER_QUEUE_TOKEN)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = token or os.getenv(QUEUE_TOKEN_ENV)
+
+    def _call(self, method: str, **kwargs) -> Any:
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers[QUEUE_TOKEN_HEADER] = self.token
+        request = urllib.request.Request(
+            f"{self.base_url}/{method}",
+            data=json.dumps(kwargs, ensure_ascii=False).encode('utf-8'),
+            headers=headers,
+            method='POST'
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))['value']
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"큐 서버 오류 ({method}, HTTP {e.code}): {e.read().decode('utf-8', errors='replace')[:300]}")
+
+    def enqueue(self, jobs, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        return self._call('enqueue', jobs=jobs, max_attempts=max_attempts)
+
+    def lease(self, worker, limit, visibility_timeout):
+        return self._call('lease', worker=worker, limit=limit, visibility_timeout=visibility_timeout)
+
+    def heartbeat(self, job_id, token, visibility_timeout):
+        return self._call('heartbeat', job_id=job_id, token=token, visibility_timeout=visibility_timeout)
+
+    def complete(self, job_id, token, worker, result, started_at):
+        return self._call('complete', job_id=job_id, token=token, worker=worker, result=result, started_at=started_at)
+
+    def fail(self, job_id, token, worker, error, retry=True):
+        return self._call('fail', job_id=job_id, token=token, worker=worker, error=error, retry=retry)
+
+    def requeue_dead(self, job_ids=None):
+        return self._call('requeue_dead', job_ids=job_ids)
+
+    def stats(self, window=DEFAULT_STATUS_WINDOW):
+        return self._call('stats', window=window)
+
+    def list_jobs(self, state, after='', limit=500):
+        return self._call('list_jobs', state=state, after=after, limit=limit)
+
+
+def create_queue_server(
+    backend: QueueBackend,
+    host: str = '127.0.0.1',
+    port: int = 8765,
+    token: Optional[str] = None
+) -> ThreadingHTTPServer:
+    """
+    큐 서버 생성 (POST /<메서드> → {"value": 결과})
+
+    Args:
+        backend: 실제 큐 백엔드
+        host: 바인드 주소
+        port: 포트
+        token: 공유 토큰 (없으면 환경변수 PROMPTMAKER_QUEUE_TOKEN, 설정되면 X-Queue-Token 헤더 필수)
+    """
+    token = token or os.getenv(QUEUE_TOKEN_ENV)
+
+    class QueueHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            method = self.path.strip('/')
+            status = 200
+            try:
+                if token and not hmac.compare_digest(self.headers.get(QUEUE_TOKEN_HEADER, ''), token):
+                    raise PermissionError(method)
+                if method not in _REMOTE_METHODS:
+                    raise KeyError(method)
+                length = int(self.headers.get('Content-Length', 0))
+                kwargs = json.loads(self.rfile.read(length) or b'{}')
+                body = {'value': getattr(backend, method)(**kwargs)}
+            except PermissionError:
+                status, body = 401, {'error': "큐 토큰이 없거나 일치하지 않습니다."}
+            except KeyError:
+                status, body = 404, {'error': f"알 수 없는 메서드: {method}"}
+            except Exception as e:
+                status, body = 500, {'error': str(e)}
+
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ThreadingHTTPServer((host, port), QueueHandler)
+
+
+def open_backend(db: Optional[str] = None, queue_url: Optional[str] = None) -> QueueBackend:
+    """CLI 인자로 백엔드 선택 (--queue가 있으면 HTTP, 아니면 SQLite)"""
+    if queue_url:
+        return HTTPQueueBackend(queue_url)
+    return SQLiteQueueBackend(db or 'job_queue.db')
+
+
+# === Worker ===
+
+class QueueWorker:
+    """큐에서 작업을 임대하여 처리하는 worker"""
+
+    def __init__(
+        self,
+        backend: QueueBackend,
+        generator,
+        worker_id: Optional[str] = None,
+        concurrency: int = 4,
+        visibility_timeout: float = DEFAULT_VISIBILITY_TIMEOUT,
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        poll_interval: float = 2.0,
+        limiter=None,
+        image_mode: str = 'full'
+    ):
+        """
+        Args:
+            backend: 큐 백엔드
+            generator: GeminiPromptGenerator (또는 같은 인터페이스)
+            worker_id: worker 이름 (없으면 호스트명-PID)
+            concurrency: 동시에 처리할 작업 수
+            visibility_timeout: 임대 시간 (초, heartbeat는 이 시간의 1/3마다)
+            output_profile: 작업에 프로필이 없을 때 사용할 출력 프로필
+            poll_interval: 가져올 작업이 없을 때 대기 시간 (초)
+            limiter: concurrency.AdaptiveLimiter (있으면 concurrency는 상한, 실제 동시 처리 수는 limiter 한도)
+            image_mode: 작업에 이미지 모드가 없을 때 사용할 이미지 전송 방식 (image_descriptors.IMAGE_MODES)
+        """
+        self.backend = backend
+        self.generator = generator
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.concurrency = concurrency
+        self.visibility_timeout = visibility_timeout
+        self.output_profile = output_profile
+        self.poll_interval = poll_interval
+        self.limiter = limiter
+        self.image_mode = image_mode
+
+        self.stop_event = threading.Event()
+        self._active: Dict[str, str] = {}  # job_id → token
+        self._lost: Set[Tuple[str, str]] = set()  # heartbeat로 임대를 잃은 것을 확인한 (job_id, token)
+        self._lock = threading.Lock()
+
+    def _heartbeat_loop(self):
+        interval = self.visibility_timeout / 3
+        while not self.stop_event.wait(interval):
+            with self._lock:
+                active = list(self._active.items())
+            for job_id, token in active:
+                try:
+                    alive = self.backend.heartbeat(job_id, token, self.visibility_timeout)
+                except Exception as e:
+                    print(f"⚠️ heartbeat 실패 ({job_id}): {e}")
+                    continue
+                if not alive:
+                    # 임대 만료 후 다른 worker가 가져갔거나 dead가 됨 → 결과를 기록하지 않음
+                    print(f"⚠️ {job_id}: 임대를 잃었습니다. 처리 결과는 버립니다.")
+                    with self._lock:
+                        self._lost.add((job_id, token))
+                        if self._active.get(job_id) == token:
+                            del self._active[job_id]
+
+    def _process(self, lease: Dict[str, Any]):
+        job_id, token, payload = lease['job_id'], lease['token'], lease['payload']
+        started_at = time.time()
+        try:
+            breaker = getattr(self.generator, 'breaker', None)
+
+            def call():
+                return self.generator.generate_prompt(
+                    payload['image_paths'], payload['user_text'],
+                    output_profile=payload.get('output_profile') or self.output_profile,
+                    image_mode=payload.get('image_mode') or self.image_mode
+                )
+
+            def generate():
+                return self.limiter.call(call) if self.limiter else call()
+
+            # API가 연속 실패 중이면 복구될 때까지 대기 (임대는 heartbeat로 유지)
+            result = breaker.call_when_ready(generate, self.stop_event) if breaker else generate()
+            with self._lock:
+                lost = (job_id, token) in self._lost
+            if lost:
+                print(f"⏭️ {job_id} ({time.time() - started_at:.1f}초) - 임대를 잃어 결과를 기록하지 않음")
+                return
+            accepted = self.backend.complete(job_id, token, self.worker_id, result, started_at)
+            print(f"✅ {job_id} ({time.time() - started_at:.1f}초){'' if accepted else ' - 임대를 잃었거나 이미 다른 결과가 있어 무시됨'}")
+        except Exception as e:
+            try:
+                state = self.backend.fail(job_id, token, self.worker_id, str(e))
+                print(f"❌ {job_id} (시도 {lease['attempt']}회, → {state or '임대 만료'}): {e}")
+            except Exception as report_error:
+                # 큐에 기록하지 못하면 임대 만료 후 다른 worker가 다시 처리
+                print(f"❌ {job_id}: {e} / 실패 기록 불가: {report_error}")
+        finally:
+            with self._lock:
+                self._lost.discard((job_id, token))
+                # 임대를 잃은 뒤 같은 작업을 다시 임대했으면 새 임대는 남겨 둠
+                if self._active.get(job_id) == token:
+                    del self._active[job_id]
+
+    def run(self, drain: bool = False):
+        """
+        작업 처리 시작
+
+        Args:
+            drain: 대기열이 비면 종료 (아니면 stop() 전까지 계속 대기)
+        """
+        print(f"🛠️ worker 시작: {self.worker_id} (동시 {self.concurrency}개)")
+        threading.Thread(target=self._heartbeat_loop, daemon=True).start()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='queue-worker') as pool:
+            while not self.stop_event.is_set():
+                # 자동 조절 중이면 한도만큼만 임대 (임대한 채 limiter 대기로 visibility timeout을 쓰지 않도록)
+                capacity = min(self.limiter.limit, self.concurrency) if self.limiter else self.concurrency
+                with self._lock:
+                    free = capacity - len(self._active)
+
+                leases = []
+                if free > 0:
+                    try:
+                        leases = self.backend.lease(self.worker_id, free, self.visibility_timeout)
+                    except Exception as e:
+                        print(f"⚠️ 작업 임대 실패: {e}")
+
+                for lease in leases:
+                    with self._lock:
+                        self._active[lease['job_id']] = lease['token']
+                    pool.submit(self._process, lease)
+
+                if leases:
+                    continue
+                if drain:
+                    with self._lock:
+                        idle = not self._active
+                    states = self.backend.stats()['states'] if idle else None
+                    if idle and not states[STATE_QUEUED] and not states[STATE_LEASED]:
+                        break
+                self.stop_event.wait(self.poll_interval)
+
+        self.stop_event.set()
+        if self.limiter:
+            print(f"⚙️ 동시 실행 자동 조절: {json.dumps(self.limiter.snapshot(), ensure_ascii=False)}")
+        print(f"🛑 worker 종료: {self.worker_id}")
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def iter_jobs(backend: QueueBackend, state: str, page_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """상태별 작업 전체 (페이지 단위 조회)"""
+    after = ''
+    while True:
+        page = backend.list_jobs(state, after, page_size)
+        if not page:
+            return
+        yield from page
+        after = page[-1]['id']
+
+
+def print_status(stats: Dict[str, Any]):
+    states = stats['states']
+    total = stats['total'] or 1
+    print(f"📦 전체 {stats['total']}건 - " + ", ".join(
+        f"{state} {states[state]} ({states[state] / total * 100:.1f}%)" for state in JOB_STATES
+    ))
+    print(f"⏱️ 최근 {stats['window_seconds'] / 60:.0f}분 처리량: {stats['per_minute']}건/분")
+    if stats['per_minute'] and (states[STATE_QUEUED] or states[STATE_LEASED]):
+        remaining = (states[STATE_QUEUED] + states[STATE_LEASED]) / stats['per_minute']
+        print(f"   남은 예상 시간: {remaining / 60:.1f}시간")
+
+    if stats['workers']:
+        print(f"\n{'worker':<28} {'완료':>8} {'실패':>6} {'처리 중':>7} {'건/분':>7} {'전체 건/분':>10} {'평균 초':>8} {'마지막':>8}")
+        for worker in stats['workers']:
+            avg = f"{worker['avg_seconds']:.1f}" if worker['avg_seconds'] is not None else '-'
+            print(
+                f"{worker['worker']:<28} {worker['completed']:>8} {worker['failed']:>6} {worker['leased']:>7} "
+                f"{worker['per_minute']:>7} {worker['lifetime_per_minute']:>10} {avg:>8} "
+                f"{worker['last_seen_seconds_ago']:>7.0f}s"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분산 작업 큐")
+    parser.add_argument('--db', default='job_queue.db', help="SQLite DB 경로")
+    parser.add_argument('--queue', default=None, help="큐 서버 URL (예: http://queue-host:8765, 지정 시 --db 무시)")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('enqueue', help="작업 추가 (같은 ID는 무시)")
+    p.add_argument('rows', help="입력 파일 (CSV 또는 JSONL)")
+    p.add_argument('--profile', default=None, help="작업별 출력 프로필 (없으면 worker 설정)")
+    p.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS, help="dead-letter 전 최대 시도 횟수")
+
+    p = sub.add_parser('work', help="worker 실행")
+    p.add_argument('--worker-id', default=None, help="worker 이름 (기본: 호스트명-PID)")
+    p.add_argument('--concurrency', type=int, default=4, help="동시 처리 수 (--adaptive면 상한)")
+    p.add_argument('--adaptive', action='store_true', help="응답 상태에 따라 동시 처리 수 자동 조절 (AIMD)")
+    p.add_argument('--visibility-timeout', type=float, default=DEFAULT_VISIBILITY_TIMEOUT, help="임대 시간 (초)")
+    p.add_argument('--profile', default=DEFAULT_OUTPUT_PROFILE, help="기본 출력 프로필")
+    p.add_argument('--template', default=None, help="프롬프트 템플릿 (prompt_templates.py 참고)")
+    p.add_argument('--image-mode', choices=['full', 'thumbnail', 'none'], default='full',
+                   help="이미지 전송 방식 (thumbnail/none: 로컬 특징 텍스트로 이미지 토큰 절약)")
+    p.add_argument('--drain', action='store_true', help="대기열이 비면 종료")
+
+    p = sub.add_parser('status', help="진행 상황 및 worker별 처리량")
+    p.add_argument('--window', type=float, default=DEFAULT_STATUS_WINDOW, help="처리량 계산 구간 (초)")
+    p.add_argument('--json', action='store_true', help="JSON으로 출력")
+
+    sub.add_parser('dead', help="dead-letter 작업 목록")
+
+    p = sub.add_parser('requeue-dead', help="dead-letter 작업을 다시 대기열로")
+    p.add_argument('ids', nargs='*', help="작업 ID (없으면 전체)")
+
+    p = sub.add_parser('export', help="결과를 JSONL로 저장")
+    p.add_argument('output', help="결과 JSONL 경로")
+
+    p = sub.add_parser('serve', help="다른 머신의 worker용 큐 서버 실행 (SQLite DB 사용)")
+    p.add_argument('--host', default='127.0.0.1',
+                   help="바인드 주소 (다른 머신에서 접속하려면 0.0.0.0 등 + PROMPTMAKER_QUEUE_TOKEN 필요)")
+    p.add_argument('--port', type=int, default=8765, help="포트")
+
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    if args.command == 'serve':
+        # 인증 없이 외부에 열면 누구나 작업 추가(로컬 파일 경로 포함)/결과 위조가 가능하므로 거부
+        if args.host not in LOOPBACK_HOSTS and not os.getenv(QUEUE_TOKEN_ENV):
+            print(f"❌ {args.host}에 바인드하려면 {QUEUE_TOKEN_ENV}을 설정하세요. (worker에도 같은 값 필요)")
+            sys.exit(2)
+        server = create_queue_server(SQLiteQueueBackend(args.db), args.host, args.port)
+        print(f"📡 큐 서버 실행 중: http://{args.host}:{args.port} (DB: {args.db})")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    backend = open_backend(args.db, args.queue)
+
+    if args.command == 'enqueue':
+        from batch_jobs import read_rows
+
+        rows = read_rows(args.rows)
+        if args.profile:
+            rows = [dict(row, output_profile=args.profile) for row in rows]
+        added = 0
+        for start in range(0, len(rows), 1000):
+            added += backend.enqueue(rows[start:start + 1000], args.max_attempts)
+        print(f"✅ {added}건 추가 (중복 {len(rows) - added}건 무시)")
+
+    elif args.command == 'work':
+        from gemini_api import GeminiPromptGenerator
+
+        limiter = None
+        if args.adaptive:
+            from concurrency import AdaptiveLimiter
+
+            limiter = AdaptiveLimiter(
+                max_limit=args.concurrency,
+                on_change=lambda before, after, reason: print(f"⚙️ 동시 처리 한도 {before} → {after} ({reason})")
+            )
+        worker = QueueWorker(
+            backend, GeminiPromptGenerator(prompt_template=args.template), args.worker_id, args.concurrency,
+            args.visibility_timeout, args.profile, limiter=limiter, image_mode=args.image_mode
+        )
+        try:
+            worker.run(drain=args.drain)
+        except KeyboardInterrupt:
+            # 처리 중이던 작업은 임대 만료 후 다른 worker가 가져감
+            worker.stop()
+
+    elif args.command == 'status':
+        stats = backend.stats(args.window)
+        if args.json:
+            print(json.dumps(stats, indent=2, ensure_ascii=False))
+        else:
+            print_status(stats)
+
+    elif args.command == 'dead':
+        for job in iter_jobs(backend, STATE_DEAD):
+            print(f"{job['id']}\t시도 {job['attempts']}회\t{job['error']}")
+
+    elif args.command == 'requeue-dead':
+        print(f"✅ {backend.requeue_dead(args.ids or None)}건을 다시 대기열에 넣었습니다.")
+
+    elif args.command == 'export':
+        counts = {'done': 0, 'dead': 0}
+        with open(args.output, 'w', encoding='utf-8') as out:
+            for state, key in ((STATE_DONE, 'result'), (STATE_DEAD, 'error')):
+                for job in iter_jobs(backend, state):
+                    out.write(json.dumps({'id': job['id'], key: job[key]}, ensure_ascii=False) + '\n')
+                    counts[state] += 1
+        print(f"✅ 저장 완료: 성공 {counts['done']}건, 실패 {counts['dead']}건 → {args.output}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,262 @@
+"""
+출력 프로필 정의
+프로필마다 모델에 요청할 필드, 지시문, 출력 스키마, 출력 토큰 예산을 지정
+(GUI 시작 시에도 import되므로 무거운 모듈을 import하지 말 것)
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+# 결과 JSON의 prompts 필드 (프로필과 무관하게 항상 이 순서/키로 반환)
+PROMPT_FIELDS = ['style_prompt', 'scene_prompt', 'final_prompt']
+
+DEFAULT_OUTPUT_PROFILE = 'full'
+
+RESULT_VERSION = '3.0'
+ENGINE_NAME = 'gemini-2.5-flash'
+
+# 필드별 출력 형식 설명
+_FIELD_DESCRIPTIONS = {
+    'style_prompt': "[스타일 중심의 상세한 프롬프트 - 200단어 이상, 영어로 작성]",
+    'scene_prompt': "[장면 중심의 상세한 프롬프트 - 영어로 작성]",
+    'final_prompt': "[최종 통합 프롬프트 - 바로 사용 가능, 영어로 작성]",
+}
+
+# 단어 수 제한이 있는 프로필용 ({max_words}는 프로필 값으로 치환)
+_CAPPED_FIELD_DESCRIPTIONS = {
+    'scene_prompt': "[장면 중심의 프롬프트 - 영어로 작성, {max_words}단어 이하]",
+    'final_prompt': "[최종 통합 프롬프트 - 바로 사용 가능, 영어로 작성, {max_words}단어 이하]",
+}
+
+OUTPUT_PROFILES: Dict[str, Dict[str, Any]] = {
+    # 기존 출력 형식 그대로 (meta/inputs까지 모델이 작성)
+    'full': {
+        'label': '전체 (스타일+장면+최종)',
+        'fields': ['style_prompt', 'scene_prompt', 'final_prompt'],
+        'model_writes_meta': True,
+        'max_words': None,
+        'max_output_tokens': 8192,
+        'extra_rules': [],
+    },
+    # 장면 + 최종 프롬프트 (200단어 style_prompt 생략)
+    'standard': {
+        'label': '표준 (장면+최종)',
+        'fields': ['scene_prompt', 'final_prompt'],
+        'model_writes_meta': False,
+        'max_words': 150,
+        'max_output_tokens': 1024,
+        'extra_rules': ["각 프롬프트는 {max_words}단어 이하로 작성"],
+    },
+    # final_prompt만 (출력 토큰 최소화 - 가장 빠름)
+    'compact': {
+        'label': '간단 (최종만)',
+        'fields': ['final_prompt'],
+        'model_writes_meta': False,
+        'max_words': 80,
+        'max_output_tokens': 384,
+        'extra_rules': ["final_prompt는 {max_words}단어 이하로 핵심만 간결하게 작성"],
+    },
+}
+
+
+def get_output_profile(name: Optional[str] = None, max_words: Optional[int] = None) -> Dict[str, Any]:
+    """
+    출력 프로필 조회
+
+    Args:
+        name: 프로필 이름 (없으면 기본 프로필)
+        max_words: 프롬프트 최대 단어 수 (지정 시 프로필 값을 덮어쓰고 토큰 예산도 조정)
+
+    Returns:
+        프로필 딕셔너리 사본 (name 키 포함)
+    """
+    name = name or DEFAULT_OUTPUT_PROFILE
+    if name not in OUTPUT_PROFILES:
+        raise ValueError(
+            f"알 수 없는 출력 프로필입니다: {name} "
+            f"(사용 가능: {', '.join(OUTPUT_PROFILES)})"
+        )
+
+    profile = dict(OUTPUT_PROFILES[name], name=name)
+
+    if max_words is not None:
+        if max_words <= 0:
+            raise ValueError("max_words는 1 이상이어야 합니다.")
+        profile['max_words'] = max_words
+        # 영어 1단어 ≈ 1.3토큰, 필드 수 + JSON 오버헤드 고려
+        profile['max_output_tokens'] = int(max_words * 1.5 * len(profile['fields'])) + 128
+
+    return profile
+
+
+def build_output_format(profile: Dict[str, Any]) -> str:
+    """
+    프로필의 출력 형식 지시문 생성 (시스템 프롬프트의 '# 출력 형식' 본문)
+
+    Args:
+        profile: get_output_profile() 결과
+
+    Returns:
+        JSON 예시를 포함한 지시문
+    """
+    max_words = profile.get('max_words')
+    lines = []
+
+    for field in profile['fields']:
+        description = _FIELD_DESCRIPTIONS[field]
+        if max_words and field in _CAPPED_FIELD_DESCRIPTIONS:
+            description = _CAPPED_FIELD_DESCRIPTIONS[field].format(max_words=max_words)
+        lines.append(f'    "{field}": "{description}"')
+
+    prompts_block = '  "prompts": {\n' + ',\n'.join(lines) + '\n  }'
+
+    if profile.get('model_writes_meta'):
+        header = (
+            '  "meta": {\n'
+            f'    "version": "{RESULT_VERSION}",\n'
+            f'    "engine": "{ENGINE_NAME}",\n'
+            '    "generated_at": "[ISO 8601 timestamp]"\n'
+            '  },\n'
+            '  "inputs": {\n'
+            '    "reference_images_count": [이미지 개수],\n'
+            '    "user_scene_text": "[사용자가 입력한 텍스트]"\n'
+            '  },\n'
+        )
+    else:
+        header = ''
+
+    return (
+        "반드시 아래 JSON 구조로 출력하세요 (JSON만 출력하고 다른 텍스트는 포함하지 마세요):\n"
+        "{\n" + header + prompts_block + "\n}"
+    )
+
+
+def build_extra_rules(profile: Dict[str, Any]) -> List[str]:
+    """프로필 전용 작성 규칙 목록"""
+    return [rule.format(max_words=profile.get('max_words')) for rule in profile['extra_rules']]
+
+
+def build_response_schema(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    프로필의 응답 스키마 (GenerateContentConfig.response_schema 형식)
+
+    Args:
+        profile: get_output_profile() 결과
+
+    Returns:
+        스키마 딕셔너리
+    """
+    prompts_schema = {
+        'type': 'OBJECT',
+        'properties': {field: {'type': 'STRING'} for field in profile['fields']},
+        'required': list(profile['fields']),
+        'property_ordering': list(profile['fields']),
+    }
+
+    properties = {'prompts': prompts_schema}
+    ordering = ['prompts']
+
+    if profile.get('model_writes_meta'):
+        properties['meta'] = {
+            'type': 'OBJECT',
+            'properties': {
+                'version': {'type': 'STRING'},
+                'engine': {'type': 'STRING'},
+                'generated_at': {'type': 'STRING'},
+            },
+        }
+        properties['inputs'] = {
+            'type': 'OBJECT',
+            'properties': {
+                'reference_images_count': {'type': 'INTEGER'},
+                'user_scene_text': {'type': 'STRING'},
+            },
+        }
+        ordering = ['meta', 'inputs', 'prompts']
+
+    return {
+        'type': 'OBJECT',
+        'properties': properties,
+        'required': ['prompts'],
+        'property_ordering': ordering,
+    }
+
+
+def _cap_words(text: str, max_words: int) -> str:
+    """단어 수 제한 (초과분은 단어 경계에서 자름)"""
+    words = text.split()
+    if len(words) <= max_words:
+        return text
+    return ' '.join(words[:max_words]).rstrip(',;:')
+
+
+def normalize_result(
+    result: Dict[str, Any],
+    profile: Dict[str, Any],
+    image_count: int,
+    user_text: str
+) -> Dict[str, Any]:
+    """
+    결과 JSON을 프로필과 무관한 고정 구조로 정리
+
+    - meta / inputs가 없으면 채움
+    - prompts에는 항상 PROMPT_FIELDS 키가 모두 존재
+      (프로필이 요청하지 않은 필드: None + meta.omitted_fields,
+       요청했지만 응답에 없는 필드: None + meta.missing_fields)
+    - 단어 수 제한이 있는 프로필은 초과분을 잘라냄
+
+    Args:
+        result: 파싱된 모델 응답
+        profile: get_output_profile() 결과
+        image_count: 참고 이미지 개수
+        user_text: 사용자 입력 텍스트
+
+    Returns:
+        정리된 결과 딕셔너리 (result를 직접 수정하여 반환)
+    """
+    meta = result.get('meta')
+    if not isinstance(meta, dict):
+        meta = result['meta'] = {}
+    meta.setdefault('version', RESULT_VERSION)
+    meta.setdefault('engine', ENGINE_NAME)
+    if 'generated_at' not in meta:
+        meta['generated_at'] = datetime.utcnow().isoformat() + 'Z'
+    meta['output_profile'] = profile['name']
+
+    inputs = result.get('inputs')
+    if not isinstance(inputs, dict):
+        inputs = result['inputs'] = {}
+    inputs.setdefault('reference_images_count', image_count)
+    inputs.setdefault('user_scene_text', user_text)
+
+    prompts = result.get('prompts')
+    if not isinstance(prompts, dict):
+        prompts = {}
+
+    omitted = []
+    missing = []
+    normalized = {}
+    max_words = profile.get('max_words')
+
+    for field in PROMPT_FIELDS:
+        value = prompts.get(field)
+        if field not in profile['fields']:
+            normalized[field] = value if isinstance(value, str) and value.strip() else None
+            if normalized[field] is None:
+                omitted.append(field)
+        elif isinstance(value, str) and value.strip():
+            normalized[field] = _cap_words(value.strip(), max_words) if max_words else value
+        else:
+            normalized[field] = None
+            missing.append(field)
+
+    result['prompts'] = normalized
+    meta['omitted_fields'] = omitted
+    meta['missing_fields'] = missing
+
+    # 키 순서 고정 (meta → inputs → prompts)
+    for key in ('meta', 'inputs', 'prompts'):
+        result[key] = result.pop(key)
+
+    return result
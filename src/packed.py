@@ -0,0 +1,313 @@
+"""
+묶음 생성 (packed mode)
+작은 썸네일 대량 작업에서 요청마다 반복되는 시스템 프롬프트/요청 오버헤드를 줄이기 위해
+독립된 작업 K개를 요청 1개에 담고, job_id별 결과 배열로 받아 작업별 결과로 다시 나눔
+
+- 응답 스키마: {"results": [{"job_id", "prompts"}, ...]}
+- 검증에 실패한 항목(누락/필드 부족/잘림)만 다음 묶음에서 다시 시도
+- K는 출력 토큰 상한에 맞춰 조절 (작업당 실제 출력 토큰을 지수 평균으로 추적, 잘리면 줄임)
+
+사용 예:
+    python packed.py rows.csv results.jsonl --profile compact --max-pack 8
+
+rows.csv 형식은 batch_jobs.py와 같음 (id,images,user_text)
+"""
+
+import sys
+import json
+import argparse
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from google.genai.types import Part
+
+from health import CircuitOpenError
+from output_profiles import DEFAULT_OUTPUT_PROFILE, build_response_schema, get_output_profile, normalize_result
+from prompt_templates import build_packed_instructions, build_user_message
+from response_parser import PATH_REPAIRED, parse_prompt_response
+
+
+# 묶음 요청 1개의 응답 토큰 상한 (길수록 잘렸을 때 다시 보내는 양도 커짐)
+DEFAULT_PACKED_OUTPUT_TOKENS = 8192
+DEFAULT_MAX_PACK = 8
+# 묶음 요청 1개에 담을 최대 이미지 수
+DEFAULT_MAX_IMAGES = 16
+
+# 작업당 출력 토큰 추정에 곱할 여유 비율 / 잘렸을 때 추정값에 곱할 비율
+TOKEN_MARGIN = 1.3
+TRUNCATION_PENALTY = 1.5
+
+
+def build_packed_response_schema(profile: Dict[str, Any]) -> Dict[str, Any]:
+    """묶음 응답 스키마 (항목마다 job_id + 프로필의 prompts)"""
+    prompts_schema = build_response_schema(dict(profile, model_writes_meta=False))['properties']['prompts']
+    return {
+        'type': 'OBJECT',
+        'properties': {
+            'results': {
+                'type': 'ARRAY',
+                'items': {
+                    'type': 'OBJECT',
+                    'properties': {
+                        'job_id': {'type': 'STRING'},
+                        'prompts': prompts_schema,
+                    },
+                    'required': ['job_id', 'prompts'],
+                    'property_ordering': ['job_id', 'prompts'],
+                },
+            },
+        },
+        'required': ['results'],
+    }
+
+
+class PackedPromptGenerator:
+    """GeminiPromptGenerator를 감싸 여러 작업을 묶어 생성 (한 스레드에서 사용)"""
+
+    def __init__(
+        self,
+        generator,
+        max_pack: int = DEFAULT_MAX_PACK,
+        max_output_tokens: int = DEFAULT_PACKED_OUTPUT_TOKENS,
+        max_images: int = DEFAULT_MAX_IMAGES,
+        max_retries: int = 2,
+        smoothing: float = 0.3
+    ):
+        """
+        Args:
+            generator: GeminiPromptGenerator (모델 호출/이미지 변환/템플릿 공유)
+            max_pack: 요청 1개에 담을 최대 작업 수
+            max_output_tokens: 묶음 요청 1개의 응답 토큰 상한
+            max_images: 요청 1개에 담을 최대 이미지 수
+            max_retries: 검증 실패 항목을 다시 시도할 최대 횟수
+            smoothing: 작업당 출력 토큰 지수 평균 계수
+        """
+        self.generator = generator
+        self.max_pack = max_pack
+        self.max_output_tokens = max_output_tokens
+        self.max_images = max_images
+        self.max_retries = max_retries
+        self.smoothing = smoothing
+
+        # 프로필 이름 → 작업당 출력 토큰 추정값
+        self._tokens_per_job: Dict[str, float] = {}
+        # 프로필 이름 → 응답이 잘린 뒤의 K 상한 (잘리지 않은 묶음마다 1씩 회복)
+        self._pack_cap: Dict[str, int] = {}
+        self.stats: Dict[str, int] = {'requests': 0, 'jobs': 0, 'retried': 0, 'failed': 0, 'truncated': 0}
+
+    def pack_size(self, profile: Dict[str, Any]) -> int:
+        """출력 토큰 상한 안에 들어갈 작업 수 K"""
+        per_job = self._tokens_per_job.get(profile['name'])
+        if per_job is None:
+            # 관측값이 없으면 프로필의 응답 예산 기준 (보수적)
+            per_job = profile['max_output_tokens']
+        size = int(self.max_output_tokens // (per_job * TOKEN_MARGIN))
+        return max(1, min(self.max_pack, self._pack_cap.get(profile['name'], self.max_pack), size))
+
+    def _observe(self, profile: Dict[str, Any], output_tokens: int, size: int, completed: int, truncated: bool):
+        """응답의 작업당 출력 토큰 반영 (잘렸으면 추정값을 키우고 K 상한을 완성된 항목 수로 낮춤)"""
+        name = profile['name']
+        cap = self._pack_cap.get(name, self.max_pack)
+        self._pack_cap[name] = max(1, min(completed, size - 1)) if truncated else min(cap + 1, self.max_pack)
+
+        estimate = self._tokens_per_job.get(name)
+        if completed and output_tokens:
+            observed = output_tokens / completed
+            estimate = observed if estimate is None else estimate + self.smoothing * (observed - estimate)
+        if truncated:
+            estimate = (estimate or profile['max_output_tokens']) * TRUNCATION_PENALTY
+        if estimate is not None:
+            self._tokens_per_job[name] = estimate
+
+    def _take_pack(self, pending: Deque[Dict[str, Any]], profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+        size = self.pack_size(profile)
+        pack = [pending.popleft()]
+        images = len(pack[0]['prepared_images'])
+        while pending and len(pack) < size and images + len(pending[0]['prepared_images']) <= self.max_images:
+            job = pending.popleft()
+            images += len(job['prepared_images'])
+            pack.append(job)
+        return pack
+
+    def _run_pack(
+        self,
+        pack: List[Dict[str, Any]],
+        profile: Dict[str, Any],
+        thinking: Optional[str]
+    ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """
+        묶음 요청 1개 실행
+
+        Returns:
+            (job_id → 결과, job_id → 검증 실패 사유)
+        """
+        generator = self.generator
+        template = generator.prompt_template
+        packed_profile = dict(profile, model_writes_meta=False)
+
+        contents = [Part.from_text(
+            text=generator._create_system_prompt(packed_profile) + build_packed_instructions(template, len(pack))
+        )]
+        for job in pack:
+            contents.append(Part.from_text(text=f"### job {job['id']}\n" + build_user_message(template, job['user_text'])))
+            contents.extend(Part.from_bytes(data=data, mime_type=mime) for data, mime in job['prepared_images'])
+
+        budget = min(self.max_output_tokens, profile['max_output_tokens'] * len(pack) + 256)
+        response_text, usage = generator._call_model(
+            contents, budget, build_packed_response_schema(profile), thinking
+        )
+        self.stats['requests'] += 1
+
+        response, parse_path = parse_prompt_response(response_text)
+        entries = response.get('results') if isinstance(response.get('results'), list) else []
+
+        by_id = {job['id']: job for job in pack}
+        results: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+
+        for index, entry in enumerate(entries):
+            if not isinstance(entry, dict):
+                continue
+            job_id = str(entry.get('job_id', ''))
+            job = by_id.get(job_id)
+            if job is None or job_id in results:
+                continue
+
+            result = normalize_result(
+                {'prompts': entry.get('prompts')}, profile, len(job['image_paths']), job['user_text']
+            )
+            if result['meta']['missing_fields']:
+                errors[job_id] = f"필드 누락: {', '.join(result['meta']['missing_fields'])}"
+                continue
+
+            # 요청 전체 사용량을 작업 수로 나눠 기록 (원래 값은 request_usage)
+            share = {
+                key: round(usage.get(key, 0) / len(pack))
+                for key in ('prompt_tokens', 'output_tokens', 'thinking_tokens', 'total_tokens')
+            }
+            result['meta']['engine'] = usage['model']
+            result['meta']['usage'] = dict(usage, **share, request_usage=usage)
+            result['meta']['parse_path'] = parse_path
+            result['meta']['prompt_template'] = template['name']
+            result['meta']['packed'] = {'size': len(pack), 'index': index, 'attempt': job['attempt']}
+            results[job_id] = result
+
+        for job_id in by_id:
+            if job_id not in results and job_id not in errors:
+                errors[job_id] = "응답에 결과 없음" + (" (응답 잘림)" if parse_path == PATH_REPAIRED else '')
+
+        truncated = parse_path == PATH_REPAIRED or (
+            bool(errors) and usage.get('output_tokens', 0) >= budget * 0.95
+        )
+        if truncated:
+            self.stats['truncated'] += 1
+        self._observe(profile, usage.get('output_tokens', 0), len(pack), len(results), truncated)
+        return results, errors
+
+    def generate_many(
+        self,
+        jobs: Iterable[Dict[str, Any]],
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        max_words: Optional[int] = None,
+        thinking: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        작업 여러 개를 묶어서 생성
+
+        Args:
+            jobs: [{'id', 'image_paths', 'user_text'}, ...] (id는 고유해야 함,
+                'prepared_images'가 있으면 이미지를 다시 읽지 않음)
+            output_profile: 출력 프로필 이름 (짧은 프로필일수록 한 요청에 많이 담김)
+            max_words: 프롬프트 최대 단어 수
+            thinking: thinking 설정
+
+        Yields:
+            완료 순서대로 {'id', 'result'} 또는 {'id', 'error'} (result는 generate_prompt와 같은 구조)
+        """
+        profile = get_output_profile(output_profile, max_words)
+        pending: Deque[Dict[str, Any]] = deque()
+        source = iter(jobs)
+        exhausted = False
+
+        while True:
+            # 이미지 변환은 묶음 2개 분량만 미리 (전체를 메모리에 올리지 않도록)
+            while not exhausted and len(pending) < self.max_pack * 2:
+                job = next(source, None)
+                if job is None:
+                    exhausted = True
+                    break
+                self.stats['jobs'] += 1
+                try:
+                    prepared = job.get('prepared_images')
+                    if prepared is None:
+                        prepared = [self.generator._prepare_image(path) for path in job['image_paths']]
+                    pending.append(dict(job, id=str(job['id']), prepared_images=prepared, attempt=1))
+                except Exception as e:
+                    # 이미지 문제는 다른 작업과 묶기 전에 개별 실패 처리
+                    self.stats['failed'] += 1
+                    yield {'id': str(job['id']), 'error': str(e)}
+            if not pending:
+                return
+
+            # 연속 실패로 서킷이 열려 있으면 묶음 전체를 보내지 않고 바로 중단
+            self.generator.breaker.reject_if_open()
+            pack = self._take_pack(pending, profile)
+            try:
+                results, errors = self._run_pack(pack, profile, thinking)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                results, errors = {}, {job['id']: f"프롬프트 생성 실패: {e}" for job in pack}
+
+            for job in pack:
+                if job['id'] in results:
+                    yield {'id': job['id'], 'result': results[job['id']]}
+                elif job['attempt'] <= self.max_retries:
+                    # 실패한 항목만 다음 묶음에 다시 넣음
+                    self.stats['retried'] += 1
+                    pending.append(dict(job, attempt=job['attempt'] + 1))
+                else:
+                    self.stats['failed'] += 1
+                    yield {'id': job['id'], 'error': errors[job['id']]}
+
+
+def main():
+    from dotenv import load_dotenv
+    from batch_jobs import read_rows
+    from gemini_api import GeminiPromptGenerator
+
+    parser = argparse.ArgumentParser(description="묶음 요청 대량 프롬프트 생성")
+    parser.add_argument('rows', help="입력 파일 (CSV 또는 JSONL)")
+    parser.add_argument('output', help="결과 JSONL 경로")
+    parser.add_argument('--profile', default='compact', help="출력 프로필 (기본 compact)")
+    parser.add_argument('--template', default=None, help="프롬프트 템플릿 (prompt_templates.py 참고)")
+    parser.add_argument('--max-pack', type=int, default=DEFAULT_MAX_PACK, help="요청 1개에 담을 최대 작업 수")
+    parser.add_argument('--max-output-tokens', type=int, default=DEFAULT_PACKED_OUTPUT_TOKENS,
+                        help="묶음 요청 1개의 응답 토큰 상한")
+    parser.add_argument('--max-images', type=int, default=DEFAULT_MAX_IMAGES, help="요청 1개에 담을 최대 이미지 수")
+    args = parser.parse_args()
+
+    load_dotenv()
+    packer = PackedPromptGenerator(
+        GeminiPromptGenerator(prompt_template=args.template),
+        args.max_pack, args.max_output_tokens, args.max_images
+    )
+
+    counts = {'ok': 0, 'error': 0}
+    with open(args.output, 'a', encoding='utf-8') as out:
+        for record in packer.generate_many(read_rows(args.rows), args.profile):
+            counts['ok' if 'result' in record else 'error'] += 1
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+
+    stats = packer.stats
+    print(f"✅ 완료: 성공 {counts['ok']}건, 실패 {counts['error']}건 → {args.output}")
+    print(f"   요청 {stats['requests']}회 (평균 {stats['jobs'] / max(stats['requests'], 1):.1f}건/요청), "
+          f"재시도 {stats['retried']}건, 응답 잘림 {stats['truncated']}회")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
@@ -0,0 +1,264 @@
+"""
+대량 작업용 이미지 전처리 엔진
+이미지 디코드/검증/재인코딩(CPU 작업)을 프로세스 풀에서 병렬로 처리하고,
+결과 바이트는 pickle 대신 공유 메모리로 전달하여 API 호출 스레드보다 앞서 준비
+
+사용 예:
+    python preprocess.py rows.csv results.jsonl --profile compact --api-workers 8
+
+rows.csv 형식은 batch_jobs.py와 같음 (id,images,user_text)
+"""
+
+import os
+import sys
+import json
+import queue
+import argparse
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from image_io import prepare_image_bytes
+
+
+# 공유 메모리 슬롯 1개 크기 (재인코딩된 PNG는 원본 10MB보다 커질 수 있어 여유 있게)
+DEFAULT_SLOT_SIZE = 24 * 1024 * 1024
+
+
+def _prepare_into_slot(image_path: str, slot_name: str, slot_size: int) -> Tuple[int, str, Optional[bytes]]:
+    """
+    worker 프로세스: 이미지를 변환하여 부모가 만든 공유 메모리 슬롯에 기록
+
+    Args:
+        image_path: 이미지 경로
+        slot_name: 공유 메모리 이름
+        slot_size: 슬롯 크기
+
+    Returns:
+        (기록한 바이트 수, MIME 타입, 슬롯보다 큰 경우에만 바이트 자체)
+    """
+    data, mime_type = prepare_image_bytes(image_path)
+    if len(data) > slot_size:
+        return len(data), mime_type, data
+
+    # 부모가 슬롯을 소유하므로 여기서는 연결만 하고 unlink하지 않음
+    slot = shared_memory.SharedMemory(name=slot_name)
+    try:
+        slot.buf[:len(data)] = data
+    finally:
+        slot.close()
+    return len(data), mime_type, None
+
+
+class ImagePreprocessor:
+    """
+    프로세스 풀 이미지 전처리기
+
+    부모 프로세스가 고정 크기 공유 메모리 슬롯을 만들어 두고, worker는 슬롯에 결과를 쓴 뒤
+    길이만 반환. 사용 가능한 슬롯 수만큼만 동시에 처리되므로 메모리 사용량이 제한됨.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        slots: Optional[int] = None,
+        slot_size: int = DEFAULT_SLOT_SIZE
+    ):
+        """
+        Args:
+            workers: worker 프로세스 수 (없으면 사용 가능한 CPU 코어 수)
+            slots: 공유 메모리 슬롯 수 = 동시에 준비 중인 이미지 최대 수 (기본 workers × 2)
+            slot_size: 슬롯 크기 (바이트)
+        """
+        self.workers = workers or _available_cpus()
+        self.slot_size = slot_size
+        self._slots = [
+            shared_memory.SharedMemory(create=True, size=slot_size)
+            for _ in range(slots or self.workers * 2)
+        ]
+        self._free_slots: "queue.Queue[int]" = queue.Queue()
+        for index in range(len(self._slots)):
+            self._free_slots.put(index)
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+    def submit(self, image_path: str) -> "Future[Tuple[bytes, str]]":
+        """
+        이미지 1개 전처리 요청 (빈 슬롯이 생길 때까지 대기)
+
+        Returns:
+            (이미지 바이트, MIME 타입)을 돌려주는 Future
+        """
+        index = self._free_slots.get()
+        slot = self._slots[index]
+        result: "Future[Tuple[bytes, str]]" = Future()
+
+        def on_done(worker_future):
+            try:
+                size, mime_type, data = worker_future.result()
+                if data is None:
+                    data = bytes(slot.buf[:size])
+                result.set_result((data, mime_type))
+            except Exception as e:
+                result.set_exception(e)
+            finally:
+                self._free_slots.put(index)
+
+        try:
+            worker_future = self._pool.submit(_prepare_into_slot, image_path, slot.name, self.slot_size)
+        except Exception:
+            self._free_slots.put(index)
+            raise
+        worker_future.add_done_callback(on_done)
+        return result
+
+    def prepare(self, image_paths: List[str]) -> List[Tuple[bytes, str]]:
+        """이미지 여러 개를 병렬로 전처리하여 순서대로 반환"""
+        futures = [self.submit(path) for path in image_paths]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        for slot in self._slots:
+            slot.close()
+            slot.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _available_cpus() -> int:
+    """현재 프로세스가 사용할 수 있는 CPU 코어 수"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def run_pipeline(
+    jobs: Iterable[Dict[str, Any]],
+    generate: Callable[[Dict[str, Any], List[Tuple[bytes, str]]], Dict[str, Any]],
+    preprocessor: ImagePreprocessor,
+    api_workers: int = 4,
+    prefetch: int = 16
+) -> Iterator[Dict[str, Any]]:
+    """
+    전처리 → API 호출 파이프라인
+
+    전처리가 끝난 작업을 최대 prefetch개까지 미리 쌓아 두고 API worker 스레드가 꺼내 처리.
+    API 호출이 밀리면 큐가 차서 전처리도 자동으로 멈춤.
+
+    Args:
+        jobs: [{'id', 'image_paths', 'user_text'}, ...]
+        generate: (작업, 준비된 이미지) → 결과 함수 (API 호출)
+        preprocessor: ImagePreprocessor
+        api_workers: API 호출 스레드 수
+        prefetch: 전처리 완료 후 대기할 수 있는 최대 작업 수
+
+    Yields:
+        완료 순서대로 {'id', 'result'} 또는 {'id', 'error'}
+    """
+    ready: "queue.Queue[Optional[Tuple[Dict[str, Any], Any]]]" = queue.Queue(maxsize=prefetch)
+    done: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+
+    def feeder():
+        # 전처리 요청은 작업 순서대로, 결과는 준비되는 대로 큐에 넣음
+        for job in jobs:
+            try:
+                futures = [preprocessor.submit(path) for path in job['image_paths']]
+                ready.put((job, futures))
+            except Exception as e:
+                ready.put((job, e))
+        for _ in range(api_workers):
+            ready.put(None)
+
+    def api_worker():
+        while True:
+            item = ready.get()
+            if item is None:
+                done.put(None)
+                return
+            job, futures = item
+            try:
+                if isinstance(futures, Exception):
+                    raise futures
+                prepared = [future.result() for future in futures]
+                done.put({'id': job['id'], 'result': generate(job, prepared)})
+            except Exception as e:
+                done.put({'id': job['id'], 'error': str(e)})
+
+    threads = [threading.Thread(target=feeder, daemon=True)]
+    threads += [threading.Thread(target=api_worker, daemon=True) for _ in range(api_workers)]
+    for thread in threads:
+        thread.start()
+
+    finished_workers = 0
+    while finished_workers < api_workers:
+        item = done.get()
+        if item is None:
+            finished_workers += 1
+        else:
+            yield item
+
+
+def main():
+    from dotenv import load_dotenv
+    from batch_jobs import read_rows
+    from gemini_api import GeminiPromptGenerator
+    from output_profiles import DEFAULT_OUTPUT_PROFILE
+    from response_parser import format_parse_stats, get_parse_stats, parse_stats_since
+
+    parser = argparse.ArgumentParser(description="전처리 병렬화 대량 프롬프트 생성")
+    parser.add_argument('rows', help="입력 파일 (CSV 또는 JSONL)")
+    parser.add_argument('output', help="결과 JSONL 경로")
+    parser.add_argument('--profile', default=DEFAULT_OUTPUT_PROFILE, help="출력 프로필")
+    parser.add_argument('--workers', type=int, default=None, help="전처리 프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument('--api-workers', type=int, default=4, help="API 호출 스레드 수 (--adaptive면 상한)")
+    parser.add_argument('--adaptive', action='store_true', help="응답 상태에 따라 동시 API 호출 수 자동 조절 (AIMD)")
+    parser.add_argument('--prefetch', type=int, default=16, help="미리 준비해 둘 최대 작업 수")
+    args = parser.parse_args()
+
+    load_dotenv()
+    generator = GeminiPromptGenerator()
+    limiter = None
+    if args.adaptive:
+        from concurrency import AdaptiveLimiter, LimitedGenerator
+
+        # 스레드는 상한만큼 두고 실제 동시 호출 수는 limiter가 결정
+        limiter = AdaptiveLimiter(
+            max_limit=args.api_workers,
+            on_change=lambda before, after, reason: print(f"⚙️ 동시 호출 한도 {before} → {after} ({reason})")
+        )
+        generator = LimitedGenerator(generator, limiter)
+
+    def generate(job, prepared):
+        # API가 연속 실패 중이면 모든 worker가 복구(half-open 시험 호출 성공)까지 대기
+        return generator.breaker.call_when_ready(lambda: generator.generate_prompt(
+            job['image_paths'], job['user_text'],
+            output_profile=args.profile, prepared_images=prepared
+        ))
+
+    counts = {'ok': 0, 'error': 0}
+    parse_stats_before = get_parse_stats()
+    with ImagePreprocessor(args.workers, slots=args.prefetch) as preprocessor, \
+            open(args.output, 'a', encoding='utf-8') as out:
+        for record in run_pipeline(read_rows(args.rows), generate, preprocessor, args.api_workers, args.prefetch):
+            counts['ok' if 'result' in record else 'error'] += 1
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+
+    print(f"✅ 완료: 성공 {counts['ok']}건, 실패 {counts['error']}건 → {args.output}")
+    parse_paths = format_parse_stats(parse_stats_since(parse_stats_before))
+    if parse_paths:
+        print(f"🧩 파싱 경로: {parse_paths}")
+    if limiter:
+        print(f"⚙️ 동시 호출 자동 조절: {json.dumps(limiter.snapshot(), ensure_ascii=False)}")
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        sys.exit(1)
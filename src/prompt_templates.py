@@ -0,0 +1,344 @@
+"""
+버전별 프롬프트 템플릿
+시스템 프롬프트 / 사용자 메시지를 템플릿 이름(언어-종류-버전)으로 관리하여
+입력 토큰을 줄인 변형을 기존 템플릿과 나란히 두고 비교할 수 있도록 함
+
+- ko-v1: 기존 한국어 지시문 그대로 (기본값)
+- en-compact-v1: 같은 지시를 영어로 압축, JSON 예시 대신 필드 목록만 (구조는 response_schema가 강제)
+- en-minimal-v1: 분석 항목/작성 규칙 없이 필드 길이 제약만 (response_schema 필수)
+
+템플릿 내용을 바꿀 때는 기존 이름을 고치지 말고 버전을 올린 새 이름으로 추가
+(scripts/prompt_regression.py로 이전 버전과 토큰/완성도 비교)
+(GUI 시작 시 import되어도 되도록 무거운 모듈을 import하지 말 것)
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+from output_profiles import (
+    ENGINE_NAME,
+    RESULT_VERSION,
+    build_extra_rules,
+    build_output_format,
+    get_output_profile,
+)
+
+
+DEFAULT_PROMPT_TEMPLATE = 'ko-v1'
+
+
+# === ko-v1 ===
+
+def _ko_v1_system(profile: Dict[str, Any]) -> str:
+    extra_rules = ''.join(f"- {rule}\n" for rule in build_extra_rules(profile))
+
+    return """당신은 전문적인 AI 이미지 생성 프롬프트 엔지니어입니다.
+
+사용자가 제공한 참고 이미지와 텍스트 명령어를 분석하여,
+Midjourney, DALL-E, Stable Diffusion 등의 AI 이미지 생성 도구에서
+최고 품질의 결과를 얻을 수 있는 전문적인 프롬프트를 생성하세요.
+
+# 분석 항목:
+1. 이미지 분석:
+   - 색감 (color palette)
+   - 조명 (lighting)
+   - 구도 (composition)
+   - 스타일 (art style)
+   - 주요 객체 (main subjects)
+   - 분위기 (mood/atmosphere)
+
+2. 텍스트 명령어 파싱:
+   - 원하는 장면/상황
+   - 스타일 키워드
+   - 특정 요구사항
+
+# 출력 형식:
+""" + build_output_format(profile) + """
+
+# 프롬프트 작성 규칙:
+- 모든 프롬프트는 영어로 작성
+- 전문적인 사진/렌더링 용어 사용 (volumetric lighting, subsurface scattering 등)
+- 구체적이고 상세한 묘사
+- 예술 스타일 명확히 지정 (Studio Ghibli, Pixar, Unreal Engine 5 등)
+- 기술적 품질 키워드 포함 (8K, masterpiece, high-fidelity 등)
+""" + extra_rules + """- JSON 외에 다른 텍스트는 절대 출력하지 마세요
+"""
+
+
+def _ko_v1_user(user_text: str) -> str:
+    return f"""
+참고 이미지를 분석하고, 다음 텍스트 명령어에 맞는 프롬프트를 생성하세요:
+
+사용자 요청: {user_text}
+
+위의 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요.
+"""
+
+
+def _ko_v1_described_user(user_text: str) -> str:
+    return f"""
+참고 이미지는 첨부되지 않았습니다. 아래에 측정된 참고 이미지 특징을 바탕으로,
+다음 텍스트 명령어에 맞는 프롬프트를 생성하세요:
+
+사용자 요청: {user_text}
+
+위의 JSON 형식으로만 응답하세요. 다른 텍스트는 포함하지 마세요.
+"""
+
+
+def _ko_v1_packed(count: int) -> str:
+    return f"""
+# 여러 작업 동시 처리:
+이 요청에는 서로 독립된 작업 {count}개가 있습니다.
+각 작업은 '### job <job_id>' 제목 아래의 사용자 요청과 그 바로 뒤의 이미지로 구성됩니다.
+작업마다 위 형식의 prompts를 따로 작성하여 results 배열에 job_id와 함께 담고,
+모든 작업을 빠짐없이 응답하세요. 다른 작업의 이미지나 요청을 섞지 마세요.
+"""
+
+
+def _ko_v1_compose(profile: Dict[str, Any]) -> str:
+    extra_rules = ''.join(f"- {rule}\n" for rule in build_extra_rules(profile))
+
+    return """당신은 전문적인 AI 이미지 생성 프롬프트 엔지니어입니다.
+
+참고 이미지의 시각 분석 결과(JSON)와 사용자의 텍스트 명령어를 바탕으로,
+Midjourney, DALL-E, Stable Diffusion 등의 AI 이미지 생성 도구에서
+최고 품질의 결과를 얻을 수 있는 전문적인 프롬프트를 생성하세요.
+
+# 작성 방법:
+1. 분석 결과의 색감, 조명, 구도, 스타일, 주요 객체, 분위기를 반영
+2. 텍스트 명령어의 장면/상황, 스타일 키워드, 특정 요구사항을 우선 적용
+
+# 출력 형식:
+""" + build_output_format(profile) + """
+
+# 프롬프트 작성 규칙:
+- 모든 프롬프트는 영어로 작성
+- 전문적인 사진/렌더링 용어 사용 (volumetric lighting, subsurface scattering 등)
+- 구체적이고 상세한 묘사
+- 예술 스타일 명확히 지정 (Studio Ghibli, Pixar, Unreal Engine 5 등)
+- 기술적 품질 키워드 포함 (8K, masterpiece, high-fidelity 등)
+""" + extra_rules + """- JSON 외에 다른 텍스트는 절대 출력하지 마세요
+"""
+
+
+def _ko_v1_compose_user(references: str, user_text: str) -> str:
+    return f"참고 이미지 분석 결과:\n{references}\n\n사용자 요청: {user_text}\n\n위의 JSON 형식으로만 응답하세요."
+
+
+# === 영어 변형 공통 ===
+
+_EN_FIELD_DESCRIPTIONS = {
+    'style_prompt': "detailed style-focused prompt, 200+ words",
+    'scene_prompt': "scene-focused prompt",
+    'final_prompt': "final combined prompt, ready to use",
+}
+
+
+def _en_field_lines(profile: Dict[str, Any]) -> List[str]:
+    """'- 필드: 설명' 목록 (단어 수 제한이 있는 프로필은 style_prompt 외 필드에 상한 표시)"""
+    max_words = profile.get('max_words')
+    lines = []
+    for field in profile['fields']:
+        description = _EN_FIELD_DESCRIPTIONS[field]
+        if max_words and field != 'style_prompt':
+            description += f", max {max_words} words"
+        lines.append(f"- prompts.{field}: {description}")
+    return lines
+
+
+def _en_meta_line(profile: Dict[str, Any]) -> str:
+    if not profile.get('model_writes_meta'):
+        return ''
+    return (
+        f"- meta: version \"{RESULT_VERSION}\", engine \"{ENGINE_NAME}\", generated_at (ISO 8601); "
+        "inputs: reference_images_count, user_scene_text\n"
+    )
+
+
+def _en_packed(count: int) -> str:
+    return (
+        f"\nThis request has {count} independent jobs. Each job is a '### job <job_id>' header with its request, "
+        "followed by its images. Return one results entry (job_id + prompts) per job, for every job; "
+        "never mix images or requests between jobs.\n"
+    )
+
+
+def _en_compose_user(references: str, user_text: str) -> str:
+    return f"Reference analysis:\n{references}\nRequest: {user_text}\n"
+
+
+# === en-compact-v1 ===
+
+def _en_compact_v1_system(profile: Dict[str, Any]) -> str:
+    return (
+        "You are an expert prompt engineer for AI image generators (Midjourney, DALL-E, Stable Diffusion).\n"
+        "Analyze the reference images (palette, lighting, composition, art style, subjects, mood) "
+        "and the user's request (scene, style keywords, requirements).\n"
+        "Return JSON only, with:\n"
+        + '\n'.join(_en_field_lines(profile)) + '\n'
+        + _en_meta_line(profile)
+        + "Rules: write in English; use professional photo/rendering terms; be specific; "
+        "name the art style; add quality keywords (8K, masterpiece).\n"
+    )
+
+
+def _en_compact_v1_user(user_text: str) -> str:
+    return f"Request: {user_text}\n"
+
+
+def _en_described_user(user_text: str) -> str:
+    return f"No images attached; use the measured reference image features below instead.\nRequest: {user_text}\n"
+
+
+def _en_compact_v1_compose(profile: Dict[str, Any]) -> str:
+    return (
+        "You are an expert prompt engineer for AI image generators (Midjourney, DALL-E, Stable Diffusion).\n"
+        "Use the reference image analysis (JSON: palette, lighting, composition, art style, subjects, mood) "
+        "and apply the user's request (scene, style keywords, requirements) first.\n"
+        "Return JSON only, with:\n"
+        + '\n'.join(_en_field_lines(profile)) + '\n'
+        + _en_meta_line(profile)
+        + "Rules: write in English; use professional photo/rendering terms; be specific; "
+        "name the art style; add quality keywords (8K, masterpiece).\n"
+    )
+
+
+# === en-minimal-v1 ===
+
+def _en_minimal_v1_system(profile: Dict[str, Any]) -> str:
+    return (
+        "Write English image-generation prompts from the reference images and request. "
+        "Follow the response schema.\n"
+        + '\n'.join(_en_field_lines(profile)) + '\n'
+        + _en_meta_line(profile)
+    )
+
+
+def _en_minimal_v1_compose(profile: Dict[str, Any]) -> str:
+    return (
+        "Write English image-generation prompts from the reference image analysis and request. "
+        "Follow the response schema.\n"
+        + '\n'.join(_en_field_lines(profile)) + '\n'
+        + _en_meta_line(profile)
+    )
+
+
+PROMPT_TEMPLATES: Dict[str, Dict[str, Any]] = {
+    'ko-v1': {
+        'label': '한국어 (기존)',
+        'language': 'ko',
+        # JSON 예시를 지시문에 포함하므로 스키마를 지원하지 않는 제공자에도 사용 가능
+        'requires_schema': False,
+        'system': _ko_v1_system,
+        'user': _ko_v1_user,
+        'described_user': _ko_v1_described_user,
+        'packed': _ko_v1_packed,
+        'compose': _ko_v1_compose,
+        'compose_user': _ko_v1_compose_user,
+    },
+    'en-compact-v1': {
+        'label': '영어 압축',
+        'language': 'en',
+        'requires_schema': False,
+        'system': _en_compact_v1_system,
+        'user': _en_compact_v1_user,
+        'described_user': _en_described_user,
+        'packed': _en_packed,
+        'compose': _en_compact_v1_compose,
+        'compose_user': _en_compose_user,
+    },
+    'en-minimal-v1': {
+        'label': '영어 최소',
+        'language': 'en',
+        # 필드 이름만 있고 JSON 구조 설명이 없으므로 response_schema를 강제하는 제공자 전용
+        'requires_schema': True,
+        'system': _en_minimal_v1_system,
+        'user': _en_compact_v1_user,
+        'described_user': _en_described_user,
+        'packed': _en_packed,
+        'compose': _en_minimal_v1_compose,
+        'compose_user': _en_compose_user,
+    },
+}
+
+
+def get_prompt_template(name: Optional[str] = None) -> Dict[str, Any]:
+    """
+    프롬프트 템플릿 조회
+
+    Args:
+        name: 템플릿 이름 (없으면 기본 템플릿)
+
+    Returns:
+        템플릿 딕셔너리 사본 (name 키 포함)
+    """
+    name = name or DEFAULT_PROMPT_TEMPLATE
+    if name not in PROMPT_TEMPLATES:
+        raise ValueError(
+            f"알 수 없는 프롬프트 템플릿입니다: {name} "
+            f"(사용 가능: {', '.join(PROMPT_TEMPLATES)})"
+        )
+    return dict(PROMPT_TEMPLATES[name], name=name)
+
+
+def build_system_prompt(template: Dict[str, Any], profile: Dict[str, Any]) -> str:
+    """템플릿 + 출력 프로필 → 시스템 프롬프트"""
+    system: Callable[[Dict[str, Any]], str] = template['system']
+    return system(profile)
+
+
+def build_user_message(template: Dict[str, Any], user_text: str) -> str:
+    """템플릿 + 사용자 입력 → 사용자 메시지"""
+    user: Callable[[str], str] = template['user']
+    return user(user_text)
+
+
+def build_described_user_message(template: Dict[str, Any], user_text: str) -> str:
+    """이미지 없이 로컬 특징 텍스트만 보낼 때의 사용자 메시지 (image_mode='none')"""
+    described_user: Callable[[str], str] = template['described_user']
+    return described_user(user_text)
+
+
+def build_packed_instructions(template: Dict[str, Any], count: int) -> str:
+    """여러 작업을 한 요청에 담을 때 시스템 프롬프트 뒤에 붙이는 지시문 (packed.py)"""
+    packed: Callable[[int], str] = template['packed']
+    return packed(count)
+
+
+def build_compose_prompt(template: Dict[str, Any], profile: Dict[str, Any]) -> str:
+    """2단계 파이프라인의 텍스트 전용 작성 단계 시스템 프롬프트 (analysis_pipeline.py)"""
+    compose: Callable[[Dict[str, Any]], str] = template['compose']
+    return compose(profile)
+
+
+def build_compose_message(template: Dict[str, Any], references: str, user_text: str) -> str:
+    """분석 결과(JSON 문자열) + 사용자 입력 → 작성 단계 사용자 메시지"""
+    compose_user: Callable[[str, str], str] = template['compose_user']
+    return compose_user(references, user_text)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    입력 토큰 수 추정 (실측값이 없을 때 비교용)
+
+    영어는 약 4자당 1토큰, 한글 등 비ASCII 문자는 1자당 1토큰으로 계산 (한글은 실제로 조금 적게 나옴)
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return round(ascii_chars / 4 + (len(text) - ascii_chars))
+
+
+def template_tokens(name: str, profile_name: str, user_text: str = '') -> int:
+    """
+    템플릿의 텍스트 입력 토큰 수 추정 (이미지 제외, estimate_tokens 기준)
+
+    실측값은 scripts/prompt_regression.py --measure로 확인 (모델/토크나이저마다 다르므로 저장하지 않음)
+
+    Args:
+        name: 템플릿 이름
+        profile_name: 출력 프로필 이름
+        user_text: 사용자 입력
+    """
+    template = get_prompt_template(name)
+    profile = get_output_profile(profile_name)
+    text = build_system_prompt(template, profile) + build_user_message(template, user_text)
+    return estimate_tokens(text)
@@ -4,19 +4,32 @@ AI 프롬프트 생성기 - Tkinter GUI 애플리케이션
 """
 
 import os
+import sys
 import json
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from datetime import datetime
 from pathlib import Path
-import pyperclip
+from typing import TYPE_CHECKING
 from dotenv import load_dotenv
-from PIL import Image, ImageTk
 import threading
-import webbrowser
 import time
 
-from gemini_api import GeminiPromptGenerator, test_api_connection
+from output_profiles import OUTPUT_PROFILES, DEFAULT_OUTPUT_PROFILE
+from thinking import THINKING_LABELS, DEFAULT_THINKING
+from bulk_tab import BulkTab
+from speculative import SpeculativeGenerator, make_input_key
+
+# 무거운 모듈(google.genai, PIL, pyperclip, webbrowser)은 창이 뜬 뒤 처음 사용할 때 로드
+# gemini_api는 google.genai + pydantic + HTTP 스택을 끌어오므로 시작 시간에 가장 큰 영향
+if TYPE_CHECKING:
+    from PIL import Image
+
+# 프로세스 시작 기준 시각 (시작 시간 측정용)
+_STARTUP_T0 = time.perf_counter()
+
+# 창이 뜨기 전에 로드되면 안 되는 모듈 (scripts/bench_startup.py에서도 사용)
+DEFERRED_MODULES = ('gemini_api', 'google.genai', 'PIL.ImageTk', 'pyperclip', 'webbrowser')
 
 
 class PromptMakerApp:
@@ -36,8 +49,19 @@ class PromptMakerApp:
         self.image_labels = []  # 이미지 미리보기 라벨
         self.api_key_var = tk.StringVar(value=os.getenv('GEMINI_API_KEY', ''))
         self.user_text_var = tk.StringVar()
+        self.output_profile_var = tk.StringVar(value=OUTPUT_PROFILES[DEFAULT_OUTPUT_PROFILE]['label'])
+        self.thinking_var = tk.StringVar(value=THINKING_LABELS[DEFAULT_THINKING])
+        self.reuse_analysis_var = tk.BooleanVar(value=False)
+        self.speculative_var = tk.BooleanVar(value=False)
         self.result_json = None
         self.generator = None
+        self.staged_generator = None
+        self._generator_lock = threading.Lock()
+
+        # 입력 중 미리 생성 (옵션, 기본 꺼짐)
+        self.speculative = SpeculativeGenerator(
+            on_start=lambda: self.root.after(0, lambda: self.status_var.set("💡 입력 내용으로 미리 생성 중..."))
+        )
 
         # UI 구성
         self._create_widgets()
@@ -46,12 +70,61 @@ class PromptMakerApp:
         self.output_dir = Path("output")
         self.output_dir.mkdir(exist_ok=True)
 
+        # 창이 그려진 뒤 백그라운드에서 API 클라이언트 예열
+        self.root.after(100, self._start_warmup)
+
+    def _start_warmup(self):
+        """무거운 모듈 로드 및 API 클라이언트 초기화를 백그라운드 스레드에서 시작"""
+        api_key = self.api_key_var.get().strip()
+        threading.Thread(target=self._warmup, args=(api_key,), daemon=True).start()
+
+    def _warmup(self, api_key: str):
+        """백그라운드 예열 (실패해도 무시 - 실제 사용 시 다시 시도됨)"""
+        try:
+            from PIL import Image, ImageTk  # noqa: F401
+            import gemini_api  # noqa: F401
+            from image_backends import get_backend
+
+            # 가속 백엔드 라이브러리 로드 (첫 미리보기 지연 방지)
+            get_backend()
+
+            if api_key:
+                self._get_generator(api_key)
+        except Exception:
+            pass
+
+    def _get_generator(self, api_key: str):
+        """API Key에 맞는 Generator 반환 (없거나 Key가 바뀌었으면 새로 생성)"""
+        from gemini_api import GeminiPromptGenerator
+
+        with self._generator_lock:
+            if not self.generator or self.generator.api_key != api_key:
+                self.generator = GeminiPromptGenerator(api_key)
+                self.staged_generator = None
+            return self.generator
+
+    def _get_staged_generator(self, api_key: str):
+        """이미지 분석 캐시를 사용하는 2단계 Generator 반환"""
+        from analysis_pipeline import StagedPromptGenerator, AnalysisCache
+
+        generator = self._get_generator(api_key)
+        with self._generator_lock:
+            if not self.staged_generator or self.staged_generator.generator is not generator:
+                self.staged_generator = StagedPromptGenerator(
+                    generator, AnalysisCache(str(self.output_dir / 'cache' / 'analysis'))
+                )
+            return self.staged_generator
+
     def _create_widgets(self):
         """UI 위젯 생성"""
 
+        # 탭 (단일 생성 / 대량 생성)
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
         # 메인 프레임
-        main_frame = ttk.Frame(self.root, padding="10")
-        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        main_frame = ttk.Frame(self.notebook, padding="10")
+        self.notebook.add(main_frame, text="단일 생성")
 
         # 그리드 가중치 설정
         self.root.columnconfigure(0, weight=1)
@@ -148,6 +221,48 @@ class PromptMakerApp:
         # 포커스 이벤트 바인딩
         self.text_input.bind("<FocusIn>", self._on_text_focus_in)
         self.text_input.bind("<FocusOut>", self._on_text_focus_out)
+        self.text_input.bind("<KeyRelease>", self._on_inputs_changed)
+
+        # === 생성 옵션 ===
+        options_frame = ttk.LabelFrame(main_frame, text="⚙️ 생성 옵션", padding="10")
+        options_frame.grid(row=row, column=0, sticky=(tk.W, tk.E), pady=(0, 10))
+        row += 1
+
+        ttk.Label(options_frame, text="출력 형식:").grid(row=0, column=0, sticky=tk.W, padx=(0, 5))
+        self.output_profile_combo = ttk.Combobox(
+            options_frame,
+            textvariable=self.output_profile_var,
+            values=[profile['label'] for profile in OUTPUT_PROFILES.values()],
+            state="readonly",
+            width=22
+        )
+        self.output_profile_combo.grid(row=0, column=1, sticky=tk.W)
+        self.output_profile_combo.bind("<<ComboboxSelected>>", self._on_inputs_changed)
+
+        ttk.Label(options_frame, text="추론(thinking):").grid(row=0, column=2, sticky=tk.W, padx=(20, 5))
+        self.thinking_combo = ttk.Combobox(
+            options_frame,
+            textvariable=self.thinking_var,
+            values=list(THINKING_LABELS.values()),
+            state="readonly",
+            width=22
+        )
+        self.thinking_combo.grid(row=0, column=3, sticky=tk.W)
+        self.thinking_combo.bind("<<ComboboxSelected>>", self._on_inputs_changed)
+
+        ttk.Checkbutton(
+            options_frame,
+            text="이미지 분석 재사용 (같은 이미지로 문구만 바꿀 때 빠름)",
+            variable=self.reuse_analysis_var,
+            command=self._on_inputs_changed
+        ).grid(row=1, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
+
+        ttk.Checkbutton(
+            options_frame,
+            text=f"입력 중 미리 생성 (입력이 멈추면 백그라운드에서 시작, 분당 최대 {self.speculative.max_per_minute}회)",
+            variable=self.speculative_var,
+            command=self._on_inputs_changed
+        ).grid(row=2, column=0, columnspan=4, sticky=tk.W, pady=(5, 0))
 
         # === API Key 입력 ===
         api_frame = ttk.LabelFrame(main_frame, text="🔑 Gemini API Key", padding="10")
@@ -222,6 +337,10 @@ class PromptMakerApp:
         status_bar = ttk.Label(main_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
         status_bar.grid(row=row, column=0, sticky=(tk.W, tk.E))
 
+        # === 대량 생성 탭 ===
+        self.bulk_tab = BulkTab(self.notebook, self)
+        self.notebook.add(self.bulk_tab.frame, text="대량 생성")
+
     def _select_image(self, index: int):
         """이미지 파일 선택"""
         file_path = filedialog.askopenfilename(
@@ -234,15 +353,17 @@ class PromptMakerApp:
 
         if file_path:
             try:
-                # 이미지 로드 및 검증
-                img = Image.open(file_path)
+                from image_io import MAX_IMAGE_BYTES, load_preview
 
                 # 파일 크기 체크
                 file_size = os.path.getsize(file_path)
-                if file_size > 10 * 1024 * 1024:  # 10MB
+                if file_size > MAX_IMAGE_BYTES:
                     messagebox.showerror("오류", "이미지 파일이 10MB를 초과합니다.")
                     return
 
+                # 이미지 검증 및 미리보기용 축소 디코드 (150x150)
+                img = load_preview(file_path, (150, 150))
+
                 # 리스트 크기 조정
                 while len(self.image_paths) <= index:
                     self.image_paths.append(None)
@@ -258,18 +379,17 @@ class PromptMakerApp:
                 self.image_labels[index].config(text=f"이미지 {index + 1}\n{filename}")
 
                 self.status_var.set(f"이미지 {index + 1} 선택됨: {filename}")
+                self._on_inputs_changed()
 
             except Exception as e:
                 messagebox.showerror("오류", f"이미지 로드 실패:\n{str(e)}")
 
-    def _show_image_preview(self, img: Image.Image, index: int):
-        """이미지 미리보기 표시"""
-        # 썸네일 생성 (150x150)
-        img_copy = img.copy()
-        img_copy.thumbnail((150, 150))
+    def _show_image_preview(self, img: "Image.Image", index: int):
+        """이미지 미리보기 표시 (img는 image_io.load_preview로 이미 축소된 이미지)"""
+        from PIL import ImageTk
 
         # Tkinter 이미지로 변환
-        photo = ImageTk.PhotoImage(img_copy)
+        photo = ImageTk.PhotoImage(img)
 
         # 미리보기 업데이트
         if index == 0:
@@ -296,8 +416,52 @@ class PromptMakerApp:
             self.text_input.config(foreground="gray")
             self.is_placeholder = True
 
+    def _current_user_text(self) -> str:
+        """입력된 텍스트 (플레이스홀더 제외)"""
+        user_text = self.text_input.get("1.0", tk.END).strip()
+        if self.is_placeholder or user_text == self.placeholder_text:
+            return ""
+        return user_text
+
+    def _on_inputs_changed(self, event=None):
+        """입력이 바뀔 때마다 미리 생성 예약 (입력이 불완전하면 취소)"""
+        if not self.speculative_var.get():
+            self.speculative.cancel()
+            return
+
+        api_key = self.api_key_var.get().strip()
+        valid_images = [img for img in self.image_paths if img is not None]
+        user_text = self._current_user_text()
+        if not api_key or not valid_images or not user_text:
+            self.speculative.cancel()
+            return
+
+        output_profile = self._selected_output_profile()
+        thinking = self._selected_thinking()
+        reuse_analysis = self.reuse_analysis_var.get()
+
+        def task():
+            if reuse_analysis:
+                generator = self._get_staged_generator(api_key)
+            else:
+                generator = self._get_generator(api_key)
+            return generator.generate_prompt(valid_images, user_text, output_profile=output_profile, thinking=thinking)
+
+        self.speculative.schedule(
+            self._input_key(api_key, valid_images, user_text, output_profile, thinking, reuse_analysis), task
+        )
+
+    @staticmethod
+    def _input_key(api_key, valid_images, user_text, output_profile, thinking, reuse_analysis) -> str:
+        return make_input_key(
+            api_key=api_key, images=valid_images, user_text=user_text,
+            output_profile=output_profile, thinking=thinking, reuse_analysis=reuse_analysis
+        )
+
     def _open_usage_page(self):
         """API 사용량 확인 페이지 열기"""
+        import webbrowser
+
         url = "https://aistudio.google.com/usage"
 
         # 크롬 브라우저로 열기 시도
@@ -341,14 +505,23 @@ class PromptMakerApp:
 
         def test_thread():
             try:
-                if test_api_connection(api_key):
+                from health import probe_api
+
+                # 생성 요청 대신 모델 조회로 확인 (쿼터 미사용, 최근 결과는 캐시에서)
+                status = probe_api(api_key)
+                checked = f"{status['latency_ms']}ms" + (f", {status['checked_at']} 확인 결과" if status['cached'] else "")
+
+                if status['ok']:
                     self.root.after(0, lambda: messagebox.showinfo(
                         "성공",
-                        "✅ API 연결 성공!\n\n모델: gemini-2.5-flash\n상태: 정상 작동\n\n📊 사용량 확인: Google AI Studio에서 확인 가능"
+                        f"✅ API 연결 성공!\n\n모델: gemini-2.5-flash\n상태: 정상 작동 ({checked})\n\n📊 사용량 확인: Google AI Studio에서 확인 가능"
                     ))
                     self.root.after(0, lambda: self.status_var.set("API 연결 성공"))
                 else:
-                    self.root.after(0, lambda: messagebox.showerror("실패", "❌ API 연결 실패\n\nAPI Key를 확인하거나\n사용량 제한을 확인하세요."))
+                    self.root.after(0, lambda: messagebox.showerror(
+                        "실패",
+                        f"❌ API 연결 실패\n\nAPI Key를 확인하거나\n사용량 제한을 확인하세요.\n\n{status['error'][:300]}"
+                    ))
                     self.root.after(0, lambda: self.status_var.set("API 연결 실패"))
             except Exception as e:
                 self.root.after(0, lambda: messagebox.showerror("오류", f"테스트 실패:\n{str(e)}"))
@@ -360,11 +533,7 @@ class PromptMakerApp:
         """프롬프트 생성"""
         # 입력 검증
         api_key = self.api_key_var.get().strip()
-        user_text = self.text_input.get("1.0", tk.END).strip()
-
-        # 플레이스홀더 텍스트 제외
-        if self.is_placeholder or user_text == self.placeholder_text:
-            user_text = ""
+        user_text = self._current_user_text()
 
         if not api_key:
             messagebox.showwarning("경고", "API Key를 입력하세요.")
@@ -381,6 +550,17 @@ class PromptMakerApp:
             messagebox.showwarning("경고", "텍스트 명령어를 입력하세요.")
             return
 
+        output_profile = self._selected_output_profile()
+        thinking = self._selected_thinking()
+        reuse_analysis = self.reuse_analysis_var.get()
+
+        # 입력이 같은 미리 생성이 있으면 넘겨받음 (진행 중이면 이어서 대기)
+        speculative_job = None
+        if self.speculative_var.get():
+            speculative_job = self.speculative.take(
+                self._input_key(api_key, valid_images, user_text, output_profile, thinking, reuse_analysis)
+            )
+
         # UI 업데이트: 버튼 비활성화, 프로그레스바 표시
         self.generate_btn.config(state=tk.DISABLED)
         self.progress_frame.grid()
@@ -402,26 +582,48 @@ class PromptMakerApp:
 
         def generate_thread():
             try:
-                # Generator 초기화
-                self.root.after(0, lambda: self.progress_label.config(text="⚙️ Gemini API 초기화 중... (1-2초)"))
-                if not self.generator:
-                    self.generator = GeminiPromptGenerator(api_key)
-
-                time.sleep(0.5)  # 초기화 시간
-
-                # 타이머 시작
-                self.root.after(0, update_timer)
-
-                # 프롬프트 생성
-                result = self.generator.generate_prompt(valid_images, user_text)
+                result = None
+                if speculative_job is not None:
+                    # 미리 생성 결과 사용 (실패했으면 아래에서 다시 생성)
+                    self.root.after(0, update_timer)
+                    try:
+                        result = speculative_job.result()
+                    except Exception:
+                        result = None
+
+                if result is None:
+                    # Generator 초기화
+                    self.root.after(0, lambda: self.progress_label.config(text="⚙️ Gemini API 초기화 중... (1-2초)"))
+                    if reuse_analysis:
+                        generator = self._get_staged_generator(api_key)
+                    else:
+                        generator = self._get_generator(api_key)
+
+                    # 타이머 시작
+                    if speculative_job is None:
+                        self.root.after(0, update_timer)
+
+                    # 프롬프트 생성
+                    result = generator.generate_prompt(
+                        valid_images, user_text,
+                        output_profile=output_profile,
+                        thinking=thinking
+                    )
+                    adopted = ""
+                else:
+                    adopted = ", 미리 생성 결과 사용"
 
                 # 타이머 중지
                 self.generating = False
                 elapsed = int(time.time() - start_time)
 
+                thinking_tokens = result.get('meta', {}).get('usage', {}).get('thinking_tokens', 0)
+
                 # 결과 표시
                 self.root.after(0, lambda: self._display_result(result))
-                self.root.after(0, lambda: self.status_var.set(f"✅ 프롬프트 생성 완료! (소요 시간: {elapsed}초)"))
+                self.root.after(0, lambda: self.status_var.set(
+                    f"✅ 프롬프트 생성 완료! (소요 시간: {elapsed}초, thinking 토큰: {thinking_tokens}{adopted})"
+                ))
                 self.root.after(0, lambda: self.progress_label.config(text=f"✅ 프롬프트 생성 완료! (총 {elapsed}초 소요)"))
 
             except Exception as e:
@@ -439,6 +641,22 @@ class PromptMakerApp:
 
         threading.Thread(target=generate_thread, daemon=True).start()
 
+    def _selected_output_profile(self) -> str:
+        """콤보박스에서 선택된 출력 프로필 이름"""
+        label = self.output_profile_var.get()
+        for name, profile in OUTPUT_PROFILES.items():
+            if profile['label'] == label:
+                return name
+        return DEFAULT_OUTPUT_PROFILE
+
+    def _selected_thinking(self) -> str:
+        """콤보박스에서 선택된 thinking 설정 이름"""
+        label = self.thinking_var.get()
+        for name, thinking_label in THINKING_LABELS.items():
+            if thinking_label == label:
+                return name
+        return DEFAULT_THINKING
+
     def _display_result(self, result: dict):
         """결과 표시"""
         self.result_json = result
@@ -459,6 +677,8 @@ class PromptMakerApp:
             return
 
         try:
+            import pyperclip
+
             # final_prompt만 복사
             final_prompt = self.result_json.get('prompts', {}).get('final_prompt', '')
 
@@ -515,9 +735,33 @@ def main():
     # 앱 실행
     app = PromptMakerApp(root)
 
+    # 시작 시간 측정 모드 (scripts/bench_startup.py)
+    if os.getenv('PROMPTMAKER_STARTUP_PROBE'):
+        root.after_idle(lambda: _report_first_window(root))
+
     # 메인 루프
     root.mainloop()
 
 
+def _report_first_window(root):
+    """첫 창이 그려진 시점을 출력하고 종료 (시작 시간 측정용)"""
+    root.update()
+    elapsed_ms = (time.perf_counter() - _STARTUP_T0) * 1000
+    loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+
+    report = json.dumps({
+        'first_window_ms': round(elapsed_ms, 1),
+        'deferred_modules_loaded': loaded,
+    })
+
+    # 값이 파일 경로면 파일에 기록 (--windowed 빌드는 stdout이 없음)
+    probe_target = os.getenv('PROMPTMAKER_STARTUP_PROBE')
+    if probe_target and probe_target != '1':
+        Path(probe_target).write_text(report, encoding='utf-8')
+    elif sys.stdout:
+        print(report, flush=True)
+    root.destroy()
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,491 @@
+"""
+모델 제공자(provider) 추상화
+프롬프트 템플릿/입력 검증/결과 파싱은 GeminiPromptGenerator가 공유하고,
+실제 모델 호출만 제공자별로 구현
+
+- GeminiProvider: google.genai (gemini-2.5-flash)
+- OpenAICompatibleProvider: OpenAI 호환 HTTP 엔드포인트 (/v1/chat/completions)
+  로컬 비전 모델 서버(vLLM, llama.cpp server, Ollama 등)용
+- ProviderRouter: 지연 시간 / 상태 / 비용 기준으로 제공자를 골라 호출하고 실패 시 다음 제공자로 전환
+
+환경 변수:
+    OPENAI_COMPAT_BASE_URL  OpenAI 호환 엔드포인트 (예: http://localhost:8000/v1)
+    OPENAI_COMPAT_MODEL     모델 이름
+    OPENAI_COMPAT_API_KEY   (선택) Bearer 토큰
+    PROMPTMAKER_ROUTING     라우팅 정책 (latency | cost | priority, 기본 latency)
+"""
+
+import os
+import json
+import time
+import base64
+import threading
+import urllib.error
+import urllib.request
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.genai.types import GenerateContentConfig, Part, ThinkingConfig
+
+from health import EndpointError, is_breaker_failure
+from thinking import DYNAMIC_THINKING_ALLOWANCE
+
+
+DEFAULT_GEMINI_MODEL = 'gemini-2.5-flash'
+
+ROUTING_POLICIES = ['latency', 'cost', 'priority']
+DEFAULT_ROUTING_POLICY = 'latency'
+
+
+def build_generation_config(
+    max_output_tokens: int,
+    response_schema: Optional[Dict[str, Any]],
+    thinking_budget: Optional[int] = None
+) -> GenerateContentConfig:
+    """
+    Gemini 생성 설정
+
+    Args:
+        max_output_tokens: 응답(thinking 제외) 토큰 예산
+        response_schema: 응답 JSON 스키마
+        thinking_budget: thinking 토큰 예산 (None: 모델 기본 동적 예산)
+    """
+    # thinking 토큰도 max_output_tokens에 포함되므로 응답 예산에 더해줌
+    if thinking_budget is None:
+        max_output_tokens += DYNAMIC_THINKING_ALLOWANCE
+        thinking_config = None
+    else:
+        max_output_tokens += thinking_budget
+        thinking_config = ThinkingConfig(thinking_budget=thinking_budget)
+
+    return GenerateContentConfig(
+        temperature=0.7,
+        top_p=0.95,
+        top_k=40,
+        max_output_tokens=max_output_tokens,
+        response_mime_type='application/json',
+        response_schema=response_schema,
+        thinking_config=thinking_config,
+    )
+
+
+def extract_usage(response) -> Dict[str, Any]:
+    """
+    응답의 토큰 사용량 추출
+
+    Args:
+        response: generate_content 응답
+
+    Returns:
+        prompt_tokens / output_tokens / thinking_tokens / total_tokens
+    """
+    metadata = getattr(response, 'usage_metadata', None)
+
+    def count(name: str) -> int:
+        return (getattr(metadata, name, None) or 0) if metadata else 0
+
+    return {
+        'prompt_tokens': count('prompt_token_count'),
+        'output_tokens': count('candidates_token_count'),
+        'thinking_tokens': count('thoughts_token_count'),
+        'total_tokens': count('total_token_count'),
+    }
+
+
+class Provider:
+    """모델 제공자 인터페이스"""
+
+    name = 'provider'
+    model = ''
+    # 1,000 토큰당 비용 (USD, 라우팅 비교용 상대값이면 충분)
+    cost_per_1k_tokens = 0.0
+    # response_schema를 응답 형식으로 강제하는지 (prompt_templates의 requires_schema 템플릿 사용 가능 여부)
+    supports_schema = True
+
+    def generate(
+        self,
+        contents: List[Part],
+        max_output_tokens: int,
+        response_schema: Optional[Dict[str, Any]],
+        thinking_budget: Optional[int] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        모델 호출
+
+        Args:
+            contents: 요청 콘텐츠 (텍스트/이미지 Part, 첫 텍스트는 시스템 프롬프트)
+            max_output_tokens: 응답 토큰 예산
+            response_schema: 응답 JSON 스키마 (Gemini 형식)
+            thinking_budget: thinking 토큰 예산 (지원하지 않는 제공자는 무시)
+
+        Returns:
+            (응답 텍스트, 토큰 사용량 딕셔너리)
+        """
+        raise NotImplementedError
+
+    def health_check(self) -> bool:
+        """가벼운 요청으로 사용 가능 여부 확인"""
+        raise NotImplementedError
+
+
+class GeminiProvider(Provider):
+    """Gemini API 제공자"""
+
+    name = 'gemini'
+    cost_per_1k_tokens = 0.0025
+
+    def __init__(self, client, model: str = DEFAULT_GEMINI_MODEL):
+        """
+        Args:
+            client: genai.Client
+            model: 모델 이름
+        """
+        self.client = client
+        self.model = model
+
+    def generate(self, contents, max_output_tokens, response_schema, thinking_budget=None):
+        response = self.client.models.generate_content(
+            model=self.model,
+            contents=contents,
+            config=build_generation_config(max_output_tokens, response_schema, thinking_budget)
+        )
+        usage = extract_usage(response)
+        usage.update(provider=self.name, model=self.model)
+        return response.text, usage
+
+    def health_check(self) -> bool:
+        try:
+            self.client.models.get(model=self.model)
+            return True
+        except Exception:
+            return False
+
+
+def schema_to_json_schema(schema: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Gemini 응답 스키마 → 표준 JSON Schema (타입 소문자, property_ordering 제거)
+
+    Args:
+        schema: Gemini 형식 스키마
+
+    Returns:
+        JSON Schema 딕셔너리
+    """
+    if schema is None:
+        return None
+
+    converted: Dict[str, Any] = {}
+    for key, value in schema.items():
+        if key == 'property_ordering':
+            continue
+        if key == 'type':
+            converted[key] = value.lower()
+        elif key == 'properties':
+            converted[key] = {name: schema_to_json_schema(prop) for name, prop in value.items()}
+        elif key == 'items':
+            converted[key] = schema_to_json_schema(value)
+        elif key == 'nullable':
+            converted['type'] = [converted.get('type', schema['type'].lower()), 'null']
+        else:
+            converted[key] = value
+    if converted.get('type') == 'object':
+        converted.setdefault('additionalProperties', False)
+    return converted
+
+
+class OpenAICompatibleProvider(Provider):
+    """OpenAI 호환 /v1/chat/completions 엔드포인트 제공자 (로컬 비전 모델용)"""
+
+    name = 'openai_compat'
+
+    def __init__(
+        self,
+        base_url: str,
+        model: str,
+        api_key: Optional[str] = None,
+        timeout: float = 120.0,
+        response_format: Optional[str] = 'json_schema',
+        cost_per_1k_tokens: float = 0.0,
+        name: Optional[str] = None
+    ):
+        """
+        Args:
+            base_url: API 기본 URL (예: http://localhost:8000/v1)
+            model: 모델 이름
+            api_key: Bearer 토큰 (로컬 서버는 보통 불필요)
+            timeout: 요청 타임아웃 (초)
+            response_format: 'json_schema' | 'json_object' | None (서버가 지원하는 방식)
+            cost_per_1k_tokens: 라우팅용 비용 (로컬 모델은 0)
+            name: 라우터/사용량 기록에 표시할 이름
+        """
+        self.base_url = base_url.rstrip('/')
+        self.model = model
+        self.api_key = api_key
+        self.timeout = timeout
+        self.response_format = response_format
+        # json_object / None은 JSON만 보장하고 필드 구조는 강제하지 않음
+        self.supports_schema = response_format == 'json_schema'
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        if name:
+            self.name = name
+
+    def _request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+
+        data = json.dumps(body).encode('utf-8') if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except urllib.error.HTTPError as e:
+            detail = e.read().decode('utf-8', errors='replace')[:300]
+            raise EndpointError(f"{self.name} HTTP {e.code}: {detail}", e.code)
+        except urllib.error.URLError as e:
+            raise EndpointError(f"{self.name} 연결 실패: {e.reason}")
+
+    def _build_messages(self, contents: List[Part]) -> List[Dict[str, Any]]:
+        """Part 리스트 → chat messages (첫 텍스트는 system, 나머지는 user 1개로 묶음)"""
+        system_text = None
+        user_content: List[Dict[str, Any]] = []
+
+        for part in contents:
+            if part.text is not None:
+                if system_text is None and not user_content:
+                    system_text = part.text
+                else:
+                    user_content.append({'type': 'text', 'text': part.text})
+            elif part.inline_data is not None:
+                encoded = base64.b64encode(part.inline_data.data).decode('ascii')
+                user_content.append({
+                    'type': 'image_url',
+                    'image_url': {'url': f"data:{part.inline_data.mime_type};base64,{encoded}"},
+                })
+
+        messages = []
+        if system_text is not None:
+            messages.append({'role': 'system', 'content': system_text})
+        messages.append({'role': 'user', 'content': user_content})
+        return messages
+
+    def generate(self, contents, max_output_tokens, response_schema, thinking_budget=None):
+        body: Dict[str, Any] = {
+            'model': self.model,
+            'messages': self._build_messages(contents),
+            'temperature': 0.7,
+            'top_p': 0.95,
+            'max_tokens': max_output_tokens,
+        }
+        if self.response_format == 'json_schema' and response_schema is not None:
+            body['response_format'] = {
+                'type': 'json_schema',
+                'json_schema': {'name': 'prompt_result', 'schema': schema_to_json_schema(response_schema)},
+            }
+        elif self.response_format:
+            body['response_format'] = {'type': 'json_object'}
+
+        data = self._request('POST', '/chat/completions', body)
+        try:
+            text = data['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            raise EndpointError(f"{self.name} 응답 형식 오류: {json.dumps(data)[:200]}")
+
+        usage = data.get('usage') or {}
+        return text, {
+            'prompt_tokens': usage.get('prompt_tokens', 0),
+            'output_tokens': usage.get('completion_tokens', 0),
+            'thinking_tokens': 0,
+            'total_tokens': usage.get('total_tokens', 0),
+            'provider': self.name,
+            'model': self.model,
+        }
+
+    def health_check(self) -> bool:
+        try:
+            self._request('GET', '/models', timeout=min(self.timeout, 5.0))
+            return True
+        except Exception:
+            return False
+
+
+class ProviderRouter(Provider):
+    """
+    제공자 라우터
+
+    - latency: 평균 지연 시간(지수 이동 평균)이 가장 짧은 제공자 (처음엔 아직 측정하지 않은 제공자부터)
+    - cost: 1,000 토큰당 비용이 가장 낮은 제공자 (같으면 지연 시간 순)
+    - priority: 등록 순서
+
+    연속 실패가 max_failures회가 되면 cooldown초 동안 제외 (모두 제외되면 전부 시도)
+    호출 실패 시 다음 순위 제공자로 바로 재시도
+    """
+
+    name = 'router'
+
+    def __init__(
+        self,
+        providers: List[Provider],
+        policy: str = DEFAULT_ROUTING_POLICY,
+        max_failures: int = 2,
+        cooldown: float = 30.0,
+        smoothing: float = 0.3
+    ):
+        """
+        Args:
+            providers: 제공자 리스트 (priority 정책에서는 앞쪽이 우선)
+            policy: 라우팅 정책 ('latency', 'cost', 'priority')
+            max_failures: 제외할 연속 실패 횟수
+            cooldown: 제외 시간 (초)
+            smoothing: 지연 시간 지수 이동 평균 계수
+        """
+        if not providers:
+            raise ValueError("최소 1개의 제공자가 필요합니다.")
+        if policy not in ROUTING_POLICIES:
+            raise ValueError(f"알 수 없는 라우팅 정책입니다: {policy} (사용 가능: {', '.join(ROUTING_POLICIES)})")
+
+        self.providers = providers
+        self.policy = policy
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {
+            provider.name: {
+                'calls': 0, 'failures': 0, 'consecutive_failures': 0,
+                'latency_ewma': None, 'excluded_until': 0.0, 'last_error': None,
+            }
+            for provider in providers
+        }
+        if len(self._stats) != len(providers):
+            raise ValueError("제공자 이름이 중복되었습니다. (name 인자로 구분하세요)")
+
+    @property
+    def model(self) -> str:
+        return self.providers[0].model
+
+    @property
+    def supports_schema(self) -> bool:
+        # 어느 제공자로 넘어갈지 모르므로 모두 지원해야 함
+        return all(provider.supports_schema for provider in self.providers)
+
+    def _is_healthy(self, provider: Provider, now: float) -> bool:
+        return self._stats[provider.name]['excluded_until'] <= now
+
+    def _ranked(self) -> List[Provider]:
+        """정책에 따른 시도 순서 (제외된 제공자는 맨 뒤)"""
+        now = time.monotonic()
+        with self._lock:
+            def latency_key(provider):
+                ewma = self._stats[provider.name]['latency_ewma']
+                return -1.0 if ewma is None else ewma
+
+            if self.policy == 'latency':
+                ranked = sorted(self.providers, key=latency_key)
+            elif self.policy == 'cost':
+                ranked = sorted(self.providers, key=lambda p: (p.cost_per_1k_tokens, latency_key(p)))
+            else:
+                ranked = list(self.providers)
+
+            healthy = [p for p in ranked if self._is_healthy(p, now)]
+            return healthy + [p for p in ranked if p not in healthy]
+
+    def _record(self, provider: Provider, latency: Optional[float], error: Optional[Exception] = None):
+        with self._lock:
+            stats = self._stats[provider.name]
+            stats['calls'] += 1
+            if error is None:
+                stats['consecutive_failures'] = 0
+                stats['excluded_until'] = 0.0
+                if stats['latency_ewma'] is None:
+                    stats['latency_ewma'] = latency
+                else:
+                    stats['latency_ewma'] += self.smoothing * (latency - stats['latency_ewma'])
+            else:
+                stats['failures'] += 1
+                stats['consecutive_failures'] += 1
+                stats['last_error'] = str(error)[:200]
+                if stats['consecutive_failures'] >= self.max_failures:
+                    stats['excluded_until'] = time.monotonic() + self.cooldown
+
+    def generate(self, contents, max_output_tokens, response_schema, thinking_budget=None):
+        errors = []
+        endpoint_failed = False
+        for provider in self._ranked():
+            started = time.perf_counter()
+            try:
+                text, usage = provider.generate(contents, max_output_tokens, response_schema, thinking_budget)
+            except Exception as e:
+                self._record(provider, None, e)
+                errors.append(f"{provider.name}: {e}")
+                endpoint_failed = endpoint_failed or is_breaker_failure(e)
+                continue
+
+            self._record(provider, time.perf_counter() - started)
+            if errors:
+                usage = dict(usage, fallback_errors=errors)
+            return text, usage
+
+        # 요청 내용 문제로만 실패했다면 서킷 브레이커 실패로 세지 않도록 일반 오류로 구분
+        error_type = EndpointError if endpoint_failed else RuntimeError
+        raise error_type("모든 제공자 호출 실패 - " + " / ".join(errors))
+
+    def health_check(self) -> bool:
+        """제공자별 상태 확인 결과를 반영하고, 하나라도 사용 가능하면 True"""
+        any_healthy = False
+        for provider in self.providers:
+            healthy = provider.health_check()
+            with self._lock:
+                stats = self._stats[provider.name]
+                if healthy:
+                    stats['consecutive_failures'] = 0
+                    stats['excluded_until'] = 0.0
+                else:
+                    stats['excluded_until'] = time.monotonic() + self.cooldown
+            any_healthy = any_healthy or healthy
+        return any_healthy
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """제공자별 호출 통계 (latency_ms, 실패 수, 현재 제외 여부)"""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    'calls': stats['calls'],
+                    'failures': stats['failures'],
+                    'latency_ms': None if stats['latency_ewma'] is None else round(stats['latency_ewma'] * 1000),
+                    'excluded': stats['excluded_until'] > now,
+                    'last_error': stats['last_error'],
+                }
+                for name, stats in self._stats.items()
+            }
+
+
+def create_provider(client=None) -> Provider:
+    """
+    환경 변수 설정에 맞는 제공자 생성
+
+    Args:
+        client: genai.Client (없으면 Gemini 제공자 제외)
+
+    Returns:
+        OpenAI 호환 엔드포인트가 설정되어 있으면 ProviderRouter, 아니면 GeminiProvider
+    """
+    providers: List[Provider] = []
+    if client is not None:
+        providers.append(GeminiProvider(client))
+
+    base_url = os.getenv('OPENAI_COMPAT_BASE_URL')
+    if base_url:
+        providers.append(OpenAICompatibleProvider(
+            base_url,
+            os.getenv('OPENAI_COMPAT_MODEL', 'local-vision'),
+            api_key=os.getenv('OPENAI_COMPAT_API_KEY'),
+        ))
+
+    if not providers:
+        raise ValueError("사용할 수 있는 제공자가 없습니다. (GEMINI_API_KEY 또는 OPENAI_COMPAT_BASE_URL 설정)")
+    if len(providers) == 1:
+        return providers[0]
+    return ProviderRouter(providers, os.getenv('PROMPTMAKER_ROUTING', DEFAULT_ROUTING_POLICY))
@@ -0,0 +1,178 @@
+"""
+모델 응답 JSON 파서
+코드 블록/앞뒤 설명문이 섞인 응답, max_output_tokens에서 잘린 응답도 최대한 살려서 파싱하고
+어떤 경로로 파싱했는지 집계
+"""
+
+import json
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 파싱 경로
+PATH_JSON = 'json'            # 그대로 json.loads 성공
+PATH_EMBEDDED = 'embedded'    # 앞뒤 텍스트 사이에 있는 JSON 객체 (raw_decode)
+PATH_REPAIRED = 'repaired'    # 잘린 JSON을 닫아서 완성된 필드만 복구
+PATH_FOLLOWUP = 'followup'    # 누락 필드를 후속 텍스트 호출로 보충 (gemini_api에서 기록)
+PATH_FAILED = 'failed'        # 복구 불가
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def record_parse_path(path: str):
+    """파싱 경로 집계"""
+    with _stats_lock:
+        _stats[path] += 1
+
+
+def get_parse_stats() -> Dict[str, int]:
+    """경로별 파싱 횟수 (프로세스 시작 이후 누적)"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def reset_parse_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def parse_stats_since(before: Dict[str, int]) -> Dict[str, int]:
+    """
+    이전 get_parse_stats() 결과 이후 늘어난 경로별 횟수 (실행 1회분 집계용)
+
+    Args:
+        before: 실행 시작 시점의 get_parse_stats() 결과
+    """
+    return dict(Counter(get_parse_stats()) - Counter(before))
+
+
+def format_parse_stats(stats: Dict[str, int]) -> str:
+    """경로별 횟수 → 'json 8, repaired 1' (없으면 빈 문자열)"""
+    return ', '.join(f"{path} {count}" for path, count in sorted(stats.items()) if count)
+
+
+def _strip_code_fence(text: str) -> str:
+    """마크다운 코드 블록 제거 (```json ... ```, 닫는 ```가 잘린 경우 포함)"""
+    if not text.startswith('```'):
+        return text
+    lines = text.split('\n')[1:]
+    if lines and lines[-1].strip().startswith('```'):
+        lines = lines[:-1]
+    return '\n'.join(lines)
+
+
+def repair_truncated_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    잘린 JSON 객체 복구
+
+    완전히 끝난 값까지만 남기고 열린 문자열/괄호를 닫음.
+    (잘린 중간의 값은 완성되지 않았으므로 버림)
+
+    Args:
+        text: '{'로 시작하는 (잘렸을 수 있는) JSON 텍스트
+
+    Returns:
+        복구된 딕셔너리 (복구 불가 시 None)
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    text = text[start:]
+
+    stack: List[str] = []
+    in_string = False
+    escaped = False
+    # 잘라도 되는 위치: (위치, 그 시점에 닫아야 할 괄호들)
+    cuts: List[Tuple[int, Tuple[str, ...]]] = []
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+            cuts.append((i + 1, tuple(stack)))
+        elif ch in '}]':
+            if not stack:
+                break
+            stack.pop()
+            if not stack:
+                # 잘리지 않은 완전한 객체
+                text = text[:i + 1]
+                cuts = [(len(text), ())]
+                break
+            cuts.append((i + 1, tuple(stack)))
+        elif ch == ',':
+            cuts.append((i, tuple(stack)))
+
+    # 잘린 위치가 값 사이였다면 끝까지 그대로 닫아 봄
+    if not in_string and stack:
+        cuts.append((len(text), tuple(stack)))
+
+    for position, open_brackets in reversed(cuts):
+        candidate = text[:position].rstrip().rstrip(',') + ''.join(reversed(open_brackets))
+        try:
+            value = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(value, dict) and value:
+            return value
+    return None
+
+
+def parse_prompt_response(response_text: Optional[str]) -> Tuple[Dict[str, Any], str]:
+    """
+    모델 응답 파싱
+
+    1. 그대로 json.loads
+    2. 앞뒤 설명문 사이의 JSON 객체 (raw_decode)
+    3. 잘린 JSON 복구 (완성된 필드만, 빈 객체는 실패로 처리)
+
+    Args:
+        response_text: 모델 응답 텍스트
+
+    Returns:
+        (파싱된 딕셔너리, 파싱 경로)
+    """
+    if not response_text or not response_text.strip():
+        record_parse_path(PATH_FAILED)
+        raise ValueError("모델 응답이 비어 있습니다.")
+
+    text = _strip_code_fence(response_text.strip())
+
+    try:
+        value = json.loads(text)
+        if isinstance(value, dict):
+            record_parse_path(PATH_JSON)
+            return value, PATH_JSON
+    except json.JSONDecodeError:
+        pass
+
+    # '{' 위치마다: 완전한 객체면 raw_decode, 잘린 객체면 복구
+    decoder = json.JSONDecoder()
+    index = text.find('{')
+    while index != -1:
+        try:
+            value, _ = decoder.raw_decode(text, index)
+            if isinstance(value, dict):
+                record_parse_path(PATH_EMBEDDED)
+                return value, PATH_EMBEDDED
+        except json.JSONDecodeError:
+            value = repair_truncated_json(text[index:])
+            if value is not None:
+                record_parse_path(PATH_REPAIRED)
+                return value, PATH_REPAIRED
+        index = text.find('{', index + 1)
+
+    record_parse_path(PATH_FAILED)
+    raise ValueError(f"응답에서 JSON을 찾을 수 없습니다: {text[:100]}")
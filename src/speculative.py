@@ -0,0 +1,155 @@
+"""
+입력 중 미리 생성 (speculative generation)
+이미지를 고르고 텍스트 입력이 잠시 멈추면 백그라운드에서 미리 생성을 시작하고,
+생성 버튼을 눌렀을 때 입력이 그대로면 그 결과(또는 진행 중인 호출)를 그대로 사용
+
+- 입력이 바뀌면 대기 중인 예약은 취소, 진행 중인 호출은 결과를 버림(superseded)
+  (API 호출 자체는 중간에 끊을 수 없으므로 분당 호출 수 상한으로 쿼터 소모를 제한)
+(GUI 시작 시 import되므로 무거운 모듈을 import하지 말 것)
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+
+DEFAULT_DEBOUNCE_SECONDS = 1.5
+DEFAULT_MAX_PER_MINUTE = 4
+
+
+def make_input_key(**inputs: Any) -> str:
+    """입력 조합 비교용 키 (이미지 경로, 텍스트, 옵션 등)"""
+    return json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+
+
+class SpeculativeGenerator:
+    """디바운스 + 분당 상한이 있는 미리 생성 관리자"""
+
+    def __init__(
+        self,
+        debounce: float = DEFAULT_DEBOUNCE_SECONDS,
+        max_per_minute: int = DEFAULT_MAX_PER_MINUTE,
+        on_start: Optional[Callable[[], None]] = None
+    ):
+        """
+        Args:
+            debounce: 마지막 입력 변경 후 미리 생성을 시작하기까지 대기 시간 (초)
+            max_per_minute: 최근 60초 동안 시작할 수 있는 미리 생성 최대 횟수
+            on_start: 미리 생성을 시작할 때 호출 (작업 스레드에서 호출됨)
+        """
+        self.debounce = debounce
+        self.max_per_minute = max_per_minute
+        self.on_start = on_start
+
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        # 예약을 바꾸거나 취소할 때마다 증가 - cancel()이 막지 못한(이미 만료되어 lock을 기다리던) 타이머 무시용
+        self._generation = 0
+        self._key: Optional[str] = None
+        self._future: Optional[Future] = None
+        self._started_at: deque = deque()
+        self.stats: Dict[str, int] = {'started': 0, 'adopted': 0, 'superseded': 0, 'rate_limited': 0}
+
+    def schedule(self, key: str, task: Callable[[], Any]):
+        """
+        입력이 바뀔 때마다 호출: debounce 후 task를 백그라운드에서 실행
+
+        Args:
+            key: make_input_key() 결과
+            task: 생성 함수 (결과 반환, 작업 스레드에서 실행)
+        """
+        with self._lock:
+            self._cancel_timer()
+
+            # 같은 입력으로 이미 생성 중/완료면 그대로 둠
+            if self._key == key and self._future is not None:
+                return
+            self._discard()
+
+            self._timer = threading.Timer(self.debounce, self._start, args=(key, task, self._generation))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        """예약 취소 및 진행 중인 결과 버림 (입력이 불완전해졌을 때, 창을 닫을 때)"""
+        with self._lock:
+            self._cancel_timer()
+            self._discard()
+
+    def take(self, key: str) -> Optional[Future]:
+        """
+        생성 버튼을 눌렀을 때: 입력이 같은 미리 생성이 있으면 넘겨받음 (1회만)
+
+        Args:
+            key: 현재 입력의 make_input_key() 결과
+
+        Returns:
+            결과 Future (진행 중이면 완료될 때까지 future.result()로 대기), 없으면 None
+        """
+        with self._lock:
+            self._cancel_timer()
+
+            if self._key != key or self._future is None:
+                self._discard()
+                return None
+
+            future = self._future
+            # 실패한 미리 생성은 넘기지 않음 (버튼 클릭 시 정상 경로로 다시 생성)
+            if future.done() and future.exception() is not None:
+                self._discard()
+                return None
+
+            self._key = None
+            self._future = None
+            self.stats['adopted'] += 1
+            return future
+
+    def _cancel_timer(self):
+        """대기 중인 예약 취소 (lock 안에서 호출)"""
+        self._generation += 1
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _discard(self):
+        """현재 미리 생성 버림 (lock 안에서 호출)"""
+        if self._future is not None and not self._future.done():
+            self.stats['superseded'] += 1
+        self._key = None
+        self._future = None
+
+    def _allow(self, now: float) -> bool:
+        """분당 상한 확인 (lock 안에서 호출)"""
+        while self._started_at and now - self._started_at[0] >= 60:
+            self._started_at.popleft()
+        if len(self._started_at) >= self.max_per_minute:
+            self.stats['rate_limited'] += 1
+            return False
+        self._started_at.append(now)
+        return True
+
+    def _start(self, key: str, task: Callable[[], Any], generation: int):
+        """debounce 타이머 만료 (타이머 스레드)"""
+        with self._lock:
+            if generation != self._generation:
+                # lock을 기다리는 동안 취소/재예약/넘겨받기가 있었음
+                return
+            self._timer = None
+            if not self._allow(time.monotonic()):
+                return
+            future: Future = Future()
+            future.set_running_or_notify_cancel()
+            self._key = key
+            self._future = future
+            self.stats['started'] += 1
+
+        if self.on_start:
+            self.on_start()
+
+        try:
+            future.set_result(task())
+        except Exception as e:
+            future.set_exception(e)
@@ -0,0 +1,143 @@
+"""
+Thinking 예산 제어
+gemini-2.5-flash의 내부 추론(thinking) 토큰 예산 프리셋과
+관측된 지연 시간에 따라 예산을 자동 조절하는 적응형 모드
+(GUI 시작 시에도 import되므로 무거운 모듈을 import하지 말 것)
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+# 프리셋 → thinking_budget (None: 모델 기본 동적 예산, 0: 끔)
+THINKING_PRESETS: Dict[str, Optional[int]] = {
+    'default': None,
+    'low': 512,
+    'off': 0,
+}
+
+# GUI 표시용 라벨
+THINKING_LABELS = {
+    'default': '기본 (모델 자동)',
+    'low': '낮음 (512 토큰)',
+    'off': '끄기 (가장 빠름)',
+    'adaptive': '자동 조절 (지연 목표)',
+}
+
+DEFAULT_THINKING = 'default'
+
+# 적응형 모드 기본 목표 지연 시간 (초)
+DEFAULT_LATENCY_SLA = 8.0
+
+# 동적 예산(None)일 때 max_output_tokens에 더할 여유분
+# (2.5 모델은 thinking 토큰도 max_output_tokens에 포함됨)
+DYNAMIC_THINKING_ALLOWANCE = 4096
+
+# 적응형 모드 단계 (느림 → 빠름)
+_ADAPTIVE_LEVELS = ['default', 'low', 'off']
+
+
+def thinking_choices() -> List[str]:
+    """선택 가능한 thinking 설정 이름 (프리셋 + adaptive)"""
+    return list(THINKING_PRESETS) + ['adaptive']
+
+
+class ThinkingController:
+    """thinking 예산 결정 및 적응형 조절"""
+
+    def __init__(
+        self,
+        preset: str = DEFAULT_THINKING,
+        latency_sla: Optional[float] = None,
+        smoothing: float = 0.3,
+        min_samples: int = 2
+    ):
+        """
+        초기화
+
+        Args:
+            preset: 기본 설정 ('default', 'low', 'off', 'adaptive')
+            latency_sla: 적응형 모드 목표 지연 시간 (초)
+            smoothing: 지연 시간 지수 이동 평균 계수
+            min_samples: 단계 변경 후 다음 변경까지 필요한 최소 관측 수
+        """
+        self._validate(preset)
+        self.preset = preset
+        self.latency_sla = latency_sla or DEFAULT_LATENCY_SLA
+        self.smoothing = smoothing
+        self.min_samples = min_samples
+
+        self._lock = threading.Lock()
+        self._level = 0  # _ADAPTIVE_LEVELS 인덱스
+        self._ewma = None
+        self._samples_since_change = 0
+        self.history: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _validate(preset: str):
+        if preset not in THINKING_PRESETS and preset != 'adaptive':
+            raise ValueError(
+                f"알 수 없는 thinking 설정입니다: {preset} "
+                f"(사용 가능: {', '.join(thinking_choices())})"
+            )
+
+    def resolve(self, preset: Optional[str] = None) -> str:
+        """
+        실제 적용할 프리셋 이름 (adaptive는 현재 단계로 변환)
+
+        Args:
+            preset: 호출별 설정 (없으면 기본 설정)
+        """
+        preset = preset or self.preset
+        self._validate(preset)
+        if preset == 'adaptive':
+            with self._lock:
+                return _ADAPTIVE_LEVELS[self._level]
+        return preset
+
+    def budget_for(self, preset: Optional[str] = None) -> Optional[int]:
+        """적용할 thinking_budget (None: 모델 기본 동적 예산)"""
+        return THINKING_PRESETS[self.resolve(preset)]
+
+    def record(self, latency: float, preset: Optional[str] = None):
+        """
+        호출 지연 시간 기록 (adaptive일 때만 단계 조절)
+
+        - 평균 지연이 목표를 넘으면 한 단계 낮춤 (default → low → off)
+        - 목표의 60% 미만으로 충분히 빠르면 한 단계 올림
+
+        Args:
+            latency: 호출 지연 시간 (초)
+            preset: 해당 호출에 사용한 설정
+        """
+        if (preset or self.preset) != 'adaptive':
+            return
+
+        with self._lock:
+            if self._ewma is None:
+                self._ewma = latency
+            else:
+                self._ewma = self.smoothing * latency + (1 - self.smoothing) * self._ewma
+            self._samples_since_change += 1
+
+            if self._samples_since_change < self.min_samples:
+                return
+
+            new_level = self._level
+            if self._ewma > self.latency_sla and self._level < len(_ADAPTIVE_LEVELS) - 1:
+                new_level = self._level + 1
+            elif self._ewma < self.latency_sla * 0.6 and self._level > 0:
+                new_level = self._level - 1
+
+            if new_level != self._level:
+                self.history.append({
+                    'at': time.time(),
+                    'from': _ADAPTIVE_LEVELS[self._level],
+                    'to': _ADAPTIVE_LEVELS[new_level],
+                    'ewma_latency': round(self._ewma, 2),
+                })
+                self._level = new_level
+                self._samples_since_change = 0
+                # 단계가 바뀌면 이전 단계의 평균은 의미가 없으므로 새로 측정
+                self._ewma = None
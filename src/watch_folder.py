@@ -0,0 +1,394 @@
+"""
+감시 폴더 모드
+공유 폴더에 새로 들어오거나 변경된 이미지만 골라 자동으로 프롬프트 생성
+
+- Linux에서는 inotify(inotify_simple 설치 시), 그 외에는 주기적 폴더 스캔
+- 쓰기 중인 파일은 크기/수정 시각이 일정 시간 변하지 않을 때까지 대기
+- 처리 내역(manifest)을 내용 해시 + 수정 시각으로 저장하여 재시작해도 다시 처리하지 않음
+
+사용 예:
+    python watch_folder.py D:/shared/refs --text "지브리 스타일 배경"
+    python watch_folder.py ./refs --text "..." --output-dir ./prompts --profile compact
+    python watch_folder.py ./refs --text "..." --jsonl results.jsonl --poll
+
+이미지 옆에 같은 이름의 .txt 파일이 있으면 그 내용을 사용자 텍스트로 사용
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set
+
+from output_profiles import DEFAULT_OUTPUT_PROFILE
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp'}
+MANIFEST_NAME = '.promptmaker_manifest.json'
+
+# 쓰기 완료로 판단하기까지 크기/수정 시각이 변하지 않아야 하는 시간 (초)
+DEFAULT_SETTLE_SECONDS = 2.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+def is_image_file(path: Path) -> bool:
+    """처리 대상 이미지 파일 여부 (숨김 파일 제외)"""
+    return path.suffix.lower() in IMAGE_EXTENSIONS and not path.name.startswith('.')
+
+
+class Manifest:
+    """처리한 파일 기록 (상대 경로 → 해시 / 수정 시각 / 크기 / 결과 위치)"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                # 깨진 manifest는 백업 후 새로 시작
+                path.replace(path.with_suffix('.corrupt'))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.entries.get(key)
+
+    def update(self, key: str, entry: Dict[str, Any]):
+        """항목 갱신 후 즉시 저장 (임시 파일에 쓴 뒤 교체)"""
+        with self._lock:
+            self.entries[key] = entry
+            tmp_path = self.path.with_suffix('.tmp')
+            tmp_path.write_text(json.dumps(self.entries, indent=2, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, self.path)
+
+
+class SidecarSink:
+    """결과를 이미지 옆에 <이름>.prompt.json으로 저장"""
+
+    def write(self, image_path: Path, result: Dict[str, Any]) -> str:
+        output_path = image_path.with_name(image_path.stem + '.prompt.json')
+        _write_json(output_path, result)
+        return str(output_path)
+
+
+class DirectorySink:
+    """결과를 지정 폴더에 감시 폴더와 같은 하위 구조로 저장"""
+
+    def __init__(self, root: Path, output_dir: Path):
+        self.root = root
+        self.output_dir = output_dir
+
+    def write(self, image_path: Path, result: Dict[str, Any]) -> str:
+        relative = image_path.relative_to(self.root)
+        output_path = self.output_dir / relative.with_name(relative.stem + '.prompt.json')
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_json(output_path, result)
+        return str(output_path)
+
+
+class JsonlSink:
+    """결과를 JSONL 파일 1개에 한 줄씩 추가"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, image_path: Path, result: Dict[str, Any]) -> str:
+        line = json.dumps({'image': str(image_path), 'result': result}, ensure_ascii=False)
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+        return str(self.path)
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+class PollingWatcher:
+    """주기적 폴더 스캔 (모든 OS)"""
+
+    def __init__(self, root: Path, interval: float = DEFAULT_POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+
+    def changes(self, stop: threading.Event) -> Iterable[Set[Path]]:
+        """주기마다 폴더 안의 이미지 전체를 후보로 반환 (변경 여부는 manifest가 판단)"""
+        while not stop.is_set():
+            yield {p for p in self.root.rglob('*') if p.is_file() and is_image_file(p)}
+            stop.wait(self.interval)
+
+
+class InotifyWatcher:
+    """inotify 기반 감시 (Linux, inotify_simple 필요)"""
+
+    def __init__(self, root: Path, interval: float = DEFAULT_POLL_INTERVAL):
+        from inotify_simple import INotify, flags
+
+        self.root = root
+        self.interval = interval
+        self.flags = flags
+        self.inotify = INotify()
+        self.watch_mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.CREATE | flags.MODIFY
+        self.watches: Dict[int, Path] = {}
+        for directory in [root] + [p for p in root.rglob('*') if p.is_dir()]:
+            self._add_watch(directory)
+
+    def _add_watch(self, directory: Path):
+        wd = self.inotify.add_watch(str(directory), self.watch_mask)
+        self.watches[wd] = directory
+
+    def changes(self, stop: threading.Event) -> Iterable[Set[Path]]:
+        """이벤트가 발생한 이미지만 후보로 반환 (이벤트가 없어도 주기마다 빈 집합 반환)"""
+        while not stop.is_set():
+            changed = set()
+            for event in self.inotify.read(timeout=int(self.interval * 1000)):
+                directory = self.watches.get(event.wd)
+                if directory is None or not event.name:
+                    continue
+                path = directory / event.name
+                if event.mask & self.flags.ISDIR:
+                    if event.mask & (self.flags.CREATE | self.flags.MOVED_TO):
+                        self._add_watch(path)
+                        changed |= {p for p in path.rglob('*') if p.is_file() and is_image_file(p)}
+                elif is_image_file(path):
+                    changed.add(path)
+            yield changed
+
+
+def create_watcher(root: Path, interval: float, force_polling: bool = False):
+    """inotify를 사용할 수 있으면 InotifyWatcher, 아니면 PollingWatcher"""
+    if not force_polling:
+        try:
+            return InotifyWatcher(root, interval)
+        except (ImportError, OSError):
+            pass
+    return PollingWatcher(root, interval)
+
+
+class FolderWatcher:
+    """감시 폴더 처리기"""
+
+    def __init__(
+        self,
+        root: str,
+        generator,
+        user_text: Optional[str] = None,
+        sink=None,
+        output_profile: str = DEFAULT_OUTPUT_PROFILE,
+        settle_seconds: float = DEFAULT_SETTLE_SECONDS,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        force_polling: bool = False,
+        retry_errors: bool = False
+    ):
+        """
+        Args:
+            root: 감시할 폴더
+            generator: GeminiPromptGenerator
+            user_text: 기본 사용자 텍스트 (이미지 옆 .txt 파일이 우선)
+            sink: 결과 저장 방식 (없으면 이미지 옆에 저장)
+            output_profile: 출력 프로필 이름
+            settle_seconds: 쓰기 완료 판단 대기 시간 (초)
+            poll_interval: 폴링 / 이벤트 대기 간격 (초)
+            force_polling: inotify 대신 폴링 사용
+            retry_errors: 이전에 실패한 파일도 다시 처리 (실행당 1번, 이미지나 .txt가 바뀌면 항상 다시 처리)
+        """
+        self.root = Path(root).resolve()
+        if not self.root.is_dir():
+            raise ValueError(f"폴더를 찾을 수 없습니다: {root}")
+
+        self.generator = generator
+        self.user_text = user_text
+        self.sink = sink or SidecarSink()
+        self.output_profile = output_profile
+        self.settle_seconds = settle_seconds
+        self.retry_errors = retry_errors
+        self.manifest = Manifest(self.root / MANIFEST_NAME)
+        self.watcher = create_watcher(self.root, poll_interval, force_polling)
+
+        # 쓰기 완료 대기 중인 파일: 경로 → (크기, 수정 시각, 마지막으로 변화를 본 시각)
+        self._pending: Dict[Path, tuple] = {}
+        # --retry-errors로 이번 실행에서 이미 다시 시도한 실패 항목 (폴링마다 같은 파일로 API를 계속 호출하지 않도록)
+        self._retried: Set[str] = set()
+        self.stop_event = threading.Event()
+
+    def _key(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def needs_processing(self, path: Path, size: int, mtime: float) -> Optional[str]:
+        """
+        처리 필요 여부 판단
+
+        Returns:
+            처리해야 하면 내용 해시, 아니면 None
+        """
+        from gemini_api import compute_file_hash
+
+        key = self._key(path)
+        entry = self.manifest.get(key)
+        if entry and entry.get('error'):
+            changed = (
+                entry['mtime'] != mtime or entry['size'] != size
+                or entry.get('text_mtime') != self._text_mtime(path)
+            )
+            if not changed:
+                # 이미지/텍스트가 그대로인 실패 항목은 --retry-errors여도 실행당 1번만 다시 시도
+                if not self.retry_errors or key in self._retried:
+                    return None
+                self._retried.add(key)
+        if entry and not entry.get('error') and entry['mtime'] == mtime and entry['size'] == size:
+            return None
+
+        content_hash = compute_file_hash(str(path))
+        if entry and entry['sha256'] == content_hash and not entry.get('error'):
+            # 내용은 그대로이고 수정 시각만 바뀜 (복사/touch) → 기록만 갱신
+            self.manifest.update(key, dict(entry, mtime=mtime, size=size))
+            return None
+        return content_hash
+
+    def _settled(self, candidates: Set[Path]) -> Set[Path]:
+        """후보를 대기 목록에 넣고, 크기/수정 시각이 settle_seconds 동안 변하지 않은 파일 반환"""
+        now = time.monotonic()
+        for path in candidates:
+            self._pending.setdefault(path, (None, None, now))
+
+        ready = set()
+        for path, (size, mtime, since) in list(self._pending.items()):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                del self._pending[path]
+                continue
+
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self._pending[path] = (stat.st_size, stat.st_mtime, now)
+            elif stat.st_size > 0 and now - since >= self.settle_seconds:
+                del self._pending[path]
+                ready.add(path)
+        return ready
+
+    def _text_mtime(self, path: Path) -> Optional[float]:
+        """이미지 옆 .txt 파일의 수정 시각 (없으면 None)"""
+        try:
+            return path.with_suffix('.txt').stat().st_mtime
+        except OSError:
+            return None
+
+    def _user_text_for(self, path: Path) -> Optional[str]:
+        text_path = path.with_suffix('.txt')
+        if text_path.exists():
+            data = text_path.read_bytes()
+            try:
+                text = data.decode('utf-8-sig')
+            except UnicodeDecodeError:
+                # Windows 메모장 등에서 저장한 한국어 텍스트 (실패하면 호출한 쪽에서 오류로 기록)
+                text = data.decode('cp949')
+            text = text.strip()
+            if text:
+                return text
+        return self.user_text
+
+    def process(self, path: Path):
+        """이미지 1개 처리 (필요한 경우에만 생성 후 manifest 기록)"""
+        # 대기 후 처리 전까지 삭제/잠금/인코딩 문제가 생겨도 감시가 멈추지 않도록 파일 단위로 오류 기록
+        entry: Dict[str, Any] = {
+            'sha256': None,
+            'mtime': None,
+            'size': None,
+            'text_mtime': None,
+            'attempts': 1,
+            'processed_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        try:
+            stat = path.stat()
+            entry.update(mtime=stat.st_mtime, size=stat.st_size, text_mtime=self._text_mtime(path))
+            content_hash = self.needs_processing(path, stat.st_size, stat.st_mtime)
+            if content_hash is None:
+                return
+            entry['sha256'] = content_hash
+            previous = self.manifest.get(self._key(path))
+            if previous and previous.get('sha256') == content_hash:
+                # 같은 내용으로 다시 처리한 횟수
+                entry['attempts'] = previous.get('attempts', 1) + 1
+
+            user_text = self._user_text_for(path)
+            if not user_text:
+                raise ValueError("사용자 텍스트가 없습니다. (--text 또는 이미지 옆 .txt 파일)")
+            # API가 연속 실패 중이면 복구될 때까지 기다렸다가 처리 (실패로 기록하지 않음)
+            result = self.generator.breaker.call_when_ready(
+                lambda: self.generator.generate_prompt([str(path)], user_text, output_profile=self.output_profile),
+                self.stop_event
+            )
+            entry['output'] = self.sink.write(path, result)
+            print(f"✅ {self._key(path)} → {entry['output']}")
+        except FileNotFoundError:
+            # 처리 전에 삭제됨 (다시 생기면 새 파일로 처리)
+            print(f"⏭️ {self._key(path)}: 처리 전에 삭제됨")
+            return
+        except Exception as e:
+            entry['error'] = str(e)
+            print(f"❌ {self._key(path)}: {e}")
+
+        self.manifest.update(self._key(path), entry)
+
+    def run(self):
+        """감시 시작 (시작 시 폴더 전체를 한 번 확인하여 재시작 중 들어온 파일도 처리)"""
+        print(f"👀 감시 시작: {self.root} ({type(self.watcher).__name__})")
+
+        initial = {p for p in self.root.rglob('*') if p.is_file() and is_image_file(p)}
+        for candidates in self.watcher.changes(self.stop_event):
+            if initial:
+                candidates = candidates | initial
+                initial = set()
+            for path in sorted(self._settled(candidates)):
+                self.process(path)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    from dotenv import load_dotenv
+    from gemini_api import GeminiPromptGenerator
+
+    parser = argparse.ArgumentParser(description="감시 폴더 프롬프트 생성")
+    parser.add_argument('folder', help="감시할 폴더")
+    parser.add_argument('--text', help="사용자 텍스트 (이미지 옆 .txt 파일이 우선)")
+    parser.add_argument('--profile', default=DEFAULT_OUTPUT_PROFILE, help="출력 프로필")
+    parser.add_argument('--output-dir', help="결과 저장 폴더 (없으면 이미지 옆에 저장)")
+    parser.add_argument('--jsonl', help="결과를 JSONL 파일 1개에 추가")
+    parser.add_argument('--poll', action='store_true', help="inotify 대신 폴링 사용")
+    parser.add_argument('--interval', type=float, default=DEFAULT_POLL_INTERVAL, help="폴링 간격 (초)")
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE_SECONDS, help="쓰기 완료 대기 시간 (초)")
+    parser.add_argument('--retry-errors', action='store_true', help="실패했던 파일도 실행당 1번 다시 처리")
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    root = Path(args.folder).resolve()
+    if args.jsonl:
+        sink = JsonlSink(Path(args.jsonl))
+    elif args.output_dir:
+        sink = DirectorySink(root, Path(args.output_dir).resolve())
+    else:
+        sink = SidecarSink()
+
+    watcher = FolderWatcher(
+        root, GeminiPromptGenerator(), args.text, sink, args.profile,
+        settle_seconds=args.settle, poll_interval=args.interval,
+        force_polling=args.poll, retry_errors=args.retry_errors
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+        print("\n감시 종료")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+concurrency.AdaptiveLimiter 테스트
+
+실행:
+    python -m pytest tests
+"""
+
+import sys
+import asyncio
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from concurrency import AdaptiveLimiter  # noqa: E402
+
+
+class AdaptiveLimiterCancelTest(unittest.TestCase):
+
+    def test_cancelled_acall_releases_permit(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(initial=1, max_limit=1)
+            started = asyncio.Event()
+
+            async def slow():
+                started.set()
+                await asyncio.sleep(10)
+
+            task = asyncio.create_task(limiter.acall(slow))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+            self.assertEqual(limiter.inflight, 0)
+
+            async def fast():
+                return 'ok'
+
+            # 권한이 반환되지 않으면 여기서 멈춤
+            result = await asyncio.wait_for(limiter.acall(fast), timeout=1)
+            self.assertEqual(result, 'ok')
+            # 취소는 성공/오류 어느 쪽으로도 집계하지 않음
+            self.assertEqual(limiter.counts['error'], 0)
+            self.assertEqual(limiter.counts['success'], 1)
+
+        asyncio.run(scenario())
+
+    def test_interrupted_call_releases_permit(self):
+        limiter = AdaptiveLimiter(initial=1, max_limit=1)
+
+        def interrupted():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            limiter.call(interrupted)
+        self.assertEqual(limiter.inflight, 0)
+        self.assertEqual(limiter.call(lambda: 'ok', timeout=1), 'ok')
+
+
+if __name__ == '__main__':
+    unittest.main()